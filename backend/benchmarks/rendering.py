@@ -0,0 +1,224 @@
+"""
+Rendering benchmarks - CV, cover letter and learning path exports.
+
+Renders a deterministic synthetic corpus of increasing size through every
+document kind and output format and reports, per case:
+  - latency percentiles (ms) over --iterations renders
+  - peak Python allocation during one render (tracemalloc) and process peak RSS
+  - output size in bytes
+
+Results are written as JSON so runs can be compared over time:
+
+    cd backend
+    python -m benchmarks.rendering --output bench_before.json
+    ... change a renderer ...
+    python -m benchmarks.rendering --output bench_after.json --compare bench_before.json
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.documents import EXPORT_FORMATS, TEMPLATE_VERSION, render_document  # noqa: E402
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # Windows
+    RESOURCE_AVAILABLE = False
+
+# Corpus size name -> scale (roles in a CV, paragraphs in a letter, weeks in a path)
+SIZES = {"small": 2, "medium": 8, "large": 32, "xlarge": 128}
+
+WORDS = (
+    "model pipeline latency production data feature training inference evaluation "
+    "deployed reduced improved customers revenue team platform api scalable python "
+    "pytorch kubernetes experiment accuracy R&D <5ms throughput retrieval embeddings"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def synthetic_cv(scale: int, seed: int = 0) -> Tuple[str]:
+    rng = random.Random(seed)
+    lines = ["JANE DOE", "jane@example.com | +44 20 0000 0000 | London", "",
+             "PROFESSIONAL SUMMARY", _sentence(rng, 40), "", "EXPERIENCE"]
+    for role in range(scale):
+        lines += ["", f"Senior ML Engineer - Company {role} (2015 - 2020)"]
+        lines += [f"- {_sentence(rng, 18)}" for _ in range(5)]
+    lines += ["", "SKILLS", ", ".join(sorted(set(WORDS))), "", "EDUCATION", "MSc Computer Science"]
+    return ("\n".join(lines),)
+
+
+def synthetic_cover_letter(scale: int, seed: int = 0) -> Tuple[str]:
+    rng = random.Random(seed)
+    paragraphs = ["Dear Hiring Manager,"] + [_sentence(rng, 80) for _ in range(scale)] + ["Sincerely,\nJane Doe"]
+    return ("\n\n".join(paragraphs),)
+
+
+def synthetic_learning_path(scale: int, seed: int = 0) -> Tuple[Dict[str, Any], str]:
+    rng = random.Random(seed)
+    weeks = [{
+        "week": week,
+        "focus": _sentence(rng, 4),
+        "phase": rng.choice(["Foundations", "Core", "Advanced", "Portfolio"]),
+        "courses": [{"name": _sentence(rng, 5), "platform": rng.choice(["Coursera", "fast.ai", "Udemy"])}
+                    for _ in range(4)],
+    } for week in range(1, scale + 1)]
+    path_data = {"path_overview": {"duration_weeks": scale, "hours_per_week": 10}, "weeks": weeks}
+    return path_data, "Machine Learning Engineer"
+
+
+CORPORA: Dict[str, Callable[[int], Tuple]] = {
+    "cv": synthetic_cv,
+    "cover_letter": synthetic_cover_letter,
+    "learning_path": synthetic_learning_path,
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+    return samples[index]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bench_case(kind: str, format: str, source: Tuple, iterations: int, template: str) -> Dict[str, Any]:
+    render = lambda: render_document(kind, format, *source, template=template)  # noqa: E731
+    output = render()  # warm-up: fonts, styles, imports
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    # Separate pass - tracemalloc slows rendering down, so it's kept out of the timings
+    gc.collect()
+    tracemalloc.start()
+    render()
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "latency_ms": {
+            "min": round(timings[0], 3),
+            "p50": round(percentile(timings, 50), 3),
+            "p90": round(percentile(timings, 90), 3),
+            "p99": round(percentile(timings, 99), 3),
+            "max": round(timings[-1], 3),
+            "mean": round(sum(timings) / len(timings), 3),
+        },
+        "peak_alloc_bytes": peak_alloc,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "output_bytes": len(output),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(kinds=tuple(CORPORA), formats=EXPORT_FORMATS, sizes=tuple(SIZES),
+                   iterations: int = 20, template: str = "classic") -> Dict[str, Any]:
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            source = CORPORA[kind](SIZES[size])
+            input_chars = len(json.dumps(source, default=str))
+            for format in formats:
+                case = bench_case(kind, format, source, iterations, template)
+                results.append({"kind": kind, "format": format, "size": size, "input_chars": input_chars, **case})
+                print(
+                    f"{kind:14} {format:5} {size:7} p50={case['latency_ms']['p50']:>9.2f}ms "
+                    f"p99={case['latency_ms']['p99']:>9.2f}ms out={case['output_bytes']:>9}B "
+                    f"alloc={case['peak_alloc_bytes'] // 1024:>7}KiB",
+                    file=sys.stderr,
+                )
+    return {
+        "benchmark": "rendering",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "template_version": TEMPLATE_VERSION,
+        "template": template,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """p50 latency and output size change per case present in both runs"""
+    previous = {(r["kind"], r["format"], r["size"]): r for r in baseline.get("results", [])}
+    lines = []
+    for result in current["results"]:
+        before = previous.get((result["kind"], result["format"], result["size"]))
+        if not before:
+            continue
+        old_p50, new_p50 = before["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        change = (new_p50 - old_p50) / old_p50 * 100 if old_p50 else 0.0
+        lines.append(
+            f"{result['kind']:14} {result['format']:5} {result['size']:7} "
+            f"p50 {old_p50:>9.2f} -> {new_p50:>9.2f}ms ({change:+6.1f}%)  "
+            f"bytes {before['output_bytes']} -> {result['output_bytes']}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark document rendering")
+    parser.add_argument("--kinds", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument("--formats", nargs="+", choices=list(EXPORT_FORMATS), default=list(EXPORT_FORMATS))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--template", default="classic")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.kinds, args.formats, args.sizes, args.iterations, args.template)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
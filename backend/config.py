@@ -65,6 +65,57 @@ FREE_LIMITS = {
     "analyses": 1
 }
 
-# Downloads directory
+# Downloads directory (documents are rendered in memory; kept for legacy files)
 DOWNLOADS_DIR = ROOT_DIR / 'downloads'
-DOWNLOADS_DIR.mkdir(exist_ok=True)
+try:
+    DOWNLOADS_DIR.mkdir(exist_ok=True)
+except OSError:
+    # Read-only filesystem (e.g. serverless) - nothing is written here any more
+    pass
+# Retention for legacy files in DOWNLOADS_DIR (see services/janitor.py); interval 0 disables it
+DOWNLOADS_MAX_AGE_HOURS = float(os.environ.get('DOWNLOADS_MAX_AGE_HOURS', '24'))
+DOWNLOADS_MAX_BYTES = int(os.environ.get('DOWNLOADS_MAX_BYTES', str(256 * 1024 * 1024)))
+DOWNLOADS_JANITOR_INTERVAL_SECONDS = float(os.environ.get('DOWNLOADS_JANITOR_INTERVAL_SECONDS', '600'))
+
+# Bulk resume ingestion (/resume/parse-batch)
+RESUME_BATCH_MAX_FILES = int(os.environ.get('RESUME_BATCH_MAX_FILES', '100'))
+RESUME_BATCH_MAX_FILE_BYTES = int(os.environ.get('RESUME_BATCH_MAX_FILE_BYTES', str(10 * 1024 * 1024)))
+# Uncompressed bytes read per batch, zip entries included
+RESUME_BATCH_MAX_TOTAL_BYTES = int(os.environ.get('RESUME_BATCH_MAX_TOTAL_BYTES', str(100 * 1024 * 1024)))
+RESUME_BATCH_WORKERS = int(os.environ.get('RESUME_BATCH_WORKERS', '4'))
+
+# Rendered document cache (see services/render_cache.py)
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Optional second tier on disk, shared by workers on the same host; empty disables it
+RENDER_CACHE_DIR = os.environ.get('RENDER_CACHE_DIR', '')
+
+# Document rendering pool (see services/render_pool.py); 0 workers = thread pool
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', '2'))
+RENDER_MAX_CONCURRENCY = int(os.environ.get('RENDER_MAX_CONCURRENCY', str(max(RENDER_WORKERS, 1) * 2)))
+RENDER_TIMEOUT_SECONDS = float(os.environ.get('RENDER_TIMEOUT_SECONDS', '30'))
+
+# Object storage for rendered documents (see services/storage.py).
+# "" serves downloads inline from the app, "local" or "s3" redirect to signed URLs.
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', '').lower()
+STORAGE_URL_EXPIRY_SECONDS = int(os.environ.get('STORAGE_URL_EXPIRY_SECONDS', '300'))
+STORAGE_LOCAL_DIR = os.environ.get('STORAGE_LOCAL_DIR', str(ROOT_DIR / 'storage'))
+# Signs local storage URLs - its own secret, so a leaked download URL says nothing about JWT_SECRET
+STORAGE_SIGNING_SECRET = os.environ.get('STORAGE_SIGNING_SECRET', '')
+# S3-compatible storage; set S3_ENDPOINT_URL for MinIO or other non-AWS services
+S3_BUCKET = os.environ.get('S3_BUCKET', '')
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL', '')
+# Endpoint browsers use for presigned URLs when it differs (e.g. MinIO inside docker-compose)
+S3_PUBLIC_ENDPOINT_URL = os.environ.get('S3_PUBLIC_ENDPOINT_URL', '')
+S3_REGION = os.environ.get('S3_REGION', 'us-east-1')
+S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY', '')
+
+# Extra directories searched for TrueType fonts used in PDFs with non-Latin text
+# (os.pathsep-separated; see services/fonts.py)
+PDF_FONT_DIRS = [d for d in os.environ.get('PDF_FONT_DIRS', '').split(os.pathsep) if d]
+
+# Shared company research cache used by cover letters (see services/company_cache.py)
+COMPANY_RESEARCH_TTL_DAYS = int(os.environ.get('COMPANY_RESEARCH_TTL_DAYS', '30'))
+
+# Per-posting job description analysis shared by applicants (see services/job_analysis.py)
+JOB_ANALYSIS_TTL_DAYS = int(os.environ.get('JOB_ANALYSIS_TTL_DAYS', '14'))
@@ -0,0 +1,135 @@
+"""
+Course store - one compact in-memory store for every course.
+
+The two course databases (data/courses.py's COURSE_DATABASE listing and the
+verified courses in data/courses_database.py) used to live as separate dicts
+of dicts with different schemas. Both now load into this store:
+
+  - every course is a __slots__ CourseRecord with an integer id; repeated
+    strings (platforms, difficulties, costs, skills, roles) are interned and
+    lists become tuples
+  - the source dicts are dropped after loading
+  - COURSE_DATABASE and ALL_COURSES remain as read-only mapping views that
+    build the old dict shape on access, so existing callers are unchanged
+
+Indexes over the records (services/course_catalog.py) use the integer ids.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Course sources - each keeps its own keys and dict shape in its view
+LISTING = "listing"    # data/courses.py - /courses and /courses/scrimba
+VERIFIED = "verified"  # data/courses_database.py - learning path curricula
+
+# (dict key, record attribute) in the order each source's dicts had them;
+# a key is left out of the dict when the record has no value for it
+LISTING_FIELDS = (
+    ("name", "name"), ("platform", "platform"), ("url", "url"), ("duration_hours", "duration_hours"),
+    ("cost", "cost"), ("difficulty", "difficulty"), ("rating", "rating"), ("skills", "skills"),
+    ("for_roles", "for_roles"), ("recommended", "recommended"), ("badge", "badge"),
+)
+VERIFIED_FIELDS = (
+    ("id", "key"), ("name", "name"), ("url", "url"), ("platform", "platform"), ("instructor", "instructor"),
+    ("duration_hours", "duration_hours"), ("cost", "cost"), ("cost_type", "cost_type"),
+    ("difficulty", "difficulty"), ("rating", "rating"), ("students", "students"),
+    ("description", "description"), ("skills_taught", "skills"), ("why_recommended", "why_recommended"),
+    ("badge", "badge"), ("is_fast_track", "is_fast_track"),
+)
+SOURCE_FIELDS = {LISTING: LISTING_FIELDS, VERIFIED: VERIFIED_FIELDS}
+
+# Both schemas' skill lists end up in CourseRecord.skills
+_ALIASES = {"skills_taught": "skills", "id": "key"}
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_intern(v) for v in value)
+    return value
+
+
+class CourseRecord:
+    __slots__ = (
+        "id", "source", "key", "name", "url", "platform", "instructor", "duration_hours", "cost",
+        "cost_type", "difficulty", "rating", "students", "description", "skills", "why_recommended",
+        "badge", "for_roles", "recommended", "is_fast_track",
+    )
+
+    def __init__(self, id: int, source: str, key: str, data: Dict[str, Any]):
+        for attr in self.__slots__:
+            object.__setattr__(self, attr, None)
+        for field, value in data.items():
+            attr = _ALIASES.get(field, field)
+            if attr not in self.__slots__:
+                raise ValueError(f"Unknown course field '{field}' in {key}")
+            object.__setattr__(self, attr, _intern(value))
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "key", sys.intern(key))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CourseRecord is read-only")
+
+    def to_dict(self, fields: Optional[Tuple[Tuple[str, str], ...]] = None) -> Dict[str, Any]:
+        """The course in its source's dict shape (a fresh dict with fresh lists)"""
+        result = {}
+        for field, attr in fields or SOURCE_FIELDS[self.source]:
+            value = getattr(self, attr)
+            if value is not None:
+                result[field] = list(value) if isinstance(value, tuple) else value
+        return result
+
+    def __repr__(self) -> str:
+        return f"CourseRecord({self.id}, {self.source}:{self.key})"
+
+
+class CourseView(Mapping):
+    """Read-only {key: course dict} view of one source, for code written against the old dicts"""
+
+    def __init__(self, store: "CourseStore", source: str):
+        self._store = store
+        self._source = source
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self._store.get(self._source, key)
+        if record is None:
+            raise KeyError(key)
+        return record.to_dict()
+
+    def __iter__(self) -> Iterator[str]:
+        return (record.key for record in self._store.records(self._source))
+
+    def __len__(self) -> int:
+        return len(self._store.keys[self._source])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._store.keys[self._source]
+
+
+class CourseStore:
+    def __init__(self):
+        self.all: List[CourseRecord] = []
+        self.keys: Dict[str, Dict[str, int]] = {LISTING: {}, VERIFIED: {}}
+
+    def load(self, source: str, courses: Iterable[Tuple[str, Dict[str, Any]]]) -> CourseView:
+        """Add (key, course dict) pairs from a source; returns the source's view"""
+        for key, data in courses:
+            if key in self.keys[source]:
+                raise ValueError(f"Duplicate course '{key}' in {source}")
+            record = CourseRecord(len(self.all), source, key, data)
+            self.all.append(record)
+            self.keys[source][record.key] = record.id
+        return CourseView(self, source)
+
+    def get(self, source: str, key: str) -> Optional[CourseRecord]:
+        record_id = self.keys[source].get(key)
+        return None if record_id is None else self.all[record_id]
+
+    def records(self, source: str) -> Iterator[CourseRecord]:
+        """Records of one source in load order"""
+        return (self.all[record_id] for record_id in self.keys[source].values())
+
+
+course_store = CourseStore()
@@ -1,7 +1,9 @@
 """
 Course Database Module
 Contains comprehensive course data for AI/ML learning paths.
+The dicts below are loaded into the shared course store (data/course_store.py).
 """
+from data.course_store import LISTING, course_store
 
 # Comprehensive Course Database with real links and metadata
 COURSE_DATABASE = {
@@ -579,32 +581,33 @@ COURSE_DATABASE = {
 }
 
 
+# Loaded into the course store; from here on COURSE_DATABASE is a read-only view of it
+COURSE_DATABASE = course_store.load(LISTING, COURSE_DATABASE.items())
+
+
 def get_courses_for_role(role_id: str, difficulty: str = None) -> list:
     """Get relevant courses for a specific role"""
-    courses = []
-    for course_id, course in COURSE_DATABASE.items():
-        if "all" in course.get("for_roles", []) or role_id in course.get("for_roles", []):
-            if difficulty is None or course.get("difficulty", "").lower().startswith(difficulty.lower()):
-                courses.append({
-                    "id": course_id,
-                    **course
-                })
-    return courses
+    return [
+        {"id": record.key, **record.to_dict()}
+        for record in course_store.records(LISTING)
+        if ("all" in (record.for_roles or ()) or role_id in (record.for_roles or ()))
+        and (difficulty is None or (record.difficulty or "").lower().startswith(difficulty.lower()))
+    ]
 
 
 def get_scrimba_courses() -> list:
     """Get all Scrimba courses (recommended partner)"""
     return [
-        {"id": course_id, **course}
-        for course_id, course in COURSE_DATABASE.items()
-        if course.get("platform") == "Scrimba"
+        {"id": record.key, **record.to_dict()}
+        for record in course_store.records(LISTING)
+        if record.platform == "Scrimba"
     ]
 
 
 def get_free_courses() -> list:
     """Get all free courses"""
     return [
-        {"id": course_id, **course}
-        for course_id, course in COURSE_DATABASE.items()
-        if "free" in course.get("cost", "").lower()
+        {"id": record.key, **record.to_dict()}
+        for record in course_store.records(LISTING)
+        if "free" in (record.cost or "").lower()
     ]
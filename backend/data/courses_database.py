@@ -9,7 +9,9 @@ Structure:
 - Organized by skill category
 - Each course has: name, url, platform, duration, cost, difficulty, description, skills_taught
 - Courses marked with verification status
+- Loaded into the shared course store; ALL_COURSES is a read-only view of it
 """
+from data.course_store import VERIFIED, course_store
 
 # ============================================================================
 # FOUNDATIONAL COURSES - Python, Math, Stats
@@ -1606,15 +1608,20 @@ ROLE_LEARNING_PATHS = {
     }
 }
 
-# Build course lookup dictionary
-ALL_COURSES = {}
-for course_list in [FOUNDATION_COURSES, ML_COURSES, DEEP_LEARNING_COURSES, 
-                    AI_ENGINEERING_COURSES, MLOPS_COURSES, CV_COURSES, 
-                    NLP_COURSES, DATA_ENGINEERING_COURSES, CLOUD_COURSES, 
-                    INTERVIEW_COURSES, PROJECT_RESOURCES, BUSINESS_COURSES,
-                    DESIGN_COURSES, RL_COURSES, INFRA_COURSES, CONTENT_COURSES]:
-    for course in course_list:
-        ALL_COURSES[course["id"]] = course
+# Load every course into the shared course store (data/course_store.py); the
+# lists above are only the authoring format and are dropped once loaded
+ALL_COURSES = course_store.load(VERIFIED, (
+    (course["id"], course)
+    for course_list in [FOUNDATION_COURSES, ML_COURSES, DEEP_LEARNING_COURSES,
+                        AI_ENGINEERING_COURSES, MLOPS_COURSES, CV_COURSES,
+                        NLP_COURSES, DATA_ENGINEERING_COURSES, CLOUD_COURSES,
+                        INTERVIEW_COURSES, PROJECT_RESOURCES, BUSINESS_COURSES,
+                        DESIGN_COURSES, RL_COURSES, INFRA_COURSES, CONTENT_COURSES]
+    for course in course_list
+))
+del (FOUNDATION_COURSES, ML_COURSES, DEEP_LEARNING_COURSES, AI_ENGINEERING_COURSES, MLOPS_COURSES,
+     CV_COURSES, NLP_COURSES, DATA_ENGINEERING_COURSES, CLOUD_COURSES, INTERVIEW_COURSES,
+     PROJECT_RESOURCES, BUSINESS_COURSES, DESIGN_COURSES, RL_COURSES, INFRA_COURSES, CONTENT_COURSES)
 
 
 def get_course_by_id(course_id: str):
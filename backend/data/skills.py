@@ -0,0 +1,166 @@
+"""
+Skill Taxonomy Module
+Canonical skill names with the spellings we accept for them in resumes,
+job descriptions and course metadata. Shared by the resume parser, ATS
+scoring and job matching so every feature agrees on what a "skill" is.
+"""
+
+# Canonical skill name -> lowercase aliases (the canonical name itself is always matched)
+SKILL_TAXONOMY = {
+    # Languages
+    "Python": ["python3"],
+    "JavaScript": ["js", "ecmascript"],
+    "TypeScript": [],
+    "Java": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", ".net"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Scala": [],
+    "R": ["r programming", "rstudio", "r language"],
+    "MATLAB": [],
+    "SQL": ["mysql", "t-sql", "pl/sql", "sqlite"],
+    "HTML": ["html5"],
+    "CSS": ["css3", "tailwind", "sass"],
+
+    # Web & APIs
+    "React": ["react.js", "reactjs", "next.js", "nextjs"],
+    "Node.js": ["nodejs", "express.js"],
+    "FastAPI": [],
+    "Django": [],
+    "Flask": [],
+    "REST APIs": ["rest api", "restful", "restful apis"],
+    "GraphQL": [],
+    "API Integration": ["api", "apis", "api integration", "third-party apis"],
+    "Full-Stack Development": ["full-stack", "full stack", "fullstack", "full-stack dev", "full stack developer"],
+
+    # Data stores
+    "MongoDB": ["mongo"],
+    "PostgreSQL": ["postgres"],
+    "Redis": [],
+    "Vector Databases": ["vector database", "vector db", "vector dbs", "pinecone", "weaviate", "chroma", "chromadb", "faiss", "milvus", "pgvector"],
+
+    # Cloud & infrastructure
+    "AWS": ["amazon web services", "sagemaker", "ec2", "s3", "aws lambda"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform", "vertex ai", "bigquery"],
+    "Cloud Platforms": ["cloud", "cloud computing", "cloud ml"],
+    "Docker": ["containers", "containerization"],
+    "Kubernetes": ["k8s", "eks", "gke", "helm"],
+    "CI/CD": ["ci / cd", "continuous integration", "continuous delivery", "github actions", "jenkins", "gitlab ci"],
+    "Linux": ["unix", "bash", "shell scripting"],
+    "Git": ["github", "gitlab", "version control"],
+    "Distributed Systems": ["distributed computing", "microservices"],
+    "Scalability": ["scalable systems", "high availability", "performance optimization"],
+
+    # Data engineering & analytics
+    "Spark": ["pyspark", "apache spark", "databricks"],
+    "Hadoop": [],
+    "Airflow": ["apache airflow"],
+    "Data Pipelines": ["data pipeline", "etl", "elt", "data engineering"],
+    "Pandas": [],
+    "NumPy": ["numpy"],
+    "Data Analysis": ["data analytics", "analytics", "exploratory data analysis", "eda"],
+    "Data Science": [],
+    "Data Visualization": ["visualization", "dashboards", "matplotlib", "seaborn", "plotly"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Statistics": ["statistical analysis", "statistical modeling", "statistical learning", "hypothesis testing", "a/b testing", "probability"],
+    "Mathematics": ["linear algebra", "calculus", "advanced mathematics", "math"],
+    "Data Storytelling": ["storytelling with data"],
+
+    # Machine learning
+    "Machine Learning": ["ml", "machine-learning", "ml algorithms", "supervised learning", "unsupervised learning"],
+    "Deep Learning": ["neural networks", "neural network", "deep learning theory"],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["tensorflow 2"],
+    "Keras": [],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "XGBoost": ["lightgbm", "catboost", "gradient boosting"],
+    "Feature Engineering": ["feature selection", "feature extraction"],
+    "Model Optimization": ["hyperparameter tuning", "model tuning", "quantization", "model compression"],
+    "MLOps": ["ml ops", "mlflow", "kubeflow", "model deployment", "model monitoring", "weights & biases", "wandb"],
+    "Computer Vision": ["image recognition", "object detection", "computer vision theory"],
+    "CNN": ["cnns", "convolutional neural networks", "convolutional neural network"],
+    "Image Processing": ["image analysis"],
+    "OpenCV": [],
+    "NLP": ["natural language processing", "nlp theory", "text processing", "text mining"],
+    "Transformers": ["transformer", "hugging face", "huggingface"],
+    "BERT/GPT": ["bert", "gpt", "gpt-4", "gpt-3", "gpt-3.5"],
+    "Linguistics": ["computational linguistics"],
+    "Reinforcement Learning": ["rl", "rl algorithms", "policy optimization", "q-learning", "markov processes", "markov decision processes"],
+    "Game AI": ["game development"],
+
+    # Generative AI
+    "LLMs": ["llm", "large language models", "large language model", "llm mastery", "generative ai", "genai", "gen ai"],
+    "LLM APIs": ["openai", "openai api", "anthropic", "claude", "gemini api", "llm apis"],
+    "LangChain": ["langchain", "llamaindex", "llama index", "langgraph"],
+    "RAG": ["retrieval augmented generation", "retrieval-augmented generation", "rag systems", "rag pipelines"],
+    "Prompt Engineering": ["prompt design", "prompting", "prompt optimization", "prompt engineer"],
+    "AI Agents": ["ai agent", "agentic", "autonomous agents", "multi-agent systems", "multi-agent", "orchestration", "autonomous reasoning"],
+    "Fine-tuning": ["fine tuning", "finetuning", "lora", "peft", "rlhf"],
+    "No-Code AI": ["no-code", "low-code", "make.com", "zapier", "n8n", "cursor.sh", "cursor ai", "emergent.sh"],
+    "Rapid Prototyping": ["prototyping", "mvp"],
+
+    # Product, design & business
+    "Product Management": ["product manager", "product strategy", "roadmapping", "product roadmap"],
+    "AI/ML Understanding": ["ai literacy", "ai/ml"],
+    "Agile": ["scrum", "kanban", "sprint planning"],
+    "Stakeholder Management": ["stakeholders", "stakeholder communication", "client communication"],
+    "Business Strategy": ["business acumen", "ai strategy", "strategy consulting", "industry knowledge", "roi calculation", "business analysis"],
+    "AI Metrics": ["kpis", "okrs", "ai metrics"],
+    "User Research": ["usability testing", "user interviews", "ux research"],
+    "Design Thinking": ["ux design", "ui/ux", "ai ux patterns", "figma"],
+    "Content Strategy": ["content marketing", "copywriting", "personal brand", "technical writing"],
+    "Enterprise Systems": ["enterprise architecture", "solutions architecture", "ai integration"],
+
+    # Research & responsibility
+    "Research Methodology": ["research", "publications", "peer-reviewed", "arxiv"],
+    "AI Ethics": ["responsible ai", "ai safety", "ai governance"],
+    "Bias Detection": ["fairness", "bias mitigation", "model fairness"],
+    "Policy": ["public policy", "ai policy", "tech policy", "regulation"],
+}
+
+
+# Skill -> skills it builds on, used to order learning path weeks
+SKILL_PREREQUISITES = {
+    "Pandas": ["Python"],
+    "NumPy": ["Python"],
+    "Data Science": ["Python", "Statistics"],
+    "Machine Learning": ["Python", "Statistics", "Mathematics"],
+    "Scikit-learn": ["Python", "Machine Learning"],
+    "XGBoost": ["Machine Learning"],
+    "Feature Engineering": ["Machine Learning"],
+    "Model Optimization": ["Machine Learning"],
+    "Deep Learning": ["Machine Learning"],
+    "PyTorch": ["Python", "Deep Learning"],
+    "TensorFlow": ["Python", "Deep Learning"],
+    "Keras": ["Deep Learning"],
+    "CNN": ["Deep Learning"],
+    "Computer Vision": ["Deep Learning"],
+    "NLP": ["Machine Learning"],
+    "Transformers": ["Deep Learning"],
+    "BERT/GPT": ["Transformers"],
+    "Reinforcement Learning": ["Machine Learning"],
+    "MLOps": ["Machine Learning", "Docker"],
+    "Kubernetes": ["Docker"],
+    "LLM APIs": ["Python"],
+    "LangChain": ["LLM APIs"],
+    "RAG": ["LLMs", "Vector Databases"],
+    "AI Agents": ["LLM APIs"],
+    "Fine-tuning": ["Deep Learning", "LLMs"],
+    "Data Pipelines": ["SQL"],
+    "Spark": ["Python", "SQL"],
+    "Airflow": ["Python", "Data Pipelines"],
+    "Django": ["Python"],
+    "Flask": ["Python"],
+    "FastAPI": ["Python"],
+    "TypeScript": ["JavaScript"],
+    "React": ["JavaScript"],
+    "Node.js": ["JavaScript"],
+}
+
+
+def get_all_skill_names() -> list:
+    """Get every canonical skill name in the taxonomy"""
+    return list(SKILL_TAXONOMY.keys())
@@ -24,6 +24,13 @@ class ResumeData(BaseModel):
     skills: List[str] = []
     certifications: List[str] = []
     summary: Optional[str] = ""
+    # Structured fields produced by /resume/parse
+    raw_text: Optional[str] = ""
+    contact: Optional[str] = ""
+    current_role: Optional[str] = ""
+    years_experience: Optional[int] = None
+    total_years_experience: Optional[float] = None
+    education_entries: List[Dict] = []
 
 
 class BackgroundContext(BaseModel):
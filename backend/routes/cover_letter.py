@@ -1,31 +1,25 @@
 """
 Cover Letter routes - Generation, history, download
 """
-from fastapi import APIRouter, HTTPException, Depends, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Form, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
 import uuid
-import re
 import json
 import logging
 from pathlib import Path
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.enums import TA_JUSTIFY
-from docx import Document
-
 from auth import get_current_user
 from database import db
-from config import ANTHROPIC_API_KEY, DOWNLOADS_DIR
-
-# Import anthropic
-import anthropic
-claude_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+from services.cover_letters import (
+    CoverLetterResults, VariantError, generate_cover_letters, generate_variants,
+)
+from services.documents import EXPORT_FORMATS, download_filename
+from services.document_ast import build_ast
+from services.document_templates import DEFAULT_TEMPLATE, TEMPLATES
+from services.render_cache import cached_document_response
 
 router = APIRouter(prefix="/cover-letter", tags=["cover-letter"])
 
@@ -38,112 +32,8 @@ class CoverLetterRequest(BaseModel):
     tone: Optional[str] = "professional"
 
 
-def get_cover_letter_prompt():
-    """System prompt for cover letter generation - Natural, human-sounding variations"""
-    return """You are an expert career coach who writes authentic, compelling cover letters for tech professionals. Your letters sound natural and human - never robotic or templated.
-
-Generate 3 DISTINCT cover letter variations. Each should feel like it was written by a real person who genuinely cares about the role.
-
-WRITING STYLE GUIDELINES:
-- Write conversationally but professionally (like talking to a colleague, not a robot)
-- Use contractions naturally (I'm, I've, you're) to sound human
-- Vary sentence length - mix short punchy sentences with longer explanatory ones
-- Use active voice and strong verbs
-- NO corporate jargon, buzzwords, or clichés ("synergy," "leverage," "dynamic team player")
-- NO generic openings like "I am writing to express my interest..."
-- Show personality while staying professional
-
-VARIATION 1 - "TECHNICAL DEPTH"
-Tone: Conversational but technically credible
-Focus: Demonstrate deep technical expertise through specific examples
-Opening: Lead with a technical observation about their product/stack or a relevant project you built
-Example: "I've been following [Company]'s work on [specific tech]. When I saw you're hiring, I knew I had to reach out - I recently built something similar that [specific achievement]."
-
-VARIATION 2 - "IMPACT & RESULTS"  
-Tone: Confident and results-oriented (but not arrogant)
-Focus: Quantifiable business impact and problem-solving
-Opening: Lead with a relevant achievement or problem you've solved
-Example: "Last quarter, I reduced our ML model's inference time by 60%, saving $200K annually. When I saw [Company] is tackling [similar challenge], I got excited."
-
-VARIATION 3 - "AUTHENTIC CONNECTION"
-Tone: Warm, genuine, story-driven
-Focus: Personal connection to company mission and collaborative mindset
-Opening: Lead with why you care about what they're building
-Example: "I've been a [Company] user for [time] and [specific feature] changed how I work. The chance to build this is why I got into ML."
-
-CRITICAL REQUIREMENTS:
-1. **Sound Human**: Read each letter aloud - if it sounds like a robot wrote it, rewrite it
-2. **Be Specific**: Use actual numbers, technologies, and project names from the resume
-3. **Show, Don't Tell**: Instead of "I'm passionate," say "I spent weekends building X because..."
-4. **Natural Keywords**: Weave in 6-8 keywords from job description organically
-5. **Length**: 250-300 words (shorter is better - hiring managers are busy)
-
-AVOID:
-- "I am writing to apply for..."
-- "I am excited to submit my application..."
-- "I believe I would be a great fit..."
-- Listing skills without context
-- Generic enthusiasm ("passionate," "excited," "thrilled")
-- Overly formal language
-
-OUTPUT FORMAT (JSON):
-{
-    "versions": [
-        {
-            "version_name": "Technical Depth",
-            "tone_applied": "conversational_technical",
-            "emphasis_area": "technical_expertise",
-            "cover_letter": "[Full letter text]",
-            "key_highlights": ["achievement 1", "achievement 2", "achievement 3"],
-            "keywords_used": ["keyword1", "keyword2", ...],
-            "word_count": 280,
-            "ats_score": 90
-        },
-        {
-            "version_name": "Impact & Results",
-            "tone_applied": "confident_results",
-            "emphasis_area": "business_impact",
-            "cover_letter": "[Full letter text]",
-            "key_highlights": ["impact 1", "impact 2", "impact 3"],
-            "keywords_used": ["keyword1", "keyword2", ...],
-            "word_count": 270,
-            "ats_score": 88
-        },
-        {
-            "version_name": "Authentic Connection",
-            "tone_applied": "warm_genuine",
-            "emphasis_area": "culture_mission_fit",
-            "cover_letter": "[Full letter text]",
-            "key_highlights": ["connection 1", "connection 2", "connection 3"],
-            "keywords_used": ["keyword1", "keyword2", ...],
-            "word_count": 265,
-            "ats_score": 85
-        }
-    ],
-    "company_research": {
-        "company_name": "Company Name",
-        "products_mentioned": ["product1", "product2"],
-        "why_compelling": "Brief note on what makes this company interesting"
-    },
-    "job_match_analysis": {
-        "match_score": 85,
-        "matching_skills": ["skill1", "skill2", "skill3"],
-        "skills_emphasized": ["skill1", "skill2", "skill3"],
-        "potential_gaps": ["gap1"]
-    }
-}
-
-REMEMBER: Write like a human, not a corporate robot. Be specific, be authentic, be concise.
-"""
-
-
-@router.post("/generate")
-async def generate_cover_letter(
-    request: CoverLetterRequest,
-    user: dict = Depends(get_current_user)
-):
-    """Generate personalized cover letters based on resume and job description"""
-    
+async def check_cover_letter_quota(user: dict) -> tuple:
+    """(cover_letters_used, is_pro) for this month - raises 403 when a free user is out of letters"""
     current_month = datetime.now(timezone.utc)
     usage = await db.usage.find_one({
         "user_id": user["id"],
@@ -172,68 +62,13 @@ async def generate_cover_letter(
                 "upgrade_options": {"pro": "$9.99/month unlimited"}
             }
         )
-    
-    user_message = f"""
-Generate 3 DISTINCT cover letter variations for this job application:
-
-COMPANY: {request.company_name or "Not specified"}
-TARGET ROLE: {request.target_role or "AI/ML Position"}
-
-JOB DESCRIPTION:
-{request.job_description[:4000]}
-
-CANDIDATE'S RESUME:
-{request.resume_text[:4000]}
-
-IMPORTANT REQUIREMENTS:
-1. Generate all 3 variations as specified in the system prompt:
-   - Technical Expert (professional tone)
-   - Problem Solver (confident tone)
-   - Culture Champion (story-driven tone)
+    return cover_letters_used, is_pro
 
-2. Each variation must:
-   - Be 300-350 words
-   - Have a unique opening hook
-   - Include specific company research
-   - Use 8-12 keywords from the job description
-   - Reference specific examples from the resume with metrics
-   - Feel completely different from the other variations
 
-3. Research the company based on the company name and job description to include:
-   - Specific products, technologies, or initiatives
-   - Company mission, values, or culture
-   - Recent news or developments (if inferable from context)
-
-Make these the BEST, most personalized cover letters that will get interviews.
-"""
-    
-    try:
-        response = claude_client.messages.create(
-            model="claude-sonnet-4-20250514",  # Sonnet handles complex variations better
-            max_tokens=4000,  # Optimized for 3 variations
-            system=get_cover_letter_prompt(),
-            messages=[{"role": "user", "content": user_message}]
-        )
-        
-        response_text = response.content[0].text
-        response_text = re.sub(r'```json\s*', '', response_text)
-        response_text = re.sub(r'```\s*', '', response_text)
-        
-        cover_letter_data = json.loads(response_text)
-        
-        # Validate that we have 3 versions
-        if "versions" not in cover_letter_data or len(cover_letter_data.get("versions", [])) != 3:
-            logging.error(f"Cover letter did not return 3 variations: {cover_letter_data.keys()}")
-            raise HTTPException(status_code=500, detail="Failed to generate 3 cover letter variations")
-            
-    except json.JSONDecodeError as e:
-        logging.error(f"Cover letter JSON parse error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to parse cover letter response")
-    except Exception as e:
-        logging.error(f"Cover letter generation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Cover letter generation failed: {str(e)}")
-    
+async def save_cover_letters(user: dict, request: CoverLetterRequest, cover_letter_data: dict, is_pro: bool) -> str:
+    """Count usage and store the generated versions; returns the cover letter id"""
     if not is_pro:
+        current_month = datetime.now(timezone.utc)
         await db.usage.update_one(
             {"user_id": user["id"], "month": current_month.month, "year": current_month.year},
             {"$inc": {"cover_letters_used": 1}},
@@ -253,6 +88,26 @@ Make these the BEST, most personalized cover letters that will get interviews.
         "job_match_analysis": cover_letter_data.get("job_match_analysis", {}),
         "created_at": datetime.now(timezone.utc).isoformat()
     })
+    return cover_letter_id
+
+
+@router.post("/generate")
+async def generate_cover_letter(
+    request: CoverLetterRequest,
+    user: dict = Depends(get_current_user)
+):
+    """Generate personalized cover letters based on resume and job description"""
+    cover_letters_used, is_pro = await check_cover_letter_quota(user)
+    
+    try:
+        cover_letter_data = await generate_cover_letters(
+            request.company_name, request.target_role, request.job_description, request.resume_text
+        )
+    except VariantError as e:
+        logging.error(f"Cover letter generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Cover letter generation failed: {str(e)}")
+    
+    cover_letter_id = await save_cover_letters(user, request, cover_letter_data, is_pro)
     
     return {
         "cover_letter_id": cover_letter_id,
@@ -262,6 +117,7 @@ Make these the BEST, most personalized cover letters that will get interviews.
         "versions": cover_letter_data.get("versions", []),
         "company_research": cover_letter_data.get("company_research", {}),
         "job_match_analysis": cover_letter_data.get("job_match_analysis", {}),
+        "failed_variants": cover_letter_data.get("failed_variants", []),
         "usage": {
             "used": cover_letters_used + 1 if not is_pro else cover_letters_used,
             "limit": 999 if is_pro else 1
@@ -269,6 +125,58 @@ Make these the BEST, most personalized cover letters that will get interviews.
     }
 
 
+@router.post("/generate-stream")
+async def generate_cover_letter_stream(
+    request: CoverLetterRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Generate the cover letter variations concurrently and stream each one as it completes.
+    
+    Response is NDJSON: one {"type": "variant"} (or "variant_error") line per
+    variation in completion order, then a final {"type": "complete"} line with
+    the saved cover_letter_id - or {"type": "error"} if every variation failed.
+    """
+    cover_letters_used, is_pro = await check_cover_letter_quota(user)
+    
+    async def stream_variants():
+        results = CoverLetterResults()
+        try:
+            async for index, version, research, error in generate_variants(
+                request.company_name, request.target_role, request.job_description, request.resume_text
+            ):
+                results.add(index, version, research, error)
+                if error:
+                    yield json.dumps({"type": "variant_error", "index": index, "error": error}) + "\n"
+                else:
+                    yield json.dumps({"type": "variant", "index": index, "version": version}) + "\n"
+        except VariantError as e:
+            results.errors.append(str(e))
+        except Exception as e:
+            # Save the variations that were already streamed
+            logging.exception("Cover letter stream failed")
+            results.errors.append(str(e))
+        
+        try:
+            cover_letter_data = results.result(request.resume_text, request.job_description)
+        except VariantError as e:
+            yield json.dumps({"type": "error", "detail": f"Cover letter generation failed: {str(e)}"}) + "\n"
+            return
+        
+        cover_letter_id = await save_cover_letters(user, request, cover_letter_data, is_pro)
+        yield json.dumps({
+            "type": "complete",
+            "cover_letter_id": cover_letter_id,
+            **cover_letter_data,
+            "usage": {
+                "used": cover_letters_used + 1 if not is_pro else cover_letters_used,
+                "limit": 999 if is_pro else 1
+            }
+        }) + "\n"
+    
+    return StreamingResponse(stream_variants(), media_type="application/x-ndjson")
+
+
 @router.get("/history")
 async def get_cover_letter_history(user: dict = Depends(get_current_user)):
     """Get user's cover letter history"""
@@ -295,14 +203,16 @@ class CoverLetterDownloadRequest(BaseModel):
     cover_letter_id: str
     version_index: int = 0
     format: str = "pdf"
+    template: str = DEFAULT_TEMPLATE
 
 
 @router.post("/download")
 async def download_cover_letter(
     request: CoverLetterDownloadRequest,
+    if_none_match: Optional[str] = Header(None),
     user: dict = Depends(get_current_user)
 ):
-    """Download cover letter as PDF or DOCX"""
+    """Download cover letter as PDF, DOCX, plain text or Markdown"""
     cover_letter = await db.cover_letters.find_one(
         {"id": request.cover_letter_id, "user_id": user["id"]},
         {"_id": 0}
@@ -318,53 +228,15 @@ async def download_cover_letter(
     version = versions[request.version_index]
     cover_letter_text = version.get("cover_letter", "")
     
-    file_id = str(uuid.uuid4())[:8]
+    format = request.format if request.format in EXPORT_FORMATS else "pdf"
+    if request.template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {request.template}")
     
-    if request.format == "docx":
-        filename = f"cover_letter_{file_id}.docx"
-        filepath = DOWNLOADS_DIR / filename
-        
-        doc = Document()
-        doc.add_paragraph(cover_letter_text)
-        doc.save(str(filepath))
-    else:
-        filename = f"cover_letter_{file_id}.pdf"
-        filepath = DOWNLOADS_DIR / filename
-        
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
-        )
-        
-        styles = getSampleStyleSheet()
-        body_style = ParagraphStyle(
-            'CoverLetterBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            spaceAfter=12,
-            alignment=TA_JUSTIFY
-        )
-        
-        story = []
-        paragraphs = cover_letter_text.split('\n\n')
-        for para in paragraphs:
-            if para.strip():
-                story.append(Paragraph(para.strip(), body_style))
-                story.append(Spacer(1, 12))
-        
-        doc.build(story)
-    
-    return FileResponse(
-        path=str(filepath),
-        filename=filename,
-        media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}",
-            "X-Download-Success": "true"
-        }
+    return await cached_document_response(
+        "cover_letter",
+        format,
+        [build_ast("cover_letter", cover_letter_text)["blocks"], request.template],
+        download_filename("cover_letter", format),
+        if_none_match,
+        headers={"X-Download-Success": "true"}
     )
@@ -1,34 +1,26 @@
 """
 CV/Resume routes - Generation, history, download
 """
-from fastapi import APIRouter, HTTPException, Depends, Form, File, UploadFile, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Form, File, UploadFile, Query, Header
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
 import re
 import json
 import logging
-from pathlib import Path
-from io import BytesIO
-
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.colors import HexColor, black
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 from auth import get_current_user
 from database import db
-from config import ANTHROPIC_API_KEY, DOWNLOADS_DIR, FREE_LIMITS
+from config import ANTHROPIC_API_KEY, FREE_LIMITS
+from services.documents import EXPORT_FORMATS, download_filename
+from services.document_ast import ast_is_current, build_ast
+from services.document_templates import DEFAULT_TEMPLATE, TEMPLATES, list_templates
+from services.render_cache import cached_document_response
 
 # Import shared analysis function for consistent scoring
 from routes.resume import analyze_resume_for_role
+from services.resume_parser import parse_resume_structured, format_resume_summary
 
 # Import anthropic
 import anthropic
@@ -179,96 +171,6 @@ def get_region_standards(region: str, exp_level: str, tier: int) -> str:
     return standards.get(region, standards["us"])
 
 
-def generate_cv_pdf(cv_data: Dict, cv_type: str, target_role: str, user_name: str = "User") -> str:
-    """Generate PDF from CV data"""
-    file_id = str(uuid.uuid4())[:8]
-    filename = f"cv_{cv_type}_{file_id}.pdf"
-    filepath = DOWNLOADS_DIR / filename
-    
-    doc = SimpleDocTemplate(
-        str(filepath),
-        pagesize=letter,
-        rightMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        topMargin=0.5*inch,
-        bottomMargin=0.5*inch
-    )
-    
-    styles = getSampleStyleSheet()
-    
-    name_style = ParagraphStyle(
-        'Name',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=6,
-        alignment=TA_CENTER
-    )
-    
-    section_style = ParagraphStyle(
-        'Section',
-        parent=styles['Heading2'],
-        fontSize=11,
-        spaceBefore=10,
-        spaceAfter=4,
-        textColor=HexColor('#1a365d')
-    )
-    
-    body_style = ParagraphStyle(
-        'Body',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12,
-        spaceAfter=3
-    )
-    
-    story = []
-    
-    content = cv_data.get("content", "")
-    lines = content.split('\n')
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            story.append(Spacer(1, 6))
-        elif i == 0 or line.isupper():
-            story.append(Paragraph(line, name_style if i == 0 else section_style))
-        else:
-            # Clean up bullets
-            if line.startswith('•') or line.startswith('-'):
-                line = '• ' + line.lstrip('•-').strip()
-            story.append(Paragraph(line, body_style))
-    
-    doc.build(story)
-    return str(filepath)
-
-
-def generate_cv_docx(cv_data: Dict, cv_type: str, target_role: str, user_name: str = "User") -> str:
-    """Generate DOCX from CV data"""
-    file_id = str(uuid.uuid4())[:8]
-    filename = f"cv_{cv_type}_{file_id}.docx"
-    filepath = DOWNLOADS_DIR / filename
-    
-    doc = Document()
-    
-    content = cv_data.get("content", "")
-    lines = content.split('\n')
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            continue
-        elif i == 0:
-            para = doc.add_heading(line, level=0)
-            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        elif line.isupper():
-            doc.add_heading(line, level=1)
-        else:
-            doc.add_paragraph(line)
-    
-    doc.save(str(filepath))
-    return str(filepath)
-
-
 @router.post("/generate")
 async def generate_cv_standalone(
     request: CVGenerationRequest,
@@ -315,6 +217,10 @@ async def generate_cv_standalone(
     
     region_standards = get_region_standards(request.target_region, request.experience_level, request.tier)
     
+    # Send a structured summary when the resume parses cleanly - same facts, far fewer tokens
+    parsed_resume = parse_resume_structured(request.resume_text)
+    resume_for_prompt = format_resume_summary(parsed_resume, max_bullets=8, max_chars=5000)
+    
     # Build comprehensive user message for SUPERIOR resume
     user_message = f"""Create the ULTIMATE HYBRID RESUME for this candidate targeting: {target_role['name']}
 
@@ -326,7 +232,7 @@ Target Region: {request.target_country or request.region_name}
 Regional Standards: {region_standards}
 
 === CANDIDATE'S CURRENT RESUME ===
-{request.resume_text[:5000]}
+{resume_for_prompt}
 
 === YOUR TASK ===
 Transform this resume into a SUPERIOR hybrid version that:
@@ -464,7 +370,8 @@ Make this the BEST resume this candidate has ever had."""
     # IMPORTANT: Run the same analysis used by Scanner for consistent, REAL scores
     # This replaces the self-proclaimed scores with verified analysis
     try:
-        verified_analysis = await analyze_resume_for_role(hybrid_content, request.target_role_id)
+        verified_analysis = await analyze_resume_for_role(hybrid_content, request.target_role_id, narrative=True)
+        verified_analysis.pop("sections", None)
         
         # Update the version with VERIFIED scores (not self-proclaimed)
         if cv_data.get("versions"):
@@ -507,6 +414,12 @@ Make this the BEST resume this candidate has ever had."""
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
+    # Parse each version once - every download format is emitted from this
+    cv_record["document_ast"] = {
+        v["type"]: build_ast("cv", v.get("content", ""))
+        for v in cv_record["versions"] if v.get("type")
+    }
+    
     await db.cv_generations.insert_one(cv_record)
     
     # Return with both new and legacy formats
@@ -538,12 +451,18 @@ Make this the BEST resume this candidate has ever had."""
     }
 
 
+@router.get("/templates")
+async def get_cv_templates():
+    """Visual templates available for CV, cover letter and learning path downloads"""
+    return {"templates": list_templates(), "default": DEFAULT_TEMPLATE}
+
+
 @router.get("/history")
 async def get_cv_history(user: dict = Depends(get_current_user)):
     """Get user's CV generation history"""
     cvs = await db.cv_generations.find(
         {"user_id": user["id"]},
-        {"_id": 0}
+        {"_id": 0, "document_ast": 0}
     ).sort("created_at", -1).to_list(50)
     return {"cv_generations": cvs}
 
@@ -553,7 +472,7 @@ async def get_cv(cv_id: str, user: dict = Depends(get_current_user)):
     """Get specific CV generation"""
     cv = await db.cv_generations.find_one(
         {"id": cv_id, "user_id": user["id"]},
-        {"_id": 0}
+        {"_id": 0, "document_ast": 0}
     )
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
@@ -565,9 +484,16 @@ async def download_cv(
     cv_id: str,
     cv_type: str = Form("hybrid"),
     format: str = Form("pdf"),
+    template: str = Form(DEFAULT_TEMPLATE),
+    if_none_match: Optional[str] = Header(None),
     user: dict = Depends(get_current_user)
 ):
-    """Download CV as PDF or DOCX"""
+    """Download CV as PDF, DOCX, plain text or Markdown in one of the visual templates"""
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
+    if format not in EXPORT_FORMATS:
+        format = "pdf"
+    
     cv = await db.cv_generations.find_one(
         {"id": cv_id, "user_id": user["id"]},
         {"_id": 0}
@@ -582,25 +508,23 @@ async def download_cv(
     if not cv_data:
         raise HTTPException(status_code=404, detail="CV version not found")
     
-    target_role = cv.get("target_role", "AI Role")
-    user_name = user.get("name", "User")
-    
     try:
-        if format == "docx":
-            filepath = generate_cv_docx(cv_data, cv_type, target_role, user_name)
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        else:
-            filepath = generate_cv_pdf(cv_data, cv_type, target_role, user_name)
-            media_type = "application/pdf"
-        
-        filename = Path(filepath).name
+        # Reuse the stored document AST; rebuild it for older records or a newer parser
+        content = cv_data.get("content", "")
+        version_type = cv_data.get("type", cv_type)
+        ast = (cv.get("document_ast") or {}).get(version_type)
+        if not ast_is_current(ast, "cv", content):
+            ast = build_ast("cv", content)
+            await db.cv_generations.update_one(
+                {"id": cv_id},
+                {"$set": {f"document_ast.{version_type}": ast}}
+            )
         
-        return FileResponse(
-            path=filepath,
-            filename=filename,
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        return await cached_document_response(
+            "cv", format, [ast["blocks"], template], download_filename(f"cv_{version_type}", format), if_none_match
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"CV download error: {e}")
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
@@ -617,28 +541,24 @@ async def download_cv_direct(
     cv_version: str = Query("hybrid"),
     format: str = Query("pdf"),
     target_role: str = Query("AI Role"),
+    template: str = Query(DEFAULT_TEMPLATE),
+    if_none_match: Optional[str] = Header(None),
     user: dict = Depends(get_current_user)
 ):
     """Download CV directly from content without saving"""
-    cv_data = {"content": request.cv_content, "type": cv_version}
-    user_name = request.user_name or user.get("name", "User")
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
+    if format not in EXPORT_FORMATS:
+        format = "pdf"
     
     try:
-        if format == "docx":
-            filepath = generate_cv_docx(cv_data, cv_version, target_role, user_name)
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        else:
-            filepath = generate_cv_pdf(cv_data, cv_version, target_role, user_name)
-            media_type = "application/pdf"
-        
-        filename = Path(filepath).name
+        blocks = build_ast("cv", request.cv_content)["blocks"]
         
-        return FileResponse(
-            path=filepath,
-            filename=filename,
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        return await cached_document_response(
+            "cv", format, [blocks, template], download_filename(f"cv_{cv_version}", format), if_none_match
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Direct CV download error: {e}")
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
@@ -0,0 +1,37 @@
+"""
+File routes - signed downloads for the local storage backend
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from services import storage as storage_module
+from services.documents import MEDIA_TYPES
+from services.storage import LocalStorage, StorageError
+
+router = APIRouter(prefix="/files", tags=["files"])
+
+
+@router.get("/{key:path}")
+async def download_stored_file(key: str, filename: str, expires: int, signature: str):
+    """Serve a stored document; the signed URL is the authorization, so no bearer token is needed"""
+    storage = storage_module.storage
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    if not storage.verify(key, filename, expires, signature):
+        raise HTTPException(status_code=403, detail="Download link is invalid or has expired")
+    
+    try:
+        path = storage.path(key)
+    except StorageError:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    extension = filename.rsplit('.', 1)[-1]
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES.get(extension, "application/octet-stream"),
+        filename=filename,
+        headers={"Cache-Control": "private, max-age=300"}
+    )
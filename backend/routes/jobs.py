@@ -12,6 +12,8 @@ import asyncio
 from auth import get_current_user
 from database import db
 from config import ADZUNA_APP_ID, ADZUNA_APP_KEY, RESEND_API_KEY, SENDER_EMAIL
+from services.cover_letters import generate_cover_letters
+from services.job_analysis import job_analyses
 
 # Import resend for email notifications
 try:
@@ -342,70 +344,14 @@ async def prepare_job_application(
     
     resume_text = latest_resume.get("raw_text", "")
     
-    # Import cover letter generation logic
-    from routes.cover_letter import get_cover_letter_prompt
-    import anthropic
-    from config import ANTHROPIC_API_KEY
-    import re
-    import json
-    
-    claude_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
-    
-    if not claude_client:
-        raise HTTPException(status_code=500, detail="AI service not configured")
-    
-    user_message = f"""
-Generate 3 DISTINCT cover letter variations for this job application:
-
-COMPANY: {request.company}
-TARGET ROLE: {request.job_title}
-
-JOB DESCRIPTION:
-{request.job_description[:4000] if request.job_description else "Not provided"}
-
-CANDIDATE'S RESUME:
-{resume_text[:4000]}
-
-IMPORTANT REQUIREMENTS:
-1. Generate all 3 variations as specified in the system prompt:
-   - Technical Expert (professional tone)
-   - Problem Solver (confident tone)
-   - Culture Champion (story-driven tone)
-
-2. Each variation must:
-   - Be 300-350 words
-   - Have a unique opening hook
-   - Include specific company research
-   - Use 8-12 keywords from the job description
-   - Reference specific examples from the resume with metrics
-   - Feel completely different from the other variations
-
-3. Research the company based on the company name and job description to include:
-   - Specific products, technologies, or initiatives
-   - Company mission, values, or culture
-   - Recent news or developments (if inferable from context)
-
-Make these the BEST, most personalized cover letters that will get interviews.
-"""
-    
     try:
-        response = claude_client.messages.create(
-            model="claude-sonnet-4-20250514",  # Sonnet handles complex variations better
-            max_tokens=4000,  # Optimized for 3 variations
-            system=get_cover_letter_prompt(),
-            messages=[{"role": "user", "content": user_message}]
+        # Analyzed once per posting and shared by everyone applying to it
+        job_analysis = await job_analyses.get(
+            request.job_id, request.company, request.job_title, request.job_description or ""
+        )
+        cover_letter_data = await generate_cover_letters(
+            request.company, request.job_title, request.job_description or "", resume_text, job_analysis
         )
-        
-        response_text = response.content[0].text
-        response_text = re.sub(r'```json\s*', '', response_text)
-        response_text = re.sub(r'```\s*', '', response_text)
-        
-        cover_letter_data = json.loads(response_text)
-        
-        # Validate that we have 3 versions
-        if "versions" not in cover_letter_data or len(cover_letter_data.get("versions", [])) != 3:
-            logging.error(f"Cover letter did not return 3 variations: {cover_letter_data.keys()}")
-            raise HTTPException(status_code=500, detail="Failed to generate 3 cover letter variations")
         
         # Save to database
         cover_letter_id = str(uuid.uuid4())
@@ -430,12 +376,10 @@ Make these the BEST, most personalized cover letters that will get interviews.
             "versions": cover_letter_data.get("versions", []),
             "company_research": cover_letter_data.get("company_research", {}),
             "job_match_analysis": cover_letter_data.get("job_match_analysis", {}),
-            "message": "Generated 3 distinct cover letter variations"
+            "failed_variants": cover_letter_data.get("failed_variants", []),
+            "message": f"Generated {len(cover_letter_data['versions'])} distinct cover letter variations"
         }
         
-    except json.JSONDecodeError as e:
-        logging.error(f"Cover letter JSON parse error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to parse cover letter response")
     except Exception as e:
         logging.error(f"Cover letter generation error: {e}")
         raise HTTPException(status_code=500, detail=f"Cover letter generation failed: {str(e)}")
@@ -1,10 +1,9 @@
 """
 Learning Path routes - Generation, progress tracking, downloads
 """
-from fastapi import APIRouter, HTTPException, Depends, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Form, Header
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 import uuid
 import re
@@ -12,19 +11,24 @@ import json
 import logging
 from pathlib import Path
 from io import BytesIO
-
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.colors import HexColor
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from pymongo import ReturnDocument
 
 from auth import get_current_user
 from database import db
-from config import ANTHROPIC_API_KEY, DOWNLOADS_DIR, FREE_LIMITS
+from config import ANTHROPIC_API_KEY, FREE_LIMITS
+from services.documents import EXPORT_FORMATS, download_filename
+from services.document_ast import build_ast
+from services.document_templates import DEFAULT_TEMPLATE, TEMPLATES
+from services.render_cache import cached_document_response
+from services.learning_paths import (
+    build_skeleton, get_skeleton, learning_path_templates, plan_weeks, render_learning_path, template_ref,
+    thaw,
+)
+from services.learning_progress import (
+    COURSE_PROGRESS_PROJECTION, WEEK_PROGRESS_PROJECTION, course_progress_filter, course_progress_update,
+    progress_counters, week_progress_filter, week_progress_update,
+)
+from data.courses_database import ROLE_LEARNING_PATHS
 
 # Import anthropic
 import anthropic
@@ -56,7 +60,7 @@ class WeekProgressUpdate(BaseModel):
 
 class CourseProgressUpdate(BaseModel):
     week: int
-    course_index: int
+    course_index: int = Field(..., ge=0)
     completed: bool
     notes: Optional[str] = None
 
@@ -84,191 +88,29 @@ def build_verified_learning_path(
     hours_per_week: int,
     budget: str,
     current_role: str = None
-) -> Dict:
+) -> Tuple[Dict, Optional[Dict], Optional[List]]:
     """
     Build a learning path using VERIFIED courses from our database.
     No AI hallucinations - only real courses with working URLs.
     Each week has ONE focused course - no repetition.
-    """
-    from data.courses_database import ALL_COURSES, get_course_by_id
-    
-    # Filter courses by budget preference
-    def course_matches_budget(course, budget):
-        if budget == "free":
-            return course.get("cost_type") in ["free", "freemium"]
-        return True
-    
-    # Build weeks from role path
-    weeks = []
+    Roles in ROLE_LEARNING_PATHS use their precomputed skeleton (services/learning_paths.py).
+    Weeks the current skills already cover are skipped or compressed (plan_weeks).
     
-    if role_path and role_path.get("weekly_curriculum"):
-        for week_data in role_path["weekly_curriculum"]:
-            week_num = week_data["week"]
-            theme = week_data["theme"]
-            focus = week_data["focus"]
-            course_ids = week_data.get("courses", [])
-            
-            # Get actual course objects
-            week_courses = []
-            for course_id in course_ids:
-                course = get_course_by_id(course_id)
-                if course:
-                    # For free budget, mark paid courses as "optional"
-                    is_optional = budget == "free" and course.get("cost_type") == "paid"
-                    week_courses.append({
-                        "id": course.get("id"),
-                        "name": course["name"],
-                        "platform": course["platform"],
-                        "url": course["url"],
-                        "duration_hours": course.get("duration_hours", 5),
-                        "cost": course.get("cost", "Free"),
-                        "cost_type": course.get("cost_type", "free"),
-                        "badge": course.get("badge", ""),
-                        "rating": course.get("rating", 4.5),
-                        "instructor": course.get("instructor", ""),
-                        "description": course.get("description", ""),
-                        "skills_taught": course.get("skills_taught", []),
-                        "why_recommended": course.get("why_recommended", ""),
-                        "is_optional": is_optional
-                    })
-            
-            # Add week entry
-            weeks.append({
-                "week": week_num,
-                "theme": theme,
-                "focus": focus,
-                "hours": hours_per_week,
-                "courses": week_courses,
-                "project": {
-                    "name": f"Week {week_num}: {theme} Project",
-                    "description": f"Apply {theme.lower()} concepts in a hands-on project",
-                    "skills_practiced": week_courses[0].get("skills_taught", ["Python"])[:3] if week_courses else ["Python"]
-                },
-                "milestone": focus
-            })
+    Returns (path_data, template_ref of the skeleton used, week_plan). The ref is
+    None for a curriculum built on the fly, which has no stored template.
+    """
+    if role_path is None or role_path is ROLE_LEARNING_PATHS.get(target_role_id):
+        role_id = target_role_id if role_path else None
+        skeleton, path_template = get_skeleton(role_id, budget), template_ref(role_id, budget)
     else:
-        # Fallback for unknown roles - generic path
-        fallback_sequence = [
-            (1, "Python Foundations", "py-001", "Master Python basics"),
-            (2, "Math for ML", "math-002", "Linear algebra intuition"),
-            (3, "Statistics", "stats-001", "Statistical foundations"),
-            (4, "ML Quick Start", "ml-003", "Google ML Crash Course"),
-            (5, "ML Foundations", "ml-001", "Andrew Ng's ML course"),
-            (6, "Practical ML", "ml-002", "fast.ai approach"),
-            (7, "Deep Learning", "dl-001", "Neural networks"),
-            (8, "PyTorch", "dl-002", "PyTorch framework"),
-            (9, "AI Engineering", "ai-001", "Scrimba AI Engineer"),
-            (10, "LangChain", "ai-002", "Build with LangChain"),
-            (11, "MLOps", "mlops-002", "Made With ML"),
-            (12, "Interview Prep", "int-001", "Ace the interview"),
-        ]
-        
-        for week_num, theme, course_id, focus in fallback_sequence:
-            course = get_course_by_id(course_id)
-            if course and course_matches_budget(course, budget):
-                weeks.append({
-                    "week": week_num,
-                    "theme": theme,
-                    "focus": focus,
-                    "hours": hours_per_week,
-                    "courses": [{
-                        "id": course.get("id"),
-                        "name": course["name"],
-                        "platform": course["platform"],
-                        "url": course["url"],
-                        "duration_hours": course.get("duration_hours", 5),
-                        "cost": course.get("cost", "Free"),
-                        "cost_type": course.get("cost_type", "free"),
-                        "badge": course.get("badge", ""),
-                        "rating": course.get("rating", 4.5),
-                        "description": course.get("description", ""),
-                        "skills_taught": course.get("skills_taught", [])
-                    }],
-                    "project": {
-                        "name": f"Week {week_num} Project",
-                        "description": f"Apply {theme.lower()} concepts",
-                        "skills_practiced": ["Python", "ML"]
-                    },
-                    "milestone": focus
-                })
-    
-    # Build complete path data
-    path_data = {
-        "path_overview": {
-            "target_role": target_role_name,
-            "target_role_id": target_role_id,
-            "duration_weeks": len(weeks),
-            "hours_per_week": hours_per_week,
-            "total_hours": len(weeks) * hours_per_week,
-            "experience_level": experience_level,
-            "current_role": current_role,
-            "budget_preference": budget,
-            "difficulty_progression": "Beginner → Intermediate → Advanced → Production"
-        },
-        "weeks": weeks,
-        "fast_track": {
-            "enabled": True,
-            "title": "⚡ Fast Track Your Learning",
-            "description": "Complete your journey 3x faster with interactive, hands-on courses",
-            "courses": [
-                {
-                    "name": "The AI Engineer Path",
-                    "platform": "Scrimba",
-                    "url": "https://scrimba.com/the-ai-engineer-path-c02v?via=u436b310",
-                    "description": "Complete AI curriculum - OpenAI, LangChain, RAG, Agents",
-                    "duration": "40 hours",
-                    "why": "Interactive coding. Build real AI apps while learning.",
-                    "badge": "🔥 #1 AI Course"
-                },
-                {
-                    "name": "Learn Python",
-                    "platform": "Scrimba",
-                    "url": "https://scrimba.com/learn-python-c03?via=u436b310",
-                    "description": "Python from scratch with interactive exercises",
-                    "duration": "15 hours",
-                    "why": "Code in your browser. No setup needed.",
-                    "badge": "🎯 Interactive"
-                }
-            ],
-            "benefits": [
-                "✅ Interactive coding in browser",
-                "✅ Build real projects",
-                "✅ AI-focused curriculum",
-                "✅ Up-to-date content (2024-2025)"
-            ]
-        },
-        "career_readiness_checklist": [
-            "✅ Complete all course projects",
-            "✅ Build 3-5 portfolio projects on GitHub",
-            "✅ Achieve top 20% in a Kaggle competition",
-            "✅ Update LinkedIn with new skills",
-            "✅ Practice 50+ interview questions",
-            "✅ Network with ML engineers on LinkedIn/Twitter"
-        ],
-        "recommended_tools": [
-            "VS Code with Python extensions",
-            "Jupyter Notebooks",
-            "Git & GitHub",
-            "Google Colab (free GPU)",
-            "Weights & Biases (experiment tracking)"
-        ],
-        "communities_to_join": [
-            {"name": "r/MachineLearning", "url": "https://reddit.com/r/MachineLearning"},
-            {"name": "MLOps Community", "url": "https://mlops.community/"},
-            {"name": "Hugging Face Discord", "url": "https://huggingface.co/join/discord"},
-            {"name": "fast.ai Forums", "url": "https://forums.fast.ai/"}
-        ],
-        "interview_prep": {
-            "technical": ["ML algorithms", "System design", "Coding challenges"],
-            "behavioral": ["STAR method", "Project walkthroughs"],
-            "resources": [
-                {"name": "Ace the Data Science Interview", "url": "https://www.acethedatascienceinterview.com/"},
-                {"name": "ML System Design Primer", "url": "https://github.com/chiphuyen/machine-learning-systems-design"}
-            ]
-        }
-    }
-    
-    return path_data
+        # A curriculum that isn't in the database - nothing precomputed for it
+        skeleton, path_template = build_skeleton(role_path, budget), None
+    week_plan = plan_weeks(skeleton, current_skills)
+    path_data = render_learning_path(
+        skeleton, target_role_name, target_role_id, experience_level, hours_per_week, budget, current_role,
+        week_plan=week_plan
+    )
+    return path_data, path_template, week_plan
 
 
 @router.post("/generate")
@@ -280,9 +122,7 @@ async def generate_learning_path_standalone(
     
     # Import verified course database
     from data.roles import AI_ROLES
-    from data.courses_database import (
-        ROLE_LEARNING_PATHS, ALL_COURSES, get_course_by_id, get_role_path
-    )
+    from data.courses_database import get_role_path
     
     # Resolve target_role from target_role_id
     target_role_id = request.target_role_id
@@ -343,7 +183,7 @@ async def generate_learning_path_standalone(
     role_path = get_role_path(target_role_id) if target_role_id else None
     
     # Build learning path from verified courses
-    path_data = build_verified_learning_path(
+    path_data, path_template, week_plan = build_verified_learning_path(
         role_path=role_path,
         target_role_name=target_role_name,
         target_role_id=target_role_id,
@@ -353,6 +193,24 @@ async def generate_learning_path_standalone(
         budget=request.budget,
         current_role=request.current_role
     )
+    if path_template:
+        # Stored as a reference to the shared skeleton plus what is specific to this user
+        await learning_path_templates.ensure_stored(path_template)
+        stored_path = {
+            "path_template": path_template,
+            "path_overrides": {
+                "target_role_name": target_role_name,
+                "target_role_id": target_role_id,
+                "experience_level": experience_level,
+                "hours_per_week": request.available_hours_per_week,
+                "budget": request.budget,
+                "current_role": request.current_role,
+                "week_plan": week_plan
+            },
+        }
+    else:
+        # Frozen skeleton parts (MappingProxyType, tuples) can't be encoded as BSON
+        stored_path = {"path_data": thaw(path_data)}
     
     # Update usage
     if not is_pro:
@@ -374,10 +232,11 @@ async def generate_learning_path_standalone(
         "current_skills": request.current_skills,
         "available_hours": request.available_hours_per_week,
         "location": request.location,
-        "path_data": path_data,
+        **stored_path,
         "overall_progress": 0,
         "week_progress": {},
         "course_progress": {},
+        **progress_counters(path_data),
         "created_at": datetime.now(timezone.utc).isoformat()
     })
     
@@ -402,7 +261,7 @@ async def get_learning_path_history(user: dict = Depends(get_current_user)):
         {"user_id": user["id"]},
         {"_id": 0}
     ).sort("created_at", -1).to_list(20)
-    return {"learning_paths": paths}
+    return {"learning_paths": [await learning_path_templates.resolve(path) for path in paths]}
 
 
 @router.get("/all-progress")
@@ -434,16 +293,21 @@ async def get_learning_path(path_id: str, user: dict = Depends(get_current_user)
     )
     if not path:
         raise HTTPException(status_code=404, detail="Learning path not found")
-    return path
+    return await learning_path_templates.resolve(path)
 
 
 @router.post("/{path_id}/download")
 async def download_learning_path(
     path_id: str,
     format: str = Form("pdf"),
+    template: str = Form(DEFAULT_TEMPLATE),
+    if_none_match: Optional[str] = Header(None),
     user: dict = Depends(get_current_user)
 ):
-    """Download learning path as PDF or DOCX"""
+    """Download learning path as PDF, DOCX, plain text or Markdown"""
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
+    
     path = await db.learning_paths.find_one(
         {"id": path_id, "user_id": user["id"]},
         {"_id": 0}
@@ -452,53 +316,14 @@ async def download_learning_path(
     if not path:
         raise HTTPException(status_code=404, detail="Learning path not found")
     
-    path_data = path.get("path_data", {})
+    path_data = (await learning_path_templates.resolve(path)).get("path_data", {})
     target_role = path.get("target_role", "AI Role")
-    file_id = str(uuid.uuid4())[:8]
-    
-    if format == "docx":
-        filename = f"learning_path_{file_id}.docx"
-        filepath = DOWNLOADS_DIR / filename
-        
-        doc = Document()
-        doc.add_heading(f"Learning Path: {target_role}", 0)
-        
-        overview = path_data.get("path_overview", {})
-        doc.add_paragraph(f"Duration: {overview.get('duration_weeks', 16)} weeks")
-        doc.add_paragraph(f"Hours/week: {overview.get('hours_per_week', 10)}")
-        
-        for week in path_data.get("weeks", []):
-            doc.add_heading(f"Week {week.get('week')}: {week.get('focus', '')}", level=1)
-            doc.add_paragraph(f"Phase: {week.get('phase', '')}")
-            
-            for course in week.get("courses", []):
-                doc.add_paragraph(f"• {course.get('name')} ({course.get('platform')})")
-        
-        doc.save(str(filepath))
-    else:
-        filename = f"learning_path_{file_id}.pdf"
-        filepath = DOWNLOADS_DIR / filename
-        
-        doc = SimpleDocTemplate(str(filepath), pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, spaceAfter=20)
-        story.append(Paragraph(f"Learning Path: {target_role}", title_style))
-        story.append(Spacer(1, 12))
-        
-        for week in path_data.get("weeks", []):
-            story.append(Paragraph(f"Week {week.get('week')}: {week.get('focus', '')}", styles['Heading2']))
-            for course in week.get("courses", []):
-                story.append(Paragraph(f"• {course.get('name')} - {course.get('platform')}", styles['Normal']))
-            story.append(Spacer(1, 8))
-        
-        doc.build(story)
+    if format not in EXPORT_FORMATS:
+        format = "pdf"
     
-    return FileResponse(
-        path=str(filepath),
-        filename=filename,
-        media_type="application/octet-stream"
+    blocks = build_ast("learning_path", path_data, target_role)["blocks"]
+    return await cached_document_response(
+        "learning_path", format, [blocks, template], download_filename("learning_path", format), if_none_match
     )
 
 
@@ -508,39 +333,24 @@ async def update_week_progress(
     progress: WeekProgressUpdate,
     user: dict = Depends(get_current_user)
 ):
-    """Update progress for a specific week"""
-    path = await db.learning_paths.find_one(
-        {"id": path_id, "user_id": user["id"]},
-        {"_id": 0}
+    """Update progress for a specific week - one atomic write (see services/learning_progress.py)"""
+    query = {"id": path_id, "user_id": user["id"]}
+    path = await db.learning_paths.find_one_and_update(
+        week_progress_filter(query, progress.week),
+        week_progress_update(progress.week, progress.completed, progress.notes),
+        projection=WEEK_PROGRESS_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
     
     if not path:
+        if await db.learning_paths.find_one(query, {"_id": 1}):
+            raise HTTPException(status_code=400, detail="Invalid week")
         raise HTTPException(status_code=404, detail="Learning path not found")
     
-    week_progress = path.get("week_progress", {})
-    week_progress[str(progress.week)] = {
-        "completed": progress.completed,
-        "notes": progress.notes,
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }
-    
-    completed_weeks = sum(1 for w in week_progress.values() if w.get("completed"))
-    total_weeks = len(path.get("path_data", {}).get("weeks", []))
-    overall_progress = round((completed_weeks / total_weeks) * 100) if total_weeks > 0 else 0
-    
-    await db.learning_paths.update_one(
-        {"id": path_id},
-        {"$set": {
-            "week_progress": week_progress,
-            "overall_progress": overall_progress,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
-    )
-    
     return {
         "message": f"Week {progress.week} progress updated",
-        "week_progress": week_progress,
-        "overall_progress": overall_progress
+        "week_progress": path.get("week_progress", {}),
+        "overall_progress": path.get("overall_progress", 0)
     }
 
 
@@ -568,49 +378,24 @@ async def update_course_progress(
     progress: CourseProgressUpdate,
     user: dict = Depends(get_current_user)
 ):
-    """Update progress for a specific course within a week"""
-    path = await db.learning_paths.find_one(
-        {"id": path_id, "user_id": user["id"]},
-        {"_id": 0}
+    """Update progress for a specific course within a week - one atomic write"""
+    query = {"id": path_id, "user_id": user["id"]}
+    path = await db.learning_paths.find_one_and_update(
+        course_progress_filter(query, progress.week, progress.course_index),
+        course_progress_update(progress.week, progress.course_index, progress.completed, progress.notes),
+        projection=COURSE_PROGRESS_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
     
     if not path:
+        if await db.learning_paths.find_one(query, {"_id": 1}):
+            raise HTTPException(status_code=400, detail="Invalid course index")
         raise HTTPException(status_code=404, detail="Learning path not found")
     
-    course_progress = path.get("course_progress", {})
-    week_key = str(progress.week)
-    
-    if week_key not in course_progress:
-        course_progress[week_key] = {}
-    
-    course_progress[week_key][str(progress.course_index)] = {
-        "completed": progress.completed,
-        "notes": progress.notes,
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }
-    
-    weeks_data = path.get("path_data", {}).get("weeks", [])
-    total_courses = sum(len(w.get("courses", [])) for w in weeks_data)
-    completed_courses = sum(
-        1 for week_courses in course_progress.values()
-        for course in week_courses.values()
-        if course.get("completed")
-    )
-    overall_progress = round((completed_courses / total_courses) * 100) if total_courses > 0 else 0
-    
-    await db.learning_paths.update_one(
-        {"id": path_id},
-        {"$set": {
-            "course_progress": course_progress,
-            "overall_progress": overall_progress,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
-    )
-    
     return {
         "message": f"Course progress updated",
-        "course_progress": course_progress,
-        "overall_progress": overall_progress
+        "course_progress": path.get("course_progress", {}),
+        "overall_progress": path.get("overall_progress", 0)
     }
 
 
@@ -619,7 +404,7 @@ async def get_course_progress(path_id: str, user: dict = Depends(get_current_use
     """Get all course progress for a learning path"""
     path = await db.learning_paths.find_one(
         {"id": path_id, "user_id": user["id"]},
-        {"_id": 0}
+        {"_id": 0, "path_data": 0}
     )
     
     if not path:
@@ -628,8 +413,14 @@ async def get_course_progress(path_id: str, user: dict = Depends(get_current_use
     course_progress = path.get("course_progress", {})
     week_progress = path.get("week_progress", {})
     
-    weeks_data = path.get("path_data", {}).get("weeks", [])
-    total_courses = sum(len(w.get("courses", [])) for w in weeks_data)
+    total_courses = path.get("total_courses")
+    if total_courses is None:
+        # Created before the counters were stored
+        legacy = await db.learning_paths.find_one(
+            {"id": path_id}, {"_id": 0, "path_data.weeks.courses.id": 1}
+        )
+        weeks_data = (legacy or {}).get("path_data", {}).get("weeks", [])
+        total_courses = sum(len(w.get("courses", [])) for w in weeks_data)
     completed_courses = sum(
         1 for week_courses in course_progress.values()
         for course in week_courses.values()
@@ -2,14 +2,18 @@
 Resume routes - Resume parsing, extraction, and scanning
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import io
 import logging
 import re
 import os
 import json
+import zipfile
 
 router = APIRouter(tags=["resume"])
 
@@ -18,91 +22,161 @@ from auth import get_current_user
 from database import db
 from data.pricing import FREE_LIMITS
 from data.roles import AI_ROLES
+from services.ats_scorer import SCORER_VERSION, combine_partials, score_sections_incremental, section_hash
+from services.resume_parser import split_sections
+from services.role_matcher import rank_roles
+from config import (
+    RESUME_BATCH_MAX_FILES, RESUME_BATCH_MAX_FILE_BYTES, RESUME_BATCH_MAX_TOTAL_BYTES, RESUME_BATCH_WORKERS,
+)
+
+# Shared pool for batch extraction - bounds CPU-heavy PDF/OCR work across all requests
+batch_executor = ThreadPoolExecutor(max_workers=RESUME_BATCH_WORKERS, thread_name_prefix="resume-batch")
+
+RESUME_EXTENSIONS = ('.pdf', '.doc', '.docx', '.txt', '.md')
 
 # Anthropic for AI scanning
 import anthropic
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
 
 
-async def analyze_resume_for_role(resume_text: str, role_id: str) -> Dict[str, Any]:
+NARRATIVE_FIELDS = ("strengths", "improvements", "quick_wins")
+
+
+async def analyze_resume_for_role(
+    resume_text: str,
+    role_id: str,
+    narrative: bool = False,
+    previous_scan: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Shared function to analyze a resume against a target role.
     Used by both Resume Scanner and CV Generator for consistent scoring.
+    
+    Scores come from the local ATS scorer, so the same resume always gets the
+    same numbers. Claude only rewrites the strengths/improvements/quick wins
+    when narrative=True (write_resume_narrative); if that call fails the local
+    feedback is kept.
+    
+    With previous_scan (the user's last scan for this role), unchanged
+    sections reuse their stored partials, and earlier AI feedback is reused
+    when nothing changed. The returned "sections" state is what the next
+    rescan diffs against.
     """
     # Get target role info
     role = next((r for r in AI_ROLES if r["id"] == role_id), None)
     if not role:
         return {"error": "Invalid role"}
     
+    previous_scan = previous_scan or {}
+    sections = split_sections(resume_text)
+    section_state, changed = score_sections_incremental(
+        sections, previous_scan.get("sections"), previous_scan.get("scorer_version")
+    )
+    result = combine_partials({name: state["partial"] for name, state in section_state.items()}, role)
+    result.update({
+        "sections": section_state,
+        "scorer_version": SCORER_VERSION,
+        "changed_sections": changed,
+        "narrative_source": "local"
+    })
+    
+    previous_feedback = previous_scan if previous_scan.get("narrative_source") == "ai" else None
+    if previous_feedback and not changed:
+        # Same resume as last time - reuse the feedback we already paid for
+        for field in NARRATIVE_FIELDS:
+            result[field] = previous_feedback.get(field) or result[field]
+        result["narrative_source"] = "ai"
+        return result
+    
+    if narrative:
+        await write_resume_narrative(result, resume_text, role, sections, changed, previous_feedback)
+    return result
+
+
+async def write_resume_narrative(
+    result: Dict[str, Any],
+    resume_text: str,
+    role: Dict[str, Any],
+    sections: Dict[str, str],
+    changed: List[str],
+    previous_feedback: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Have Claude rewrite result's strengths/improvements/quick wins around its
+    (final) scores. With previous_feedback only the changed sections are sent.
+    """
+    if not ANTHROPIC_API_KEY:
+        return result
+    
     role_name = role["name"]
-    role_skills = role.get("top_skills", [])
+    scan_summary = f"""SCAN RESULTS:
+- ATS Score: {result['ats_score']}/100
+- Human Appeal: {result['human_appeal_score']}/100
+- Keywords found: {', '.join(result['keywords_found']) or 'none'}
+- Keywords missing: {', '.join(result['keywords_missing']) or 'none'}
+- Formatting issues: {'; '.join(result['formatting_issues']) or 'none'}"""
     
-    # Build the analysis prompt
-    prompt = f"""Analyze this resume for a {role_name} position. Be accurate and consistent in scoring.
+    if previous_feedback:
+        # Rescan - only the edited sections and the last feedback are sent
+        edited = "\n\n".join(
+            f"[{name.upper()}]\n{sections[name]}" if name in sections else f"[{name.upper()}]\n(section removed)"
+            for name in changed
+        )
+        previous = json.dumps({field: previous_feedback.get(field, []) for field in NARRATIVE_FIELDS})
+        prompt = f"""You previously reviewed this user's resume for a {role_name} position. They have since edited some sections. The scores below were computed by our ATS scanner and are final.
+
+EDITED SECTIONS:
+{edited[:4000]}
+
+PREVIOUS FEEDBACK:
+{previous}
+
+{scan_summary}
+
+Update the previous feedback for the edits: drop points the edits have addressed, keep points that still apply, and add feedback on the new content."""
+    else:
+        # Build the narrative prompt - scores are fixed, Claude explains them
+        prompt = f"""You are reviewing a resume for a {role_name} position. The scores below were computed by our ATS scanner and are final.
 
 RESUME:
 {resume_text[:4000]}
 
-TARGET ROLE: {role_name}
-KEY SKILLS NEEDED: {', '.join(role_skills)}
-
-SCORING CRITERIA:
-- ATS Score (0-100): Check for proper formatting, relevant keywords, clear structure, no graphics/tables issues
-- Human Appeal (0-100): Storytelling quality, quantified achievements, clarity, professional tone
-- Keyword Match: What percentage of required skills are mentioned?
-
-Analyze and return a JSON object with these exact fields:
-{{
-    "ats_score": <0-100 integer>,
-    "human_appeal_score": <0-100 integer>,
-    "keyword_match_percent": <0-100 integer>,
-    "overall_grade": "<A+/A/B+/B/C+/C/D/F>",
-    "keywords_found": ["keywords", "actually", "found", "in", "resume"],
-    "keywords_missing": ["important", "missing", "keywords"],
+{scan_summary}
+
+Write specific, actionable feedback that refers to the actual resume content."""
+    
+    prompt += """
+Return a JSON object with these exact fields:
+{
     "strengths": ["3-4 specific strengths"],
     "improvements": ["4-5 specific actionable improvements"],
-    "formatting_issues": ["any ATS issues found"],
     "quick_wins": ["2-3 easy fixes"]
-}}
+}
 
-Be HONEST and CONSISTENT. A good resume should score 80-95. Only exceptional resumes score 95+.
 Return ONLY valid JSON."""
 
     try:
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        response = client.messages.create(
+        client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+        response = await client.messages.create(
             model="claude-3-5-haiku-20241022",
-            max_tokens=1500,
+            max_tokens=800,
             messages=[{"role": "user", "content": prompt}]
         )
         
         response_text = response.content[0].text.strip()
         json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            return json.loads(json_match.group())
-        else:
+        if not json_match:
             raise ValueError("No valid JSON in response")
+        feedback = json.loads(json_match.group())
+        for field in NARRATIVE_FIELDS:
+            if isinstance(feedback.get(field), list) and feedback[field]:
+                result[field] = [str(item) for item in feedback[field]]
+        result["narrative_source"] = "ai"
             
     except Exception as e:
-        logging.error(f"Resume analysis error: {e}")
-        # Fallback analysis
-        resume_lower = resume_text.lower()
-        keywords_found = [s for s in role_skills if s.lower() in resume_lower]
-        keywords_missing = [s for s in role_skills if s.lower() not in resume_lower]
-        keyword_match = int(len(keywords_found) / max(len(role_skills), 1) * 100)
-        
-        return {
-            "ats_score": min(75, 50 + keyword_match // 3),
-            "human_appeal_score": 65,
-            "keyword_match_percent": keyword_match,
-            "overall_grade": "B" if keyword_match > 50 else "C",
-            "keywords_found": keywords_found,
-            "keywords_missing": keywords_missing,
-            "strengths": ["Resume provided for analysis"],
-            "improvements": [f"Add missing keywords: {', '.join(keywords_missing[:3])}"],
-            "formatting_issues": [],
-            "quick_wins": ["Add more relevant keywords"]
-        }
+        logging.error(f"Resume narrative error: {e}")
+    
+    return result
 
 
 def get_extract_text_from_pdf():
@@ -117,9 +191,144 @@ def get_parse_resume_text():
     return parse_resume_text
 
 
+def extract_resume_text(filename: str, content: bytes) -> str:
+    """Extract plain text from an uploaded resume file (PDF, DOC/DOCX or text)"""
+    name = (filename or "").lower()
+    if name.endswith('.pdf'):
+        return get_extract_text_from_pdf()(content)
+    if name.endswith(('.doc', '.docx')):
+        try:
+            import mammoth
+            result = mammoth.extract_raw_text(io.BytesIO(content))
+            return result.value
+        except Exception as e:
+            logging.error(f"DOCX extraction error: {e}")
+    return content.decode('utf-8', errors='ignore')
+
+
+def build_parse_result(resume_text: str) -> Dict[str, Any]:
+    """Parse extracted text into the /resume/parse response shape"""
+    parsed = get_parse_resume_text()(resume_text)
+    return {
+        "resume_data": parsed,
+        "text": resume_text[:2000],
+        "extracted_skills": (parsed.get("skills") or [])[:20],
+        "current_role": parsed.get("current_role") or "",
+        "years_experience": parsed.get("years_experience") or 0
+    }
+
+
+class BatchTooLarge(ValueError):
+    """A batch over the file count or total size limit - rejected before anything else is read"""
+
+
+ZIP_READ_CHUNK = 64 * 1024
+
+
+def read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> Optional[bytes]:
+    """
+    An entry's content, or None as soon as more than limit bytes come out.
+    Counts what is actually decompressed - info.file_size is whatever the uploader wrote.
+    """
+    chunks = []
+    size = 0
+    with archive.open(info) as entry:
+        while True:
+            chunk = entry.read(ZIP_READ_CHUNK)
+            if not chunk:
+                return b"".join(chunks)
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+
+
+def expand_batch_uploads(uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Flatten uploaded files and zip archives into (filename, content, error) items.
+    Oversized or unsupported entries are kept with an error so they are reported, not dropped.
+    
+    Limits are checked on the zip's directory before an entry is decompressed,
+    so archives with thousands of entries raise BatchTooLarge without being
+    loaded. Entries are then decompressed in chunks that stop at the per-file
+    limit or the rest of the batch budget, whatever their headers claim.
+    """
+    items = []
+    total_bytes = 0
+    
+    def count(size: int) -> None:
+        nonlocal total_bytes
+        total_bytes += size
+        if total_bytes > RESUME_BATCH_MAX_TOTAL_BYTES:
+            raise BatchTooLarge(f"Batch too large (maximum {RESUME_BATCH_MAX_TOTAL_BYTES // (1024 * 1024)} MB uncompressed)")
+    
+    for filename, content in uploads:
+        if (filename or "").lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                    entries = [
+                        info for info in archive.infolist()
+                        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                        and not info.filename.rsplit('/', 1)[-1].startswith('.')
+                    ]
+                    if len(items) + len(entries) > RESUME_BATCH_MAX_FILES:
+                        raise BatchTooLarge(f"Too many files (maximum {RESUME_BATCH_MAX_FILES} per batch)")
+                    for info in entries:
+                        if not info.filename.lower().endswith(RESUME_EXTENSIONS):
+                            items.append((info.filename, None, "Unsupported file type"))
+                        elif info.file_size > RESUME_BATCH_MAX_FILE_BYTES:
+                            items.append((info.filename, None, "File too large"))
+                        else:
+                            remaining = RESUME_BATCH_MAX_TOTAL_BYTES - total_bytes
+                            try:
+                                data = read_zip_entry(archive, info, min(RESUME_BATCH_MAX_FILE_BYTES, remaining))
+                            except (zipfile.BadZipFile, EOFError):
+                                # e.g. a CRC or size mismatch with the header
+                                items.append((info.filename, None, "Corrupt zip entry"))
+                                continue
+                            if data is None:
+                                if remaining < RESUME_BATCH_MAX_FILE_BYTES:
+                                    count(remaining + 1)
+                                items.append((info.filename, None, "File too large"))
+                                continue
+                            count(len(data))
+                            items.append((info.filename, data, None))
+            except zipfile.BadZipFile:
+                items.append((filename, None, "Invalid zip archive"))
+            continue
+        if len(items) + 1 > RESUME_BATCH_MAX_FILES:
+            raise BatchTooLarge(f"Too many files (maximum {RESUME_BATCH_MAX_FILES} per batch)")
+        if len(content) > RESUME_BATCH_MAX_FILE_BYTES:
+            items.append((filename, None, "File too large"))
+        else:
+            count(len(content))
+            items.append((filename, content, None))
+    return items
+
+
+def process_batch_item(filename: str, content: bytes) -> Dict[str, Any]:
+    """Extract and parse one resume - runs on the batch worker pool"""
+    resume_text = extract_resume_text(filename, content)
+    if not resume_text.strip():
+        raise ValueError("Could not extract text from file")
+    result = build_parse_result(resume_text)
+    # raw_text is already echoed (truncated) as "text" - keep NDJSON lines small
+    result["resume_data"] = {k: v for k, v in result["resume_data"].items() if k != "raw_text"}
+    return result
+
+
 class ResumeScanRequest(BaseModel):
     resume_text: str
     target_role_id: str
+    narrative: bool = False  # wait for Claude's feedback instead of POST /resume/scan/{id}/narrative
+
+
+class ResumeNarrativeRequest(BaseModel):
+    resume_text: str
+
+
+class ResumeScanAllRequest(BaseModel):
+    resume_text: str
     
 
 class ResumeScanResponse(BaseModel):
@@ -146,73 +355,74 @@ async def parse_resume(
     if not file and not text:
         raise HTTPException(status_code=400, detail="Provide either file or text")
     
-    extract_text_from_pdf = get_extract_text_from_pdf()
-    parse_resume_text = get_parse_resume_text()
-    
-    resume_text = ""
-    
     if file:
         content = await file.read()
-        if file.filename.lower().endswith('.pdf'):
-            resume_text = extract_text_from_pdf(content)
-        elif file.filename.lower().endswith(('.doc', '.docx')):
-            try:
-                import mammoth
-                result = mammoth.extract_raw_text(io.BytesIO(content))
-                resume_text = result.value
-            except Exception as e:
-                logging.error(f"DOCX extraction error: {e}")
-                resume_text = content.decode('utf-8', errors='ignore')
-        else:
-            resume_text = content.decode('utf-8', errors='ignore')
+        resume_text = extract_resume_text(file.filename, content)
     else:
         resume_text = text
     
     if not resume_text.strip():
         raise HTTPException(status_code=400, detail="Could not extract text from file")
     
-    parsed = parse_resume_text(resume_text)
+    return build_parse_result(resume_text)
+
+
+@router.post("/resume/parse-batch")
+async def parse_resume_batch(
+    files: List[UploadFile] = File(...),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Bulk resume parsing for coaching cohorts.
+    Accepts multiple files and/or zip archives, parses them concurrently on a
+    bounded worker pool and streams one NDJSON line per file as it finishes.
+    """
+    uploads = [(f.filename, await f.read()) for f in files]
+    try:
+        items = expand_batch_uploads(uploads)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not items:
+        raise HTTPException(status_code=400, detail="No resume files found in upload")
     
-    # Extract skills and experience for Learning Path auto-fill
-    extracted_skills = []
-    current_role = ""
-    years_experience = 0
+    async def run_item(index: int, filename: str, content: bytes) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(batch_executor, process_batch_item, filename, content)
+        except Exception as e:
+            return {"index": index, "filename": filename, "status": "error", "error": str(e)}
+        return {"index": index, "filename": filename, "status": "ok", **result}
     
-    if parsed:
-        # Get skills
-        if parsed.get("skills"):
-            if isinstance(parsed["skills"], list):
-                extracted_skills = parsed["skills"][:20]
-            elif isinstance(parsed["skills"], str):
-                extracted_skills = [s.strip() for s in parsed["skills"].split(",")][:20]
-        
-        # Get current role from experience
-        if parsed.get("experience") and len(parsed["experience"]) > 0:
-            exp = parsed["experience"][0]
-            current_role = exp.get("title", "") or exp.get("role", "") or ""
+    async def stream_results():
+        tasks = []
+        succeeded = 0
+        try:
+            for index, (filename, content, error) in enumerate(items):
+                if error:
+                    yield json.dumps({"index": index, "filename": filename, "status": "error", "error": error}) + "\n"
+                else:
+                    tasks.append(asyncio.ensure_future(run_item(index, filename, content)))
+            
+            for finished in asyncio.as_completed(tasks):
+                line = await finished
+                if line["status"] == "ok":
+                    succeeded += 1
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            # Client went away - don't keep parsing files nobody will read
+            for task in tasks:
+                task.cancel()
         
-        # Estimate years of experience
-        if parsed.get("experience"):
-            total_years = 0
-            for exp in parsed["experience"]:
-                duration = exp.get("duration", "")
-                if duration:
-                    year_matches = re.findall(r'(\d{4})', duration)
-                    if len(year_matches) >= 2:
-                        total_years += int(year_matches[-1]) - int(year_matches[0])
-                    elif "year" in duration.lower():
-                        num_match = re.search(r'(\d+)', duration)
-                        if num_match:
-                            total_years += int(num_match.group(1))
-            years_experience = total_years if total_years > 0 else len(parsed["experience"]) * 2
+        yield json.dumps({
+            "done": True,
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded
+        }) + "\n"
     
-    return {
-        "resume_data": parsed,
-        "text": resume_text[:2000],
-        "extracted_skills": extracted_skills,
-        "current_role": current_role,
-        "years_experience": years_experience
-    }
+    logging.info(f"Batch resume parse: {len(items)} files for user {user['id']}")
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 
 @router.post("/resume/scan")
@@ -254,8 +464,20 @@ async def scan_resume(request: ResumeScanRequest, user: dict = Depends(get_curre
     
     role_name = role["name"]
     
+    # Last scan for this role - unchanged sections and feedback are reused
+    previous_scan = await db.resume_scans.find_one(
+        {"user_id": user_id, "target_role_id": request.target_role_id},
+        {"_id": 0, "sections": 1, "scorer_version": 1, "narrative_source": 1,
+         "strengths": 1, "improvements": 1, "quick_wins": 1},
+        sort=[("created_at", -1)]
+    )
+    
     # Use shared analysis function for consistent scoring
-    scan_result = await analyze_resume_for_role(request.resume_text, request.target_role_id)
+    # Local scores only unless asked - the narrative is fetched separately
+    scan_result = await analyze_resume_for_role(
+        request.resume_text, request.target_role_id, narrative=request.narrative, previous_scan=previous_scan
+    )
+    section_state = scan_result.pop("sections", {})
     
     # Generate scan ID and save to database
     from uuid import uuid4
@@ -276,6 +498,10 @@ async def scan_resume(request: ResumeScanRequest, user: dict = Depends(get_curre
         "improvements": scan_result.get("improvements", []),
         "formatting_issues": scan_result.get("formatting_issues", []),
         "quick_wins": scan_result.get("quick_wins", []),
+        "score_breakdown": scan_result.get("score_breakdown", {}),
+        "sections": section_state,
+        "scorer_version": scan_result.get("scorer_version"),
+        "narrative_source": scan_result.get("narrative_source"),
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
@@ -310,12 +536,82 @@ async def scan_resume(request: ResumeScanRequest, user: dict = Depends(get_curre
     }
 
 
+@router.post("/resume/scan/{scan_id}/narrative")
+async def scan_narrative(scan_id: str, request: ResumeNarrativeRequest, user: dict = Depends(get_current_user)):
+    """
+    Claude's written feedback for a scan /resume/scan already scored.
+    Doesn't count as another scan; the resume must be the one that was scanned.
+    """
+    scan = await db.resume_scans.find_one({"id": scan_id, "user_id": user["id"]}, {"_id": 0})
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    feedback_fields = ("narrative_source",) + NARRATIVE_FIELDS
+    if scan.get("narrative_source") == "ai":
+        return {field: scan.get(field) for field in feedback_fields}
+    
+    role = next((r for r in AI_ROLES if r["id"] == scan.get("target_role_id")), None)
+    if not role:
+        raise HTTPException(status_code=400, detail="Invalid target role")
+    
+    sections = split_sections(request.resume_text)
+    stored = scan.get("sections") or {}
+    if {name: section_hash(text) for name, text in sections.items()} != {
+        name: state.get("hash") for name, state in stored.items()
+    }:
+        raise HTTPException(status_code=409, detail="Resume changed since this scan - scan it again")
+    
+    # Latest earlier feedback for this role - only sections edited since then are sent
+    previous_feedback = await db.resume_scans.find_one(
+        {"user_id": user["id"], "target_role_id": scan["target_role_id"], "narrative_source": "ai",
+         "id": {"$ne": scan_id}},
+        {"_id": 0, "sections": 1, "strengths": 1, "improvements": 1, "quick_wins": 1},
+        sort=[("created_at", -1)]
+    )
+    changed = list(sections)
+    if previous_feedback:
+        previous_sections = previous_feedback.get("sections") or {}
+        changed = [name for name, state in stored.items()
+                   if (previous_sections.get(name) or {}).get("hash") != state.get("hash")]
+        changed += [name for name in previous_sections if name not in stored]
+    
+    result = {field: scan.get(field) or [] for field in (
+        "keywords_found", "keywords_missing", "formatting_issues", *NARRATIVE_FIELDS
+    )}
+    result.update(ats_score=scan.get("ats_score", 0), human_appeal_score=scan.get("human_appeal_score", 0),
+                  narrative_source="local")
+    if previous_feedback and not changed:
+        for field in NARRATIVE_FIELDS:
+            result[field] = previous_feedback.get(field) or result[field]
+        result["narrative_source"] = "ai"
+    else:
+        await write_resume_narrative(result, request.resume_text, role, sections, changed, previous_feedback)
+    
+    feedback = {field: result[field] for field in feedback_fields}
+    if feedback["narrative_source"] == "ai":
+        await db.resume_scans.update_one({"id": scan_id, "user_id": user["id"]}, {"$set": feedback})
+    return feedback
+
+
+@router.post("/resume/scan-all")
+async def scan_resume_all_roles(request: ResumeScanAllRequest, user: dict = Depends(get_current_user)):
+    """
+    Rank every AI role for a resume in one local pass.
+    No AI call is made, so this doesn't count against the monthly scan limit -
+    users pick the best-fit role here, then run a full /resume/scan for it.
+    """
+    if not request.resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text is required")
+    
+    return rank_roles(request.resume_text)
+
+
 @router.get("/resume/scan/history")
 async def get_scan_history(user: dict = Depends(get_current_user)):
     """Get user's resume scan history"""
     scans = await db.resume_scans.find(
         {"user_id": user["id"]},
-        {"_id": 0}
+        {"_id": 0, "sections": 0}
     ).sort("created_at", -1).limit(10).to_list(10)
     
     return {"scans": scans, "total": len(scans)}
@@ -1,12 +1,16 @@
 """
 User routes - Profile and user management
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timezone
 
 from auth import get_current_user
 from database import db
 from config import FREE_LIMITS
+from services.document_export import export_archive
+from services.document_templates import DEFAULT_TEMPLATE, TEMPLATES
+from services.documents import EXPORT_FORMATS
 
 router = APIRouter(prefix="/user", tags=["user"])
 
@@ -82,3 +86,23 @@ async def get_user_profile(user: dict = Depends(get_current_user)):
             "learning_paths": recent_paths
         }
     }
+
+
+@router.get("/export")
+async def export_user_documents(
+    format: str = "pdf",
+    template: str = DEFAULT_TEMPLATE,
+    user: dict = Depends(get_current_user)
+):
+    """Download every CV, cover letter and learning path as one zip, streamed as it is built"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
+    
+    filename = f"careerlift_export_{datetime.now(timezone.utc).strftime('%Y%m%d')}.zip"
+    return StreamingResponse(
+        export_archive(db, user["id"], format, template),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import FileResponse
 from dotenv import load_dotenv
@@ -23,8 +23,14 @@ import lxml.html
 
 # Import data from centralized data module
 from data.roles import AI_ROLES, GLOBAL_HIRING
-from data.courses import COURSE_DATABASE, get_courses_for_role, get_scrimba_courses
 from data.pricing import PRICING, FREE_LIMITS
+from services.resume_parser import parse_resume_structured, format_resume_summary
+from services.render_pool import render_pool
+from services.company_cache import company_cache
+from services.course_catalog import InvalidCursor, course_catalog
+from services.janitor import downloads_janitor
+from services.job_analysis import job_analyses
+from services.learning_paths import learning_path_templates
 
 # Email notifications
 try:
@@ -125,6 +131,7 @@ from routes.roles import router as roles_router
 from routes.resume import router as resume_router
 from routes.user import router as user_router
 from routes.analytics import router as analytics_router
+from routes.files import router as files_router
 
 # Include modular routers in the API router
 api_router.include_router(auth_router)
@@ -140,6 +147,7 @@ api_router.include_router(roles_router)
 api_router.include_router(resume_router)
 api_router.include_router(user_router)
 api_router.include_router(analytics_router)
+api_router.include_router(files_router)
 
 # Paddle Config (kept for backward compatibility, config moved to config.py)
 PADDLE_API_KEY = os.environ.get('PADDLE_API_KEY', '')
@@ -297,51 +305,8 @@ def extract_text_from_pdf(file_content: bytes) -> str:
     return text.strip()
 
 def parse_resume_text(text: str) -> Dict[str, Any]:
-    """Basic resume parsing - extracts key information"""
-    result = {
-        "raw_text": text,
-        "current_role": None,
-        "years_experience": None,
-        "education": None,
-        "skills": [],
-        "certifications": [],
-        "companies": []
-    }
-    
-    # Common skill keywords
-    skill_keywords = [
-        "python", "javascript", "java", "c++", "sql", "react", "node", "aws", "azure",
-        "docker", "kubernetes", "machine learning", "deep learning", "tensorflow", "pytorch",
-        "data analysis", "data science", "product management", "agile", "scrum", "git",
-        "api", "rest", "graphql", "mongodb", "postgresql", "redis", "linux", "html", "css",
-        "typescript", "go", "rust", "scala", "r", "matlab", "tableau", "power bi",
-        "nlp", "computer vision", "pandas", "numpy", "scikit-learn", "keras", "spark",
-        "hadoop", "airflow", "mlflow", "langchain", "openai", "llm", "rag", "vector database"
-    ]
-    
-    text_lower = text.lower()
-    found_skills = [skill for skill in skill_keywords if skill in text_lower]
-    result["skills"] = list(set(found_skills))
-    
-    # Extract years of experience
-    exp_patterns = [
-        r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-        r'experience[:\s]*(\d+)\+?\s*years?',
-    ]
-    for pattern in exp_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            result["years_experience"] = int(match.group(1))
-            break
-    
-    # Extract education
-    edu_keywords = ["bachelor", "master", "phd", "mba", "b.s.", "m.s.", "b.tech", "m.tech"]
-    for edu in edu_keywords:
-        if edu in text_lower:
-            result["education"] = edu.upper()
-            break
-    
-    return result
+    """Structured resume parsing - sections, experience entries, education and skills"""
+    return parse_resume_structured(text)
 
 def get_claude_system_prompt():
     return """You are a world-class AI career advisor specializing in helping professionals transition into AI roles.
@@ -509,7 +474,7 @@ async def analyze_with_claude(resume_data: Dict, target_role: Dict, background:
         logging.warning("Claude API not configured. Using mock analysis data.")
         return {
             "role_readiness_score": 65,
-            "years_gap": max(0, 3 - resume_data.get('years_experience', 0)),
+            "years_gap": max(0, 3 - (resume_data.get('years_experience') or 0)),
             "skills_match_score": 70,
             "critical_skills_gap": ["System Design", "Advanced Algorithms", "Cloud Architecture"],
             "strengths": ["Strong programming foundations", "Eagerness to learn", "Relevant background"],
@@ -539,14 +504,21 @@ async def analyze_with_claude(resume_data: Dict, target_role: Dict, background:
     courses = target_role.get('courses', [])
     from_background = target_role.get('from_background', {})
     
+    # Structured resumes go to the model as a compact summary instead of raw text -
+    # it already has the role, experience and education
+    if resume_data.get('experience'):
+        resume_summary = format_resume_summary(resume_data)
+    else:
+        resume_summary = f"""- Raw Text: {(resume_data.get('raw_text') or 'Not provided')[:3000]}
+- Current Role: {resume_data.get('current_role') or 'Not specified'}
+- Years Experience: {resume_data['years_experience'] if resume_data.get('years_experience') is not None else 'Not specified'}
+- Education: {resume_data.get('education') or 'Not specified'}"""
+    
     user_message = f"""
 Analyze this candidate for transition to: {target_role['name']}
 
 RESUME DATA:
-- Raw Text: {resume_data.get('raw_text', 'Not provided')[:3000]}
-- Current Role: {resume_data.get('current_role', 'Not specified')}
-- Years Experience: {resume_data.get('years_experience', 'Not specified')}
-- Education: {resume_data.get('education', 'Not specified')}
+{resume_summary}
 - Detected Skills: {', '.join(resume_data.get('skills', []))}
 
 BACKGROUND CONTEXT:
@@ -610,102 +582,26 @@ Provide a comprehensive analysis in the exact JSON format specified. Use the glo
 # ============================================
 
 
-def get_courses_for_role(role_id: str, difficulty: str = None) -> list:
-    """Get relevant courses for a specific role"""
-    courses = []
-    for course_id, course in COURSE_DATABASE.items():
-        if "all" in course["for_roles"] or role_id in course["for_roles"]:
-            if difficulty is None or course["difficulty"].lower().startswith(difficulty.lower()):
-                courses.append({
-                    "course_id": course_id,
-                    **course
-                })
-    # Sort: Recommended first, then free, then paid
-    courses.sort(key=lambda x: (
-        0 if x.get("recommended") else 1,
-        0 if x.get("cost", "").lower() == "free" else 1,
-        -x.get("rating", 0)
-    ))
-    return courses
-
 @api_router.get("/courses")
 async def get_courses_api(
     role_id: Optional[str] = Query(None, description="Filter by role ID"),
     difficulty: Optional[str] = Query(None, description="Filter by difficulty"),
     platform: Optional[str] = Query(None, description="Filter by platform (e.g., Scrimba)"),
-    free_only: bool = Query(False, description="Show only free courses")
+    free_only: bool = Query(False, description="Show only free courses"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size (all matching courses if omitted)")
 ):
-    """Get courses from the database with optional filters"""
-    courses = []
-    
-    for course_id, course in COURSE_DATABASE.items():
-        # Role filter
-        if role_id and role_id not in course.get("for_roles", []) and "all" not in course.get("for_roles", []):
-            continue
-        
-        # Difficulty filter
-        if difficulty and not course.get("difficulty", "").lower().startswith(difficulty.lower()):
-            continue
-        
-        # Platform filter
-        if platform and course.get("platform", "").lower() != platform.lower():
-            continue
-        
-        # Free only filter
-        if free_only and course.get("cost", "").lower() != "free":
-            continue
-        
-        courses.append({
-            "course_id": course_id,
-            **course
-        })
-    
-    # Sort: Recommended first, then free, then by rating
-    courses.sort(key=lambda x: (
-        0 if x.get("recommended") else 1,
-        0 if x.get("cost", "").lower() == "free" else 1,
-        -x.get("rating", 0)
-    ))
-    
-    # Get Scrimba courses count for stats
-    scrimba_count = len([c for c in courses if c.get("platform") == "Scrimba"])
-    free_count = len([c for c in courses if c.get("cost", "").lower() == "free"])
-    
-    return {
-        "courses": courses,
-        "total": len(courses),
-        "scrimba_count": scrimba_count,
-        "free_count": free_count
-    }
+    """Get courses from the database with optional filters (see services/course_catalog.py)"""
+    try:
+        body = course_catalog.response(role_id, difficulty, platform, free_only, cursor, limit)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return Response(content=body, media_type="application/json")
 
 @api_router.get("/courses/scrimba")
 async def get_scrimba_courses():
     """Get all Scrimba courses with affiliate links"""
-    courses = []
-    for course_id, course in COURSE_DATABASE.items():
-        if course.get("platform") == "Scrimba":
-            courses.append({
-                "course_id": course_id,
-                **course
-            })
-    
-    # Sort: Free first, then by rating
-    courses.sort(key=lambda x: (
-        0 if x.get("cost", "").lower() == "free" else 1,
-        -x.get("rating", 0)
-    ))
-    
-    free_courses = [c for c in courses if c.get("cost", "").lower() == "free"]
-    pro_courses = [c for c in courses if c.get("cost", "").lower() != "free"]
-    
-    return {
-        "courses": courses,
-        "total": len(courses),
-        "free_courses": free_courses,
-        "pro_courses": pro_courses,
-        "free_count": len(free_courses),
-        "pro_count": len(pro_courses)
-    }
+    return Response(content=course_catalog.scrimba_body, media_type="application/json")
 
 def get_learning_path_prompt():
     return """You are an expert AI career advisor creating personalized 16-week learning paths.
@@ -955,7 +851,13 @@ async def root():
 
 @api_router.get("/health")
 async def health():
-    return {"status": "healthy", "claude_configured": bool(ANTHROPIC_API_KEY)}
+    return {
+        "status": "healthy",
+        "claude_configured": bool(ANTHROPIC_API_KEY),
+        "downloads_janitor": downloads_janitor.stats(),
+        "company_research_cache": company_cache.stats(),
+        "job_analyses": job_analyses.stats()
+    }
 
 from fastapi.staticfiles import StaticFiles
 
@@ -987,7 +889,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition", "X-Download-Success", "X-Remaining-Downloads", "X-Usage-Message"],
+    expose_headers=["Content-Disposition", "ETag", "X-Download-Success", "X-Remaining-Downloads", "X-Usage-Message"],
 )
 
 logging.basicConfig(
@@ -996,6 +898,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_background_tasks():
+    await downloads_janitor.start()
+    try:
+        await company_cache.ensure_indexes()
+        await job_analyses.ensure_indexes()
+        await learning_path_templates.ensure_indexes()
+    except Exception as e:
+        logging.warning(f"Could not create cache indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await downloads_janitor.stop()
     client.close()
+    render_pool.shutdown(wait=False)
@@ -0,0 +1,261 @@
+"""
+ATS scorer - deterministic local resume scoring against a target role.
+
+Scoring is split in two steps so unchanged sections never need re-scanning:
+  1. score_section() reduces one resume section to a small "partial" of
+     counts (skills mentioned, bullets, quantified bullets, formatting hits).
+  2. combine_partials() merges the partials for a role into the scan result
+     (ats_score, human_appeal_score, keyword coverage, grade and feedback).
+
+The same resume always gets the same numbers; the LLM is only asked for
+narrative suggestions on top. Partials are stored per section hash on each
+scan, so a rescan only re-scores the sections the user actually edited.
+"""
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.roles import AI_ROLES
+from data.skills import SKILL_TAXONOMY
+from services.resume_parser import BULLET_RE, DATE_RANGE_RE, split_sections
+from services.skill_matcher import TOKEN_CHARS, extract_skills, label_to_skills
+
+# Bump when partial fields or scoring rules change so stored partials are recomputed
+SCORER_VERSION = 1
+
+ACTION_VERBS = {
+    "accelerated", "achieved", "analyzed", "architected", "automated", "built", "championed",
+    "collaborated", "consolidated", "created", "cut", "debugged", "decreased", "defined",
+    "delivered", "deployed", "designed", "developed", "directed", "drove", "eliminated",
+    "enabled", "engineered", "established", "evaluated", "expanded", "generated", "grew",
+    "implemented", "improved", "increased", "initiated", "integrated", "introduced", "launched",
+    "led", "managed", "mentored", "migrated", "modernized", "negotiated", "optimized",
+    "orchestrated", "owned", "partnered", "pioneered", "presented", "prototyped", "published",
+    "rebuilt", "redesigned", "reduced", "refactored", "resolved", "scaled", "secured",
+    "shipped", "simplified", "spearheaded", "standardized", "streamlined", "taught", "tested",
+    "trained", "transformed", "tripled", "doubled", "wrote",
+}
+
+WEAK_OPENERS = ("responsible for", "worked on", "helped", "assisted", "involved in", "duties included")
+
+# Money, percentages, multipliers, magnitudes and plain counts (years on their own are not metrics)
+METRIC_RE = re.compile(
+    r"[$€£]\s?\d|\d+(?:\.\d+)?\s?(?:%|x\b|k\b|m\b|mm\b|bn\b|\+)|\b(?!(?:19|20)\d{2}\b)\d{2,}(?:,\d{3})*\b",
+    re.IGNORECASE,
+)
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+# Box drawing, private-use icon fonts and emoji don't survive ATS text extraction
+ODD_CHAR_RE = re.compile("[\u2500-\u259f\ue000-\uf8ff\U0001f300-\U0001faff]")
+
+REQUIRED_SECTIONS = {"experience": 25, "education": 20, "skills": 25}
+OPTIONAL_SECTIONS = {"summary": 15}
+CONTACT_POINTS = 15
+IDEAL_WORDS = (350, 1000)
+
+
+def _role_literal_terms() -> List[str]:
+    """Role skill labels outside the taxonomy ("Creativity") are matched literally"""
+    terms = set()
+    for role in AI_ROLES:
+        for label in role.get("top_skills", []):
+            terms.update(t for t in label_to_skills(label) if t not in SKILL_TAXONOMY)
+    return sorted(terms, key=len, reverse=True)
+
+
+_LITERAL_TERMS = _role_literal_terms()
+_LITERAL_PATTERN = re.compile(
+    rf"(?<![{TOKEN_CHARS}])("
+    + "|".join(re.escape(t.lower()) for t in _LITERAL_TERMS)
+    + rf")(?![{TOKEN_CHARS}])"
+) if _LITERAL_TERMS else None
+_LITERAL_LOOKUP = {t.lower(): t for t in _LITERAL_TERMS}
+
+
+def _achievement_lines(section_text: str) -> List[str]:
+    """Bullet lines, or plain sentence lines when the section has no bullet markers"""
+    lines = [l.strip() for l in section_text.splitlines() if l.strip()]
+    bullets = [BULLET_RE.sub("", l).strip() for l in lines if BULLET_RE.match(l)]
+    if bullets:
+        return bullets
+    return [l for l in lines if len(l.split()) >= 6 and not DATE_RANGE_RE.search(l)]
+
+
+def score_section(name: str, text: str) -> Dict[str, Any]:
+    """Reduce one resume section to the counts the combined score is built from"""
+    text_lower = text.lower()
+    terms = extract_skills(text_lower)
+    if _LITERAL_PATTERN:
+        terms += [_LITERAL_LOOKUP[m] for m in dict.fromkeys(_LITERAL_PATTERN.findall(text_lower))]
+
+    partial = {
+        "words": len(text.split()),
+        "terms": terms,
+        "bullets": 0,
+        "metric_bullets": 0,
+        "verb_bullets": 0,
+        "weak_bullets": 0,
+        "long_lines": sum(1 for l in text.splitlines() if len(l) > 220),
+        "table_lines": sum(1 for l in text.splitlines() if l.count("\t") >= 2 or l.count("|") >= 4),
+        "odd_chars": len(ODD_CHAR_RE.findall(text)),
+    }
+    if name in ("experience", "projects"):
+        lines = _achievement_lines(text)
+        partial["bullets"] = len(lines)
+        for line in lines:
+            first_word = re.sub(r"[^a-z]", "", line.split()[0].lower()) if line.split() else ""
+            partial["metric_bullets"] += bool(METRIC_RE.search(line))
+            partial["verb_bullets"] += first_word in ACTION_VERBS
+            partial["weak_bullets"] += line.lower().startswith(WEAK_OPENERS)
+    if name == "header":
+        partial["has_email"] = bool(EMAIL_RE.search(text))
+        partial["has_phone"] = bool(PHONE_RE.search(text))
+    return partial
+
+
+def score_sections(sections: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Partials for every section of a split resume"""
+    return {name: score_section(name, text) for name, text in sections.items()}
+
+
+def section_hash(text: str) -> str:
+    """Whitespace-insensitive fingerprint of a section's text"""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def score_sections_incremental(
+    sections: Dict[str, str],
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+    previous_version: Optional[int] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Score sections, reusing partials from a previous scan whose hash still matches.
+    Returns ({section: {"hash", "partial"}}, names of added/edited/removed sections).
+    """
+    if previous_version != SCORER_VERSION:
+        previous = None
+    previous = previous or {}
+
+    state, changed = {}, []
+    for name, text in sections.items():
+        digest = section_hash(text)
+        cached = previous.get(name)
+        if cached and cached.get("hash") == digest:
+            state[name] = cached
+        else:
+            state[name] = {"hash": digest, "partial": score_section(name, text)}
+            changed.append(name)
+    changed += [name for name in previous if name not in sections]
+    return state, changed
+
+
+def _grade(score: float) -> str:
+    for threshold, grade in ((93, "A+"), (85, "A"), (78, "B+"), (70, "B"), (62, "C+"), (55, "C"), (45, "D")):
+        if score >= threshold:
+            return grade
+    return "F"
+
+
+def _ratio_score(part: int, whole: int, full_at: float) -> int:
+    """0-100 score that reaches 100 once part/whole hits full_at"""
+    if not whole:
+        return 0
+    return min(100, round(part / whole / full_at * 100))
+
+
+def combine_partials(partials: Dict[str, Dict[str, Any]], role: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn per-section partials into the scan result for a role"""
+    role_skills = role.get("top_skills", [])
+    terms = set()
+    for partial in partials.values():
+        terms.update(partial["terms"])
+    keywords_found = [s for s in role_skills if any(t in terms for t in label_to_skills(s))]
+    keywords_missing = [s for s in role_skills if s not in keywords_found]
+    keyword_match = round(len(keywords_found) / max(len(role_skills), 1) * 100)
+
+    def total(field: str) -> int:
+        return sum(p.get(field, 0) for p in partials.values())
+
+    header = partials.get("header", {})
+    structure = sum(points for name, points in {**REQUIRED_SECTIONS, **OPTIONAL_SECTIONS}.items() if name in partials)
+    structure += (CONTACT_POINTS // 2) * header.get("has_email", False) + (CONTACT_POINTS - CONTACT_POINTS // 2) * header.get("has_phone", False)
+
+    formatting_issues = []
+    missing_sections = [name for name in REQUIRED_SECTIONS if name not in partials]
+    if missing_sections:
+        formatting_issues.append(f"No clear section heading for: {', '.join(missing_sections)}")
+    if not header.get("has_email") or not header.get("has_phone"):
+        formatting_issues.append("Contact details (email and phone) should be at the top of the resume")
+    if total("table_lines"):
+        formatting_issues.append("Table or column layout detected - ATS parsers often scramble columns")
+    if total("odd_chars"):
+        formatting_issues.append("Icons, emoji or special symbols found - use plain text characters")
+    if total("long_lines"):
+        formatting_issues.append("Very long paragraphs - break achievements into short bullet points")
+    words = total("words")
+    if words < IDEAL_WORDS[0]:
+        formatting_issues.append(f"Resume is short ({words} words) - aim for {IDEAL_WORDS[0]}-{IDEAL_WORDS[1]}")
+    elif words > IDEAL_WORDS[1] * 1.3:
+        formatting_issues.append(f"Resume is long ({words} words) - trim to the most relevant {IDEAL_WORDS[1]}")
+    formatting = max(0, 100 - 15 * len(formatting_issues))
+
+    bullets = total("bullets")
+    impact = _ratio_score(total("metric_bullets"), bullets, 0.5)
+    verbs = max(0, _ratio_score(total("verb_bullets"), bullets, 0.7) - _ratio_score(total("weak_bullets"), bullets, 1.0) // 2)
+    length = 100 if IDEAL_WORDS[0] <= words <= IDEAL_WORDS[1] else 70 if words >= IDEAL_WORDS[0] // 2 else 40
+
+    ats_score = round(0.5 * keyword_match + 0.25 * structure + 0.25 * formatting)
+    human_appeal_score = round(0.35 * impact + 0.3 * verbs + 0.2 * length + 0.15 * structure)
+
+    strengths, improvements, quick_wins = [], [], []
+    if keyword_match >= 70:
+        strengths.append(f"Strong keyword coverage for {role['name']} ({len(keywords_found)}/{len(role_skills)} core skills)")
+    elif keywords_missing:
+        improvements.append(f"Add evidence of these {role['name']} skills: {', '.join(keywords_missing[:5])}")
+        quick_wins.append(f"Mention {', '.join(keywords_missing[:3])} in your skills section if you have used them")
+    if impact >= 70:
+        strengths.append("Achievements are backed by concrete numbers")
+    elif bullets:
+        unquantified = bullets - total("metric_bullets")
+        improvements.append(f"Quantify impact - {unquantified} of {bullets} bullets have no metric (%, $, users, time saved)")
+        quick_wins.append("Add one number to each of your three most recent bullets")
+    if verbs >= 70:
+        strengths.append("Bullets lead with strong action verbs")
+    elif bullets:
+        improvements.append("Start each bullet with an action verb (Built, Led, Reduced) instead of 'Responsible for'")
+    if structure >= 85:
+        strengths.append("Clear, ATS-friendly section structure")
+    if "summary" not in partials:
+        improvements.append(f"Add a 2-3 line summary targeted at {role['name']} roles")
+    if not bullets:
+        improvements.append("List achievements as bullet points under each role")
+    if not strengths:
+        strengths.append("Resume provided for analysis")
+
+    return {
+        "ats_score": ats_score,
+        "human_appeal_score": human_appeal_score,
+        "keyword_match_percent": keyword_match,
+        "overall_grade": _grade((ats_score + human_appeal_score) / 2),
+        "keywords_found": keywords_found,
+        "keywords_missing": keywords_missing,
+        "strengths": strengths[:4],
+        "improvements": improvements[:5],
+        "formatting_issues": formatting_issues,
+        "quick_wins": quick_wins[:3] or ["Tailor your summary to the job description"],
+        "score_breakdown": {
+            "keywords": keyword_match,
+            "structure": structure,
+            "formatting": formatting,
+            "impact": impact,
+            "action_verbs": verbs,
+            "length": length,
+        },
+    }
+
+
+def score_resume(resume_text: str, role: Dict[str, Any], partials: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Score resume text for a role (pass precomputed partials to skip the section scan)"""
+    if partials is None:
+        partials = score_sections(split_sections(resume_text))
+    return combine_partials(partials, role)
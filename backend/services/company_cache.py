@@ -0,0 +1,164 @@
+"""
+Company research cache - shared across users.
+
+Cover letters used to ask the model to research the company every time, and
+the resulting company_research was stored per user and never reused, although
+hundreds of users apply to the same companies. Research is now cached in the
+company_research collection keyed by normalized company name ("OpenAI, Inc."
+and "openai" share an entry):
+
+  - the first generation for a company fills the entry; later prompts receive
+    the cached research and the model no longer writes it out
+  - entries come from a research call that only sees the company and the job
+    posting (services/cover_letters.research_company), never from a letter
+    prompt with one user's resume in it, and only the public_research fields
+    are stored
+  - entries expire after COMPANY_RESEARCH_TTL_DAYS (Mongo TTL index) and are
+    ignored when COMPANY_RESEARCH_VERSION changes
+  - hot entries are also memoized in-process for a few minutes
+"""
+import logging
+import re
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from config import COMPANY_RESEARCH_TTL_DAYS
+from database import db
+
+# Bump when the shape of company_research (or the prompt producing it) changes
+COMPANY_RESEARCH_VERSION = 1
+MEMORY_TTL_SECONDS = 600
+MEMORY_MAX_ENTRIES = 1000
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "ag", "plc", "pbc", "sa", "sas", "bv", "nv", "pty", "pvt", "private", "lp", "llp",
+}
+
+
+def normalize_company_name(name: str) -> str:
+    """Case, accents, punctuation and legal suffixes removed: "Zürich Labs GmbH" -> "zurich labs" """
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    words = re.sub(r"[^a-z0-9&+ ]", " ", text.lower().replace("&", " & ")).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+# Limits for stored research - it is injected into every later applicant's prompt
+MAX_PRODUCTS = 8
+MAX_FIELD_CHARS = 400
+
+
+def public_research(research: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The shareable company_research fields only, as short plain strings"""
+    research = research if isinstance(research, dict) else {}
+    products = research.get("products_mentioned")
+    return {
+        "company_name": str(research.get("company_name") or "")[:MAX_FIELD_CHARS],
+        "products_mentioned": [
+            str(p)[:80] for p in (products if isinstance(products, list) else []) if p
+        ][:MAX_PRODUCTS],
+        "why_compelling": str(research.get("why_compelling") or "")[:MAX_FIELD_CHARS],
+    }
+
+
+def is_useful_research(research: Optional[Dict[str, Any]]) -> bool:
+    return bool(research) and bool(research.get("why_compelling") or research.get("products_mentioned"))
+
+
+class CompanyResearchCache:
+    """collection=None keeps the cache in memory only"""
+
+    def __init__(self, collection: Any, ttl: timedelta, memory_ttl: float = MEMORY_TTL_SECONDS):
+        self.collection = collection
+        self.ttl = ttl
+        self.memory_ttl = memory_ttl
+        self._memory: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._memory.pop(key, None)
+        return None
+
+    def _memory_put(self, key: str, research: Dict[str, Any]) -> None:
+        self._memory.pop(key, None)
+        self._memory[key] = (time.monotonic() + self.memory_ttl, research)
+        if len(self._memory) > MEMORY_MAX_ENTRIES:
+            # Oldest insertion first
+            self._memory.pop(next(iter(self._memory)))
+
+    async def get(self, company: str) -> Optional[Dict[str, Any]]:
+        """Cached research for a company, or None"""
+        key = normalize_company_name(company)
+        if not key:
+            return None
+        research = self._memory_get(key)
+        if research is None and self.collection is not None:
+            try:
+                entry = await self.collection.find_one(
+                    {"key": key, "version": COMPANY_RESEARCH_VERSION,
+                     "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                    {"_id": 0, "research": 1}
+                )
+            except PyMongoError as e:
+                logging.warning(f"Company research cache lookup failed: {e}")
+                entry = None
+            if entry:
+                research = entry["research"]
+                self._memory_put(key, research)
+        if research is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return research
+
+    async def put(self, company: str, research: Dict[str, Any]) -> None:
+        """Store user-independent research unless a current entry already exists"""
+        key = normalize_company_name(company)
+        research = public_research(research)
+        if not key or not is_useful_research(research):
+            return
+        self._memory_put(key, research)
+        if self.collection is None:
+            return
+        now = datetime.now(timezone.utc)
+        try:
+            # Only replaces missing, expired or outdated entries; a current one makes the upsert collide
+            await self.collection.update_one(
+                {"key": key, "$or": [{"expires_at": {"$lte": now}}, {"version": {"$ne": COMPANY_RESEARCH_VERSION}}]},
+                {"$set": {
+                    "key": key,
+                    "company_name": company,
+                    "research": research,
+                    "version": COMPANY_RESEARCH_VERSION,
+                    "updated_at": now,
+                    "expires_at": now + self.ttl,
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+        except PyMongoError as e:
+            logging.warning(f"Company research cache update failed: {e}")
+
+    async def ensure_indexes(self) -> None:
+        if self.collection is None:
+            return
+        await self.collection.create_index("key", unique=True)
+        # Mongo deletes entries once expires_at has passed
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+
+company_cache = CompanyResearchCache(db.company_research, timedelta(days=COMPANY_RESEARCH_TTL_DAYS))
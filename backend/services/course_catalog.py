@@ -0,0 +1,166 @@
+"""
+Course catalog - indexed queries over the COURSE_DATABASE courses.
+
+/courses used to walk every course, apply its filters, copy each course into
+a new dict and sort the result on every request (and /courses/scrimba did the
+same). The catalog is built once at import:
+
+  - course records (data/course_store.py) are sorted once in the listing order
+    (recommended, free, rating) and identified by their rank in it
+  - inverted indexes map role, platform, difficulty prefix and "free" to
+    pre-sorted rank lists, so a filtered query intersects the shortest list
+    with the others instead of scanning the database
+  - results page with a cursor (the course_id of the last course returned)
+  - response bodies are cached as pre-serialized JSON bytes
+"""
+import json
+from bisect import bisect_right
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from data.course_store import LISTING, CourseRecord, course_store
+from data.courses import COURSE_DATABASE  # noqa: F401 - loads the listing courses into the store
+
+RESPONSE_CACHE_SIZE = 256
+
+# Sorted ranks plus the same ranks as a set for membership tests
+Posting = Tuple[Tuple[int, ...], FrozenSet[int]]
+
+_UNKNOWN_ROLE = "\0unknown"
+
+
+class InvalidCursor(ValueError):
+    """The cursor does not name a course in the catalog"""
+
+
+def serialize(data: Any) -> bytes:
+    """JSON bytes, exactly as FastAPI's JSONResponse renders them"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def is_free(course: CourseRecord) -> bool:
+    return (course.cost or "").lower() == "free"
+
+
+def listing_dict(course: CourseRecord) -> Dict[str, Any]:
+    return {"course_id": course.key, **course.to_dict()}
+
+
+def _posting(ranks: List[int]) -> Posting:
+    ranks = sorted(set(ranks))
+    return tuple(ranks), frozenset(ranks)
+
+
+class CourseCatalog:
+    def __init__(self, courses: Iterable[CourseRecord], response_cache_size: int = RESPONSE_CACHE_SIZE):
+        courses = list(courses)
+        entries = list(courses)
+        # Recommended first, then free, then by rating
+        entries.sort(key=lambda c: (0 if c.recommended else 1, 0 if is_free(c) else 1, -(c.rating or 0)))
+        self.entries = entries
+        self.ranks = {course.key: rank for rank, course in enumerate(entries)}
+
+        for_all = [rank for rank, c in enumerate(entries) if "all" in (c.for_roles or ())]
+        roles: Dict[str, List[int]] = {}
+        platforms: Dict[str, List[int]] = {}
+        difficulties: Dict[str, List[int]] = {}
+        for rank, course in enumerate(entries):
+            for role in course.for_roles or ():
+                # "all" courses belong to every role
+                roles.setdefault(role, list(for_all)).append(rank)
+            platforms.setdefault((course.platform or "").lower(), []).append(rank)
+            difficulty = (course.difficulty or "").lower()
+            for end in range(1, len(difficulty) + 1):
+                difficulties.setdefault(difficulty[:end], []).append(rank)
+
+        self.by_role = {role: _posting(ranks) for role, ranks in roles.items()}
+        self.by_role[_UNKNOWN_ROLE] = _posting(for_all)
+        self.by_platform = {platform: _posting(ranks) for platform, ranks in platforms.items()}
+        self.by_difficulty_prefix = {prefix: _posting(ranks) for prefix, ranks in difficulties.items()}
+        self.free = _posting([rank for rank, c in enumerate(entries) if is_free(c)])
+        self.scrimba = _posting([rank for rank, c in enumerate(entries) if c.platform == "Scrimba"])
+        self.everything = _posting(list(range(len(entries))))
+        self._empty = _posting([])
+
+        self._responses: Dict[Tuple, bytes] = {}
+        self.response_cache_size = response_cache_size
+        self.scrimba_body = serialize(self._scrimba_response(courses))
+
+    def _normalize(self, role_id: Optional[str], difficulty: Optional[str], platform: Optional[str],
+                   free_only: bool) -> Tuple:
+        """Cache key - queries with the same result share one"""
+        if role_id and role_id not in self.by_role:
+            role_id = _UNKNOWN_ROLE
+        return role_id or None, (difficulty or "").lower(), (platform or "").lower(), bool(free_only)
+
+    def query(self, role_id: Optional[str] = None, difficulty: Optional[str] = None,
+              platform: Optional[str] = None, free_only: bool = False) -> Tuple[int, ...]:
+        """Ranks of matching courses, in listing order"""
+        role_id, difficulty, platform, free_only = self._normalize(role_id, difficulty, platform, free_only)
+        postings = []
+        if role_id:
+            postings.append(self.by_role[role_id])
+        if difficulty:
+            postings.append(self.by_difficulty_prefix.get(difficulty, self._empty))
+        if platform:
+            postings.append(self.by_platform.get(platform, self._empty))
+        if free_only:
+            postings.append(self.free)
+        if not postings:
+            return self.everything[0]
+        postings.sort(key=lambda p: len(p[0]))
+        shortest, others = postings[0][0], [p[1] for p in postings[1:]]
+        return tuple(rank for rank in shortest if all(rank in other for other in others))
+
+    def page(self, ranks: Tuple[int, ...], cursor: Optional[str] = None,
+             limit: Optional[int] = None) -> Tuple[Tuple[int, ...], Optional[str]]:
+        """(ranks on this page, cursor for the next page or None)"""
+        start = 0
+        if cursor:
+            if cursor not in self.ranks:
+                raise InvalidCursor(cursor)
+            start = bisect_right(ranks, self.ranks[cursor])
+        if not limit:
+            return ranks[start:], None
+        page = ranks[start:start + limit]
+        has_more = start + limit < len(ranks)
+        return page, self.entries[page[-1]].key if has_more else None
+
+    def response(self, role_id: Optional[str] = None, difficulty: Optional[str] = None,
+                 platform: Optional[str] = None, free_only: bool = False,
+                 cursor: Optional[str] = None, limit: Optional[int] = None) -> bytes:
+        """Serialized /courses response body"""
+        key = self._normalize(role_id, difficulty, platform, free_only) + (cursor or None, limit or None)
+        body = self._responses.pop(key, None)
+        if body is None:
+            ranks = self.query(role_id, difficulty, platform, free_only)
+            page, next_cursor = self.page(ranks, cursor, limit)
+            body = serialize({
+                "courses": [listing_dict(self.entries[rank]) for rank in page],
+                "total": len(ranks),
+                "scrimba_count": sum(1 for rank in ranks if rank in self.scrimba[1]),
+                "free_count": sum(1 for rank in ranks if rank in self.free[1]),
+                "next_cursor": next_cursor,
+            })
+            if len(self._responses) >= self.response_cache_size:
+                # Least recently used first
+                self._responses.pop(next(iter(self._responses)))
+        self._responses[key] = body
+        return body
+
+    def _scrimba_response(self, courses: List[CourseRecord]) -> Dict[str, Any]:
+        scrimba = [c for c in courses if c.platform == "Scrimba"]
+        # Free first, then by rating
+        scrimba.sort(key=lambda c: (0 if is_free(c) else 1, -(c.rating or 0)))
+        free_courses = [listing_dict(c) for c in scrimba if is_free(c)]
+        pro_courses = [listing_dict(c) for c in scrimba if not is_free(c)]
+        return {
+            "courses": [listing_dict(c) for c in scrimba],
+            "total": len(scrimba),
+            "free_courses": free_courses,
+            "pro_courses": pro_courses,
+            "free_count": len(free_courses),
+            "pro_count": len(pro_courses),
+        }
+
+
+course_catalog = CourseCatalog(course_store.records(LISTING))
@@ -0,0 +1,400 @@
+"""
+Cover letter generation - one concurrent model call per variation.
+
+The three variations used to come back in a single 4000-token JSON response:
+nothing could be shown until the last letter was written, and one malformed
+letter failed all three. Now every variation is its own smaller call:
+
+  - the writing guidelines and the distilled job/resume context form an identical system
+    prefix. When it is long enough for Anthropic's prompt cache (CACHE_MIN_TOKENS)
+    it is marked for caching: the first call writes the cache and the others
+    start as soon as it has begun responding, so they read the prefix from cache
+    instead of paying for it again. Shorter prefixes can't be cached, so all
+    variations start at once.
+  - the job context comes from the per-posting analysis (services/job_analysis.py)
+    and is its own cache block, so it is shared by everyone applying to a posting
+  - results are yielded as each variation completes (see generate_variants)
+  - a variation that fails or returns bad JSON is retried on its own
+
+job_match_analysis is computed locally from the skill taxonomy instead of
+asking the model for it, and company research comes from the shared cache
+(services/company_cache.py) when another user has already applied there. On a
+miss, the letters still describe the company for this user, and a separate
+research call that sees only the company and the posting fills the cache.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import anthropic
+
+from config import ANTHROPIC_API_KEY
+from services.company_cache import company_cache, public_research
+from services.jd_distiller import format_candidate_context, resume_evidence
+from services.job_analysis import analyze_job
+from services.skill_matcher import find_skills
+
+async_claude_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+
+COVER_LETTER_MODEL = "claude-sonnet-4-20250514"
+# One letter plus its metadata; the old combined response needed 4000 for three
+VARIANT_MAX_TOKENS = 1500
+VARIANT_ATTEMPTS = 2
+# How long later variants wait for the first call to write the prompt cache
+CACHE_WARMUP_TIMEOUT = 8.0
+# Shared company research - a small call without any user's resume in it
+RESEARCH_MODEL = "claude-3-5-haiku-20241022"
+RESEARCH_MAX_TOKENS = 500
+# Shortest prefix Sonnet caches; shorter cache_control blocks are silently ignored
+CACHE_MIN_TOKENS = 1024
+# Tokens are estimated low (English runs about 3.5 characters per token), so a
+# prefix counted as long enough really is
+CHARS_PER_TOKEN = 4
+
+WRITING_GUIDELINES = """You are an expert career coach who writes authentic, compelling cover letters for tech professionals. Your letters sound natural and human - never robotic or templated.
+
+WRITING STYLE GUIDELINES:
+- Write conversationally but professionally (like talking to a colleague, not a robot)
+- Use contractions naturally (I'm, I've, you're) to sound human
+- Vary sentence length - mix short punchy sentences with longer explanatory ones
+- Use active voice and strong verbs
+- NO corporate jargon, buzzwords, or clichés ("synergy," "leverage," "dynamic team player")
+- NO generic openings like "I am writing to express my interest..."
+- Show personality while staying professional
+
+CRITICAL REQUIREMENTS:
+1. **Sound Human**: Read the letter aloud - if it sounds like a robot wrote it, rewrite it
+2. **Be Specific**: Use actual numbers, technologies, and project names from the resume
+3. **Show, Don't Tell**: Instead of "I'm passionate," say "I spent weekends building X because..."
+4. **Natural Keywords**: Weave in 6-8 of the required skills/keywords organically
+5. **Length**: 250-300 words (shorter is better - hiring managers are busy)
+
+AVOID:
+- "I am writing to apply for..."
+- "I am excited to submit my application..."
+- "I believe I would be a great fit..."
+- Listing skills without context
+- Generic enthusiasm ("passionate," "excited," "thrilled")
+- Overly formal language
+
+REMEMBER: Write like a human, not a corporate robot. Be specific, be authentic, be concise."""
+
+VARIANTS = [
+    {
+        "version_name": "Technical Depth",
+        "tone_applied": "conversational_technical",
+        "emphasis_area": "technical_expertise",
+        "brief": (
+            "Tone: Conversational but technically credible\n"
+            "Focus: Demonstrate deep technical expertise through specific examples\n"
+            "Opening: Lead with a technical observation about their product/stack or a relevant project you built\n"
+            'Example: "I\'ve been following [Company]\'s work on [specific tech]. When I saw you\'re hiring, I knew I had to reach out - I recently built something similar that [specific achievement]."'
+        ),
+    },
+    {
+        "version_name": "Impact & Results",
+        "tone_applied": "confident_results",
+        "emphasis_area": "business_impact",
+        "brief": (
+            "Tone: Confident and results-oriented (but not arrogant)\n"
+            "Focus: Quantifiable business impact and problem-solving\n"
+            "Opening: Lead with a relevant achievement or problem you've solved\n"
+            'Example: "Last quarter, I reduced our ML model\'s inference time by 60%, saving $200K annually. When I saw [Company] is tackling [similar challenge], I got excited."'
+        ),
+    },
+    {
+        "version_name": "Authentic Connection",
+        "tone_applied": "warm_genuine",
+        "emphasis_area": "culture_mission_fit",
+        "brief": (
+            "Tone: Warm, genuine, story-driven\n"
+            "Focus: Personal connection to company mission and collaborative mindset\n"
+            "Opening: Lead with why you care about what they're building\n"
+            'Example: "I\'ve been a [Company] user for [time] and [specific feature] changed how I work. The chance to build this is why I got into ML."'
+        ),
+    },
+]
+
+VARIANT_OUTPUT_FORMAT = """OUTPUT FORMAT (JSON only, no other text):
+{
+    "cover_letter": "[Full letter text]",
+    "key_highlights": ["highlight 1", "highlight 2", "highlight 3"],
+    "keywords_used": ["keyword1", "keyword2", ...],
+    "ats_score": 88%s
+}"""
+
+RESEARCH_OUTPUT_FIELD = """,
+    "company_research": {
+        "company_name": "Company Name",
+        "products_mentioned": ["product1", "product2"],
+        "why_compelling": "Brief note on what makes this company interesting"
+    }"""
+
+
+RESEARCH_PROMPT = """What should an applicant know about {company} when applying for this role? Use what you know about the company and the job posting below.
+
+{job_context}
+
+Return ONLY a JSON object, no other text:
+{{
+    "company_name": "{company}",
+    "products_mentioned": ["product1", "product2"],
+    "why_compelling": "Brief note on what makes this company interesting"
+}}"""
+
+
+class VariantError(Exception):
+    """A cover letter variation could not be generated"""
+
+
+async def research_company(company: str, job_context: str) -> Dict[str, Any]:
+    """
+    Company research for the shared cache. The prompt holds the company and the
+    posting only, so the result says nothing about the user who triggered it.
+    """
+    try:
+        message = await async_claude_client.messages.create(
+            model=RESEARCH_MODEL,
+            max_tokens=RESEARCH_MAX_TOKENS,
+            messages=[{"role": "user", "content": RESEARCH_PROMPT.format(company=company, job_context=job_context)}],
+        )
+        text = "".join(block.text for block in message.content if block.type == "text")
+        match = re.search(r'\{[\s\S]*\}', text)
+        return public_research(json.loads(match.group()) if match else {})
+    except (anthropic.APIError, json.JSONDecodeError) as e:
+        logging.warning(f"Company research for {company!r} failed: {e}")
+        return {}
+
+
+def build_system_prompt(company: str, role: str, job_description: str, resume_text: str,
+                        company_research: Optional[Dict[str, Any]] = None,
+                        job_analysis: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Shared prefix for every variation - identical bytes, so it is cached after the first call.
+    The JD and resume are distilled locally (services/jd_distiller.py) rather than sent raw,
+    and cached company research (services/company_cache.py) is included when there is some.
+    Guidelines + job context come first so that prefix is also reused across applicants.
+    Cache breakpoints are only set where the prefix up to them is long enough to be cached.
+    """
+    job_analysis = job_analysis or analyze_job(company, role, job_description)
+    distilled = job_analysis["distilled"]
+    job_context = job_analysis["job_context"]
+    if company_research:
+        products = ", ".join(company_research.get("products_mentioned") or [])
+        job_context += "\n\nCOMPANY RESEARCH (already known - use it, don't research again):"
+        if products:
+            job_context += f"\nProducts: {products}"
+        if company_research.get("why_compelling"):
+            job_context += f"\nWhy compelling: {company_research['why_compelling']}"
+
+    evidence = resume_evidence(resume_text, distilled["required_skills"] + distilled["nice_to_have_skills"])
+    system = [
+        {"type": "text", "text": WRITING_GUIDELINES},
+        {"type": "text", "text": job_context},
+        {"type": "text", "text": format_candidate_context(evidence, fallback_resume=resume_text or "")},
+    ]
+    prefix_chars = 0
+    for block in system:
+        prefix_chars += len(block["text"])
+        if block is not system[0] and prefix_chars // CHARS_PER_TOKEN >= CACHE_MIN_TOKENS:
+            block["cache_control"] = {"type": "ephemeral"}
+    return system
+
+
+def is_cached_prefix(system: List[Dict[str, Any]]) -> bool:
+    return any("cache_control" in block for block in system)
+
+
+def variant_message(variant: Dict[str, str], research_known: bool = False) -> str:
+    """Per-variation instructions; company_research is only requested when it isn't cached"""
+    output_format = VARIANT_OUTPUT_FORMAT % ("" if research_known else RESEARCH_OUTPUT_FIELD)
+    return f"""Write ONE cover letter for this application in the "{variant['version_name']}" style.
+
+{variant['brief']}
+
+Use what you know about the company and the company signals above: reference specific products, technologies or initiatives, and its mission or culture. Only use resume facts listed above.
+
+{output_format}"""
+
+
+def parse_variant(response_text: str, variant: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(version, company_research) from one variation's JSON response"""
+    text = re.sub(r'```json\s*', '', response_text)
+    text = re.sub(r'```\s*', '', text).strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise VariantError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise VariantError("Response is not a JSON object")
+
+    letter = (data.get("cover_letter") or "").strip()
+    if len(letter.split()) < 50:
+        raise VariantError("Cover letter missing or too short")
+
+    version = {
+        "version_name": variant["version_name"],
+        "tone_applied": variant["tone_applied"],
+        "emphasis_area": variant["emphasis_area"],
+        "cover_letter": letter,
+        "key_highlights": data.get("key_highlights", []),
+        "keywords_used": data.get("keywords_used", []),
+        "word_count": len(letter.split()),
+        "ats_score": data.get("ats_score", 0),
+    }
+    return version, data.get("company_research") or {}
+
+
+def job_match_analysis(resume_text: str, job_description: str,
+                       job_skills: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Skill overlap between resume and job description (job_skills from a stored job analysis)"""
+    job_skills = set(job_skills) if job_skills is not None else find_skills(job_description or "")
+    resume_skills = find_skills(resume_text or "")
+    matching = sorted(job_skills & resume_skills)
+    return {
+        "match_score": round(100 * len(matching) / len(job_skills)) if job_skills else 0,
+        "matching_skills": matching,
+        "skills_emphasized": matching[:6],
+        "potential_gaps": sorted(job_skills - resume_skills),
+    }
+
+
+async def _generate_variant(
+    index: int,
+    system: List[Dict[str, Any]],
+    prefix_cached: asyncio.Event,
+    research_known: bool = False,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    variant = VARIANTS[index]
+    if index > 0:
+        # Read the shared prefix from cache rather than racing the first call to write it
+        try:
+            await asyncio.wait_for(prefix_cached.wait(), timeout=CACHE_WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    last_error: Optional[Exception] = None
+    for attempt in range(VARIANT_ATTEMPTS):
+        try:
+            async with async_claude_client.messages.stream(
+                model=COVER_LETTER_MODEL,
+                max_tokens=VARIANT_MAX_TOKENS,
+                system=system,
+                messages=[{"role": "user", "content": variant_message(variant, research_known)}],
+            ) as stream:
+                # The first event arrives once the prompt is processed, i.e. the cache is written
+                async for _ in stream:
+                    prefix_cached.set()
+                    break
+                message = await stream.get_final_message()
+            text = "".join(block.text for block in message.content if block.type == "text")
+            return parse_variant(text, variant)
+        except (anthropic.APIError, VariantError) as e:
+            last_error = e
+            logging.warning(f"Cover letter variant '{variant['version_name']}' attempt {attempt + 1} failed: {e}")
+        finally:
+            # Never leave the other variations waiting on a call that failed
+            if index == 0:
+                prefix_cached.set()
+    raise VariantError(f"{variant['version_name']}: {last_error}")
+
+
+async def generate_variants(
+    company: str,
+    role: str,
+    job_description: str,
+    resume_text: str,
+    job_analysis: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (index, version, company_research, error) for each variation as it
+    completes - version is None and error set when a variation failed all attempts.
+    """
+    if not async_claude_client:
+        raise VariantError("AI service not configured")
+
+    cached_research = await company_cache.get(company)
+    job_analysis = job_analysis or analyze_job(company, role, job_description)
+    system = build_system_prompt(company, role, job_description, resume_text, cached_research, job_analysis)
+    prefix_cached = asyncio.Event()
+    if not is_cached_prefix(system):
+        # Too short to be cached - nothing to wait for
+        prefix_cached.set()
+
+    async def run(index: int):
+        try:
+            version, research = await _generate_variant(index, system, prefix_cached, bool(cached_research))
+        except VariantError as e:
+            return index, None, None, str(e)
+        except Exception as e:
+            # Whatever went wrong, the variations that did finish are still saved
+            logging.exception(f"Cover letter variant {index} failed")
+            return index, None, None, f"{VARIANTS[index]['version_name']}: {e}"
+        # This user's own research (written with their resume in view) is returned, never cached
+        return index, version, cached_research or research, None
+
+    async def fill_cache():
+        # First generation for this company fills the shared cache for everyone else
+        await company_cache.put(company, await research_company(company, job_analysis["job_context"]))
+
+    tasks = [asyncio.create_task(run(index)) for index in range(len(VARIANTS))]
+    if not cached_research:
+        tasks.append(asyncio.create_task(fill_cache()))
+    try:
+        for next_done in asyncio.as_completed(tasks[:len(VARIANTS)]):
+            yield await next_done
+        for error in await asyncio.gather(*tasks[len(VARIANTS):], return_exceptions=True):
+            if isinstance(error, Exception):
+                logging.warning(f"Company research for {company!r} was not cached: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class CoverLetterResults:
+    """Collects generate_variants output into the cover letter data that is saved and returned"""
+
+    def __init__(self):
+        self.versions: List[Optional[Dict[str, Any]]] = [None] * len(VARIANTS)
+        self.company_research: Dict[str, Any] = {}
+        self.errors: List[str] = []
+
+    def add(self, index: int, version: Optional[Dict[str, Any]], research: Optional[Dict[str, Any]],
+            error: Optional[str]) -> None:
+        if error:
+            self.errors.append(error)
+            return
+        self.versions[index] = version
+        if index == 0 or not self.company_research:
+            self.company_research = research or self.company_research
+
+    def result(self, resume_text: str, job_description: str,
+               job_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Versions in VARIANTS order - raises VariantError when every variation failed"""
+        generated = [v for v in self.versions if v]
+        if not generated:
+            raise VariantError("; ".join(self.errors) or "No cover letters generated")
+        return {
+            "versions": generated,
+            "company_research": self.company_research,
+            "job_match_analysis": job_match_analysis(
+                resume_text, job_description, job_analysis["job_skills"] if job_analysis else None
+            ),
+            "failed_variants": self.errors,
+        }
+
+
+async def generate_cover_letters(
+    company: str,
+    role: str,
+    job_description: str,
+    resume_text: str,
+    job_analysis: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """All variations at once (in VARIANTS order) - for callers that don't stream"""
+    results = CoverLetterResults()
+    async for item in generate_variants(company, role, job_description, resume_text, job_analysis):
+        results.add(*item)
+    return results.result(resume_text, job_description, job_analysis)
@@ -0,0 +1,53 @@
+"""
+Document AST - the intermediate model every export format is emitted from.
+
+A CV version is parsed into blocks once and the result is stored on its
+cv_generations record (document_ast.<version type>), so exporting PDF, DOCX,
+plain text and Markdown of the same CV only costs emitter time and all formats
+agree on structure.
+
+Stored ASTs carry the parser version and a hash of the source text; either one
+changing makes the stored copy stale and it is rebuilt on next use.
+"""
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from services.document_templates import Block, parse_cover_letter, parse_cv, parse_learning_path
+
+# Bump when the parsers in document_templates change how text becomes blocks
+AST_VERSION = 1
+
+PARSERS = {
+    "cv": parse_cv,
+    "cover_letter": parse_cover_letter,
+    "learning_path": parse_learning_path,
+}
+
+
+def source_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def build_ast(kind: str, *source: Any) -> Dict[str, Any]:
+    """Parse a document into its storable AST"""
+    blocks = PARSERS[kind](*source)
+    return {
+        "version": AST_VERSION,
+        "kind": kind,
+        "source_hash": source_hash(repr(source)),
+        "blocks": [[block.kind, block.text] for block in blocks],
+    }
+
+
+def ast_is_current(ast: Optional[Dict[str, Any]], kind: str, *source: Any) -> bool:
+    return bool(
+        ast
+        and ast.get("version") == AST_VERSION
+        and ast.get("kind") == kind
+        and ast.get("source_hash") == source_hash(repr(source))
+    )
+
+
+def ast_blocks(ast: Dict[str, Any]) -> List[Block]:
+    """Blocks from a stored AST"""
+    return [Block(kind, text) for kind, text in ast["blocks"]]
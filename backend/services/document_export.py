@@ -0,0 +1,142 @@
+"""
+Account export - every CV, cover letter and learning path as one zip.
+
+The archive is streamed: records are read from cursors in small batches,
+each document is rendered on the render pool, written to the zip and the
+compressed bytes are handed to the response straight away. Memory stays at
+roughly one rendered document however long the history is.
+
+Rendering bypasses the render cache - an export touches every document once,
+and caching them would only evict the documents users actually re-download.
+"""
+import logging
+import re
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from services.document_ast import ast_is_current, build_ast
+from services.document_templates import DEFAULT_TEMPLATE
+from services.learning_paths import learning_path_templates
+from services.render_pool import render_pool
+
+# Records fetched per cursor round trip
+EXPORT_BATCH_SIZE = 20
+
+# PDF and DOCX are already compressed, deflating them again only costs CPU
+STORED_FORMATS = ("pdf", "docx")
+
+
+class ZipStream:
+    """
+    Write-only, non-seekable file object for zipfile.
+
+    zipfile detects that it can't seek and writes data descriptors after each
+    member instead of patching local headers, so everything written can be
+    handed out immediately with drain().
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _slug(text: str, limit: int = 40) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_").lower()
+    return slug[:limit] or "untitled"
+
+
+def _entry_name(folder: str, record: Dict[str, Any], *parts: str, format: str) -> str:
+    """e.g. cvs/2024-05-01_ml_engineer_hybrid_1a2b3c4d.pdf"""
+    date = (record.get("created_at") or "")[:10] or "undated"
+    label = "_".join(_slug(p) for p in parts if p)
+    return f"{folder}/{date}_{label}_{(record.get('id') or '')[:8]}.{format}"
+
+
+def _cv_documents(record: Dict[str, Any]) -> List[Tuple[Tuple[str, ...], List]]:
+    """One document per CV version, reusing the stored AST when it is current"""
+    stored = record.get("document_ast") or {}
+    documents = []
+    for version in record.get("versions", []):
+        content = version.get("content", "")
+        ast = stored.get(version.get("type"))
+        if not ast_is_current(ast, "cv", content):
+            ast = build_ast("cv", content)
+        documents.append(((record.get("target_role", ""), version.get("type", "cv")), ast["blocks"]))
+    return documents
+
+
+def _cover_letter_documents(record: Dict[str, Any]) -> List[Tuple[Tuple[str, ...], List]]:
+    return [
+        ((record.get("company_name", ""), record.get("target_role", ""), f"v{index + 1}"),
+         build_ast("cover_letter", version.get("cover_letter", ""))["blocks"])
+        for index, version in enumerate(record.get("versions", []))
+        if version.get("cover_letter")
+    ]
+
+
+def _learning_path_documents(record: Dict[str, Any]) -> List[Tuple[Tuple[str, ...], List]]:
+    target_role = record.get("target_role", "")
+    blocks = build_ast("learning_path", record.get("path_data") or {}, target_role)["blocks"]
+    return [((target_role,), blocks)]
+
+
+# (collection, folder in the archive, document kind, record -> documents)
+EXPORT_SOURCES = (
+    ("cv_generations", "cvs", "cv", _cv_documents),
+    ("cover_letters", "cover_letters", "cover_letter", _cover_letter_documents),
+    ("learning_paths", "learning_paths", "learning_path", _learning_path_documents),
+)
+
+
+async def export_archive(
+    db: Any,
+    user_id: str,
+    format: str = "pdf",
+    template: str = DEFAULT_TEMPLATE,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield a zip archive of the user's documents chunk by chunk"""
+    stream = ZipStream()
+    compression = zipfile.ZIP_STORED if format in STORED_FORMATS else zipfile.ZIP_DEFLATED
+    failures: List[str] = []
+    exported = 0
+
+    with zipfile.ZipFile(stream, mode="w", compression=compression) as archive:
+        for collection, folder, kind, documents_of in EXPORT_SOURCES:
+            cursor = db[collection].find({"user_id": user_id}, {"_id": 0}).sort("created_at", 1).batch_size(batch_size)
+            async for record in cursor:
+                if kind == "learning_path":
+                    # Stored as a template reference - see services/learning_paths.py
+                    record = await learning_path_templates.resolve(record)
+                for parts, blocks in documents_of(record):
+                    name = _entry_name(folder, record, *parts, format=format)
+                    try:
+                        data = await render_pool.render(kind, format, [blocks, template])
+                    except Exception as e:
+                        logging.error(f"Export render failed for {name}: {e}")
+                        failures.append(name)
+                        continue
+                    archive.writestr(name, data)
+                    exported += 1
+                    chunk = stream.drain()
+                    if chunk:
+                        yield chunk
+
+        if failures:
+            archive.writestr("export_errors.txt", "These documents could not be rendered:\n" + "\n".join(failures) + "\n")
+        elif not exported:
+            archive.writestr("README.txt", "No CVs, cover letters or learning paths were found for this account.\n")
+
+    # Central directory
+    yield stream.drain()
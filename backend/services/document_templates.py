@@ -0,0 +1,303 @@
+"""
+Document template engine.
+
+Documents are rendered in two steps:
+  1. parse_* turns CV / cover letter / learning path data into a flat tree of
+     Blocks (title, heading, paragraph, bullet, spacer) - the only place the
+     "first line is the name, ALL CAPS is a heading" rules live.
+  2. an emitter (EMITTERS: pdf, docx, txt, md) lays the blocks out, using a
+     compiled Template for the styled formats.
+
+Templates are compiled once at import: every ParagraphStyle and page margin
+for every (template, document kind) pair is built up front, so a render only
+creates flowables. PDFs whose text needs more than Latin-1 switch to a Unicode
+variant of the styles (services/fonts.py), built the first time it is needed.
+"""
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt, RGBColor
+
+from services.fonts import font_registry, needs_unicode_fonts
+
+DEFAULT_TEMPLATE = "classic"
+DOCUMENT_KINDS = ("cv", "cover_letter", "learning_path")
+
+BULLET_CHARS = ("•", "-", "*", "▪", "●")
+
+
+@dataclass(frozen=True)
+class Block:
+    kind: str  # title | heading | paragraph | bullet | spacer
+    text: str = ""
+
+
+# --------------------------------------------------------------------------
+# Parsing - data -> blocks
+# --------------------------------------------------------------------------
+
+def parse_cv(content: str) -> List[Block]:
+    """First non-empty line is the name, ALL CAPS lines are section headings"""
+    blocks: List[Block] = []
+    for raw in content.split("\n"):
+        line = raw.strip()
+        if not line:
+            if blocks and blocks[-1].kind != "spacer":
+                blocks.append(Block("spacer"))
+        elif not blocks:
+            blocks.append(Block("title", line))
+        elif line.isupper():
+            blocks.append(Block("heading", line))
+        elif line.startswith(BULLET_CHARS):
+            blocks.append(Block("bullet", line.lstrip("".join(BULLET_CHARS)).strip()))
+        else:
+            blocks.append(Block("paragraph", line))
+    return blocks
+
+
+def parse_cover_letter(text: str) -> List[Block]:
+    """One paragraph per blank-line separated block"""
+    return [Block("paragraph", " ".join(p.split())) for p in text.split("\n\n") if p.strip()]
+
+
+def parse_learning_path(path_data: Dict[str, Any], target_role: str) -> List[Block]:
+    """Title, overview and one heading per week with its courses as bullets"""
+    blocks = [Block("title", f"Learning Path: {target_role}")]
+    overview = path_data.get("path_overview", {})
+    blocks.append(Block("paragraph", f"Duration: {overview.get('duration_weeks', 16)} weeks"))
+    blocks.append(Block("paragraph", f"Hours/week: {overview.get('hours_per_week', 10)}"))
+    for week in path_data.get("weeks", []):
+        blocks.append(Block("heading", f"Week {week.get('week')}: {week.get('focus', '')}"))
+        if week.get("phase"):
+            blocks.append(Block("paragraph", f"Phase: {week.get('phase')}"))
+        for course in week.get("courses", []):
+            blocks.append(Block("bullet", f"{course.get('name')} - {course.get('platform')}"))
+    return blocks
+
+
+# --------------------------------------------------------------------------
+# Templates - compiled once per process
+# --------------------------------------------------------------------------
+
+# Visual templates. Sizes are for the body text; headings and titles scale from it.
+TEMPLATE_SPECS = {
+    "classic": {
+        "label": "Classic",
+        "font": "Helvetica", "bold_font": "Helvetica-Bold",
+        "accent": "#1a365d", "size": 10, "title_align": TA_CENTER,
+        "margins": {"cv": 0.5, "cover_letter": 0.75, "learning_path": 1.0},
+    },
+    "modern": {
+        "label": "Modern",
+        "font": "Helvetica", "bold_font": "Helvetica-Bold",
+        "accent": "#0f766e", "size": 10, "title_align": TA_LEFT,
+        "margins": {"cv": 0.6, "cover_letter": 0.9, "learning_path": 0.8},
+    },
+    "compact": {
+        "label": "Compact",
+        "font": "Helvetica", "bold_font": "Helvetica-Bold",
+        "accent": "#222222", "size": 9, "title_align": TA_LEFT,
+        "margins": {"cv": 0.4, "cover_letter": 0.6, "learning_path": 0.5},
+    },
+    "serif": {
+        "label": "Serif",
+        "font": "Times-Roman", "bold_font": "Times-Bold",
+        "accent": "#4a1d1d", "size": 11, "title_align": TA_CENTER,
+        "margins": {"cv": 0.7, "cover_letter": 1.0, "learning_path": 0.8},
+    },
+}
+
+
+@dataclass
+class Template:
+    name: str
+    label: str
+    spec: Dict[str, Any]
+    # (document kind, block kind) -> ParagraphStyle
+    styles: Dict[Tuple[str, str], ParagraphStyle] = field(default_factory=dict)
+    # document kind -> spacer height in points
+    spacers: Dict[str, float] = field(default_factory=dict)
+    # same styles with TrueType fonts, built on first use
+    unicode_styles: Optional[Dict[Tuple[str, str], ParagraphStyle]] = None
+
+    def styles_for(self, blocks: List["Block"]) -> Dict[Tuple[str, str], ParagraphStyle]:
+        """Standard-font styles, or the Unicode variant when the text needs it"""
+        if not needs_unicode_fonts(block.text for block in blocks):
+            return self.styles
+        if self.unicode_styles is None:
+            self.unicode_styles = {
+                key: ParagraphStyle(f"{style.name}-unicode", parent=style,
+                                    fontName=font_registry.resolve(style.fontName))
+                for key, style in self.styles.items()
+            }
+        return self.unicode_styles
+
+
+def _compile(name: str, spec: Dict[str, Any]) -> Template:
+    base = getSampleStyleSheet()["Normal"]
+    size = spec["size"]
+    accent = HexColor(spec["accent"])
+    template = Template(name=name, label=spec["label"], spec=spec)
+
+    def style(kind: str, block: str, **overrides) -> None:
+        params = {"parent": base, "fontName": spec["font"], "fontSize": size, "leading": size * 1.2, **overrides}
+        template.styles[(kind, block)] = ParagraphStyle(f"{name}-{kind}-{block}", **params)
+
+    # CV
+    style("cv", "title", fontName=spec["bold_font"], fontSize=size + 6, leading=(size + 6) * 1.2,
+          spaceAfter=6, alignment=spec["title_align"])
+    style("cv", "heading", fontName=spec["bold_font"], fontSize=size + 1, leading=(size + 1) * 1.2,
+          spaceBefore=10, spaceAfter=4, textColor=accent)
+    style("cv", "paragraph", spaceAfter=3)
+    style("cv", "bullet", spaceAfter=3, leftIndent=12, bulletIndent=2)
+    template.spacers["cv"] = 6
+
+    # Cover letter
+    style("cover_letter", "title", fontName=spec["bold_font"], fontSize=size + 4, spaceAfter=12)
+    style("cover_letter", "heading", fontName=spec["bold_font"], fontSize=size + 1, spaceAfter=6)
+    style("cover_letter", "paragraph", fontSize=size + 1, leading=(size + 1) * 1.45,
+          spaceAfter=24, alignment=TA_JUSTIFY)
+    style("cover_letter", "bullet", fontSize=size + 1, leading=(size + 1) * 1.45, leftIndent=14, bulletIndent=2)
+    template.spacers["cover_letter"] = 12
+
+    # Learning path
+    style("learning_path", "title", fontName=spec["bold_font"], fontSize=size + 8,
+          leading=(size + 8) * 1.2, spaceAfter=20, textColor=accent)
+    style("learning_path", "heading", fontName=spec["bold_font"], fontSize=size + 4,
+          leading=(size + 4) * 1.2, spaceBefore=12, spaceAfter=6)
+    style("learning_path", "paragraph", spaceAfter=4)
+    style("learning_path", "bullet", spaceAfter=2, leftIndent=14, bulletIndent=4)
+    template.spacers["learning_path"] = 8
+    return template
+
+
+TEMPLATES: Dict[str, Template] = {name: _compile(name, spec) for name, spec in TEMPLATE_SPECS.items()}
+
+
+def get_template(name: str) -> Template:
+    """Compiled template by name (unknown names get the default)"""
+    return TEMPLATES.get(name) or TEMPLATES[DEFAULT_TEMPLATE]
+
+
+def list_templates() -> List[Dict[str, str]]:
+    return [{"id": t.name, "label": t.label} for t in TEMPLATES.values()]
+
+
+# --------------------------------------------------------------------------
+# Emitters - blocks -> bytes
+# --------------------------------------------------------------------------
+
+def emit_pdf(blocks: List[Block], template: Template, kind: str) -> bytes:
+    """Lay blocks out as a PDF with the template's compiled styles"""
+    margin = template.spec["margins"][kind] * inch
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=letter,
+        rightMargin=margin, leftMargin=margin, topMargin=margin, bottomMargin=margin
+    )
+
+    styles = template.styles_for(blocks)
+    story = []
+    for block in blocks:
+        if block.kind == "spacer":
+            story.append(Spacer(1, template.spacers[kind]))
+        elif block.kind == "bullet":
+            story.append(Paragraph(escape(block.text), styles[(kind, "bullet")], bulletText="•"))
+        else:
+            # Paragraph parses its text as markup - escape so "R&D" or "<5ms" can't break the render
+            story.append(Paragraph(escape(block.text), styles[(kind, block.kind)]))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def emit_docx(blocks: List[Block], template: Template, kind: str) -> bytes:
+    """Write blocks to DOCX using Word's built-in styles with the template's font and accent"""
+    spec = template.spec
+    doc = Document()
+    normal = doc.styles["Normal"].font
+    normal.name = "Times New Roman" if spec["font"].startswith("Times") else "Arial"
+    normal.size = Pt(spec["size"] + (1 if kind == "cover_letter" else 0))
+    accent = RGBColor.from_string(spec["accent"].lstrip("#").upper())
+
+    for block in blocks:
+        if block.kind == "spacer":
+            continue
+        if block.kind in ("title", "heading"):
+            para = doc.add_heading(block.text, level=0 if block.kind == "title" else 1)
+            for run in para.runs:
+                run.font.color.rgb = accent
+            if block.kind == "title" and spec["title_align"] == TA_CENTER:
+                para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        elif block.kind == "bullet":
+            doc.add_paragraph(block.text, style="List Bullet")
+        else:
+            para = doc.add_paragraph(block.text)
+            if kind == "cover_letter":
+                para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def emit_text(blocks: List[Block], template: Template, kind: str) -> bytes:
+    """Plain UTF-8 text - the same structure without styling (template is ignored)"""
+    lines: List[str] = []
+    for block in blocks:
+        if block.kind == "spacer":
+            if lines and lines[-1]:
+                lines.append("")
+        elif block.kind in ("title", "heading"):
+            if lines and lines[-1]:
+                lines.append("")
+            lines.append(block.text.upper() if block.kind == "heading" else block.text)
+            if block.kind == "title" and kind != "cv":
+                lines.append("")
+        elif block.kind == "bullet":
+            lines.append(f"• {block.text}")
+        else:
+            lines.append(block.text)
+            if kind == "cover_letter":
+                lines.append("")
+    return ("\n".join(lines).strip() + "\n").encode("utf-8")
+
+
+_MARKDOWN_SPECIAL = str.maketrans({c: f"\\{c}" for c in "\\`*_[]<>#|"})
+
+
+def emit_markdown(blocks: List[Block], template: Template, kind: str) -> bytes:
+    """GitHub-flavoured Markdown (template is ignored)"""
+    parts: List[str] = []
+    for block in blocks:
+        text = block.text.translate(_MARKDOWN_SPECIAL)
+        if block.kind == "spacer":
+            continue
+        if block.kind == "title":
+            parts.append(f"# {text}\n")
+        elif block.kind == "heading":
+            parts.append(f"\n## {text}\n")
+        elif block.kind == "bullet":
+            parts.append(f"- {text}")
+        else:
+            parts.append(f"{text}\n")
+    return ("\n".join(parts).strip() + "\n").encode("utf-8")
+
+
+# Output format -> emitter; every emitter takes (blocks, template, document kind)
+EMITTERS = {
+    "pdf": emit_pdf,
+    "docx": emit_docx,
+    "txt": emit_text,
+    "md": emit_markdown,
+}
@@ -0,0 +1,89 @@
+"""
+Document rendering - CV, cover letter and learning path exports.
+
+Every renderer builds the document into a BytesIO and returns the bytes, so
+downloads never touch the filesystem (works on read-only/serverless hosts and
+nothing is left behind in DOWNLOADS_DIR). Layout and styling come from the
+compiled templates in services/document_templates.py.
+"""
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import Response
+
+from services.document_ast import PARSERS
+from services.document_templates import DEFAULT_TEMPLATE, EMITTERS, Block, get_template
+
+# Bump whenever an emitter's output changes so cached documents and ETags are invalidated
+TEMPLATE_VERSION = 4
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain; charset=utf-8",
+    "md": "text/markdown; charset=utf-8",
+}
+EXPORT_FORMATS = tuple(EMITTERS)
+
+
+def render_blocks(kind: str, format: str, blocks: List, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Emit parsed blocks (Block or stored [kind, text] pairs) in one output format"""
+    blocks = [b if isinstance(b, Block) else Block(*b) for b in blocks]
+    return EMITTERS[format](blocks, get_template(template), kind)
+
+
+def render_document(kind: str, format: str, *source: Any, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Parse and emit in one go - for callers without a stored AST"""
+    return EMITTERS[format](PARSERS[kind](*source), get_template(template), kind)
+
+
+def render_cv_pdf(content: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render CV text to PDF - first line is the name, ALL CAPS lines are section headings"""
+    return render_document("cv", "pdf", content, template=template)
+
+
+def render_cv_docx(content: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render CV text to DOCX using the same heading rules as the PDF"""
+    return render_document("cv", "docx", content, template=template)
+
+
+def render_cover_letter_pdf(text: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render a cover letter to PDF, one justified paragraph per blank-line block"""
+    return render_document("cover_letter", "pdf", text, template=template)
+
+
+def render_cover_letter_docx(text: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render a cover letter to DOCX"""
+    return render_document("cover_letter", "docx", text, template=template)
+
+
+def render_learning_path_pdf(path_data: Dict, target_role: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render a learning path's overview and weekly plan to PDF"""
+    return render_document("learning_path", "pdf", path_data, target_role, template=template)
+
+
+def render_learning_path_docx(path_data: Dict, target_role: str, template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render a learning path's overview and weekly plan to DOCX"""
+    return render_document("learning_path", "docx", path_data, target_role, template=template)
+
+
+def download_filename(prefix: str, format: str) -> str:
+    """Unique attachment name such as cv_hybrid_1a2b3c4d.pdf"""
+    return f"{prefix}_{str(uuid.uuid4())[:8]}.{format}"
+
+
+def document_response(content: bytes, filename: str, media_type: Optional[str] = None,
+                      headers: Optional[Dict[str, str]] = None, etag: Optional[str] = None) -> Response:
+    """Send rendered bytes as an attachment with an exact Content-Length (and ETag when cached)"""
+    extension = filename.rsplit('.', 1)[-1]
+    extra = {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+    return Response(
+        content=content,
+        media_type=media_type or MEDIA_TYPES.get(extension, "application/octet-stream"),
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(len(content)),
+            **extra,
+            **(headers or {})
+        }
+    )
@@ -0,0 +1,111 @@
+"""
+Font registry for PDF exports.
+
+reportlab's built-in Helvetica/Times only cover Latin-1, so names such as
+"Łukasz", "Nguyễn" or "Дмитрий" come out as black boxes. Documents that need
+more are rendered with TrueType replacements:
+
+  - each TTF is located and parsed once per process (parsing a font costs far
+    more than rendering a CV), then reused by every render
+  - reportlab embeds a per-document subset holding only the glyphs that
+    document uses, so a CV with one accented name carries a few KB of font
+    data rather than the whole file
+  - documents that fit in the standard fonts don't embed anything, so the
+    common case stays as small as before
+
+Scripts that need glyph shaping (Devanagari, Thai) are not covered by this.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import reportlab
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+from config import PDF_FONT_DIRS
+
+FONT_DIRS = [
+    *PDF_FONT_DIRS,
+    str(Path(__file__).resolve().parent.parent / "fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+    str(Path(reportlab.__file__).parent / "fonts"),
+]
+
+# Standard font -> (registered name, candidate TTF files in order of preference)
+UNICODE_FONTS = {
+    "Helvetica": ("UnicodeSans", ("DejaVuSans.ttf", "NotoSans-Regular.ttf")),
+    "Helvetica-Bold": ("UnicodeSans-Bold", ("DejaVuSans-Bold.ttf", "NotoSans-Bold.ttf")),
+    "Times-Roman": ("UnicodeSerif", ("DejaVuSerif.ttf", "NotoSerif-Regular.ttf", "DejaVuSans.ttf")),
+    "Times-Bold": ("UnicodeSerif-Bold", ("DejaVuSerif-Bold.ttf", "NotoSerif-Bold.ttf", "DejaVuSans-Bold.ttf")),
+}
+
+# The standard PDF fonts use WinAnsiEncoding, i.e. cp1252
+STANDARD_ENCODING = "cp1252"
+
+
+def needs_unicode_fonts(texts: Iterable[str]) -> bool:
+    """True if any text has characters the standard PDF fonts can't draw"""
+    try:
+        "".join(texts).encode(STANDARD_ENCODING)
+        return False
+    except UnicodeEncodeError:
+        return True
+
+
+class FontRegistry:
+    def __init__(self, font_dirs: List[str]):
+        self.font_dirs = font_dirs
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, str]] = None
+        # standard font -> registered TTF name, or None when no candidate was found
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    def _font_index(self) -> Dict[str, str]:
+        """file name -> path for every .ttf under the font directories (first match wins)"""
+        if self._index is None:
+            index: Dict[str, str] = {}
+            for directory in self.font_dirs:
+                for root, _, files in os.walk(directory):
+                    for name in files:
+                        if name.lower().endswith(".ttf"):
+                            index.setdefault(name, os.path.join(root, name))
+            self._index = index
+        return self._index
+
+    def _register(self, base: str) -> Optional[str]:
+        name, candidates = UNICODE_FONTS[base]
+        if name in pdfmetrics.getRegisteredFontNames():
+            return name
+        index = self._font_index()
+        for filename in candidates:
+            path = index.get(filename)
+            if not path:
+                continue
+            try:
+                pdfmetrics.registerFont(TTFont(name, path))
+                return name
+            except TTFError as e:
+                logging.warning(f"Could not load font {path}: {e}")
+        logging.warning(f"No Unicode font found for {base}; non-Latin text will not render correctly")
+        return None
+
+    def resolve(self, base: str) -> str:
+        """TTF replacement for a standard font name (the standard font if none is available)"""
+        if base not in UNICODE_FONTS:
+            return base
+        with self._lock:
+            if base not in self._resolved:
+                self._resolved[base] = self._register(base)
+            return self._resolved[base] or base
+
+    def register_all(self) -> Dict[str, str]:
+        """Load every replacement up front - used to warm render workers"""
+        return {base: self.resolve(base) for base in UNICODE_FONTS}
+
+
+font_registry = FontRegistry(FONT_DIRS)
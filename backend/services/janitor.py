@@ -0,0 +1,177 @@
+"""
+Downloads janitor - retention for legacy generated files in DOWNLOADS_DIR.
+
+Renderers no longer write to disk, but older builds (and anything still using
+the directory) left cv_*, cover_letter_* and learning_path_* files behind
+that nothing ever deleted. The janitor:
+  - sweeps orphaned legacy files once at startup
+  - then periodically evicts files older than DOWNLOADS_MAX_AGE_HOURS and,
+    oldest first, anything over the DOWNLOADS_MAX_BYTES quota
+and keeps counters of what it reclaimed (reported by /api/health).
+"""
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    DOWNLOADS_DIR, DOWNLOADS_JANITOR_INTERVAL_SECONDS, DOWNLOADS_MAX_AGE_HOURS, DOWNLOADS_MAX_BYTES,
+)
+
+LEGACY_PATTERNS = ("cv_*", "cover_letter_*", "learning_path_*")
+
+# Files younger than this are never treated as orphans, in case a writer is still busy with them
+ORPHAN_GRACE_SECONDS = 300
+
+
+class DownloadsJanitor:
+    def __init__(self, directory: Path, max_age_seconds: float, max_bytes: int, interval_seconds: float,
+                 patterns: Tuple[str, ...] = LEGACY_PATTERNS):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.patterns = patterns
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.files_removed = 0
+        self.bytes_removed = 0
+        self.errors = 0
+        self.last_run: Optional[float] = None
+        self.files = 0
+        self.bytes = 0
+
+    def _matches(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        """(path, size, mtime) of managed files, oldest first"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False) or not self._matches(entry.name):
+                        continue
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append((Path(entry.path), stat.st_size, stat.st_mtime))
+        except OSError:
+            # Missing or unreadable directory - nothing to clean
+            return []
+        entries.sort(key=lambda e: e[2])
+        return entries
+
+    def _remove(self, path: Path, size: int) -> bool:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self.errors += 1
+            logging.warning(f"Janitor could not remove {path}: {e}")
+            return False
+        self.files_removed += 1
+        self.bytes_removed += size
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Evict expired files, then the oldest files until the directory fits its quota"""
+        now = now or time.time()
+        files_before, bytes_before = self.files_removed, self.bytes_removed
+        remaining = []
+        for path, size, mtime in self._scan():
+            if now - mtime > self.max_age_seconds and self._remove(path, size):
+                continue
+            remaining.append((path, size, mtime))
+
+        total = sum(size for _, size, _ in remaining)
+        count = len(remaining)
+        for path, size, _ in remaining:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path, size):
+                total -= size
+                count -= 1
+
+        self.runs += 1
+        self.last_run = now
+        self.files = count
+        self.bytes = total
+        return {
+            "files_removed": self.files_removed - files_before,
+            "bytes_removed": self.bytes_removed - bytes_before,
+        }
+
+    def sweep_orphans(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Startup sweep - every renderer is in-memory, so legacy files past the grace period are orphans"""
+        now = now or time.time()
+        files_before, bytes_before = self.files_removed, self.bytes_removed
+        for path, size, mtime in self._scan():
+            if now - mtime > ORPHAN_GRACE_SECONDS:
+                self._remove(path, size)
+        return {
+            "files_removed": self.files_removed - files_before,
+            "bytes_removed": self.bytes_removed - bytes_before,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "files": self.files,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "runs": self.runs,
+            "files_removed": self.files_removed,
+            "bytes_removed": self.bytes_removed,
+            "errors": self.errors,
+            "last_run": self.last_run,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                reclaimed = await asyncio.to_thread(self.sweep)
+                if reclaimed["files_removed"]:
+                    logging.info(
+                        f"Downloads janitor removed {reclaimed['files_removed']} files "
+                        f"({reclaimed['bytes_removed']} bytes)"
+                    )
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Downloads janitor sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self) -> None:
+        """Orphan sweep, then periodic sweeps in the background (interval 0 disables both)"""
+        if self.interval_seconds <= 0 or self._task is not None:
+            return
+        reclaimed = await asyncio.to_thread(self.sweep_orphans)
+        if reclaimed["files_removed"]:
+            logging.info(
+                f"Removed {reclaimed['files_removed']} orphaned files from {self.directory} "
+                f"({reclaimed['bytes_removed']} bytes)"
+            )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+downloads_janitor = DownloadsJanitor(
+    DOWNLOADS_DIR,
+    max_age_seconds=DOWNLOADS_MAX_AGE_HOURS * 3600,
+    max_bytes=DOWNLOADS_MAX_BYTES,
+    interval_seconds=DOWNLOADS_JANITOR_INTERVAL_SECONDS,
+)
@@ -0,0 +1,226 @@
+"""
+Job description distiller - the parts of a JD a cover letter needs.
+
+Runs entirely locally with the shared skill matcher. Instead of sending up to
+4000 characters each of job description and resume, the cover letter prompt
+carries:
+  - the JD's required / nice-to-have skills, responsibilities, seniority and
+    company signals (distill_job_description)
+  - the resume lines that evidence those skills (resume_evidence)
+which is typically well under half the input tokens.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from services.ats_scorer import METRIC_RE
+from services.resume_parser import BULLET_RE, split_sections
+from services.skill_matcher import extract_skills
+
+# JD heading spellings -> canonical section name
+JD_SECTION_HEADINGS = {
+    "responsibilities": [
+        "responsibilities", "key responsibilities", "what you'll do", "what you will do",
+        "the role", "your role", "role overview", "duties", "day to day", "in this role",
+    ],
+    "requirements": [
+        "requirements", "qualifications", "minimum qualifications", "basic qualifications",
+        "what you'll need", "what you will need", "what we're looking for", "what we are looking for",
+        "who you are", "you have", "must have", "must haves", "required skills", "skills",
+    ],
+    "nice_to_have": [
+        "nice to have", "nice to haves", "preferred qualifications", "preferred", "bonus points",
+        "bonus", "pluses", "good to have", "it's a plus if",
+    ],
+    "company": [
+        "about us", "about the company", "who we are", "our mission", "why join us", "why us",
+        "about the team", "benefits", "perks", "what we offer",
+    ],
+}
+
+_JD_HEADING_LOOKUP = {
+    alias: section for section, aliases in JD_SECTION_HEADINGS.items() for alias in aliases
+}
+
+SENIORITY_LEVELS = [
+    ("principal", r"\b(?:principal|distinguished)\b"),
+    ("staff", r"\bstaff\b"),
+    ("lead", r"\b(?:lead|head of)\b"),
+    ("senior", r"\b(?:senior|sr\.?)\b"),
+    ("mid", r"\b(?:mid[- ]level|intermediate)\b"),
+    ("junior", r"\b(?:junior|jr\.?|entry[- ]level|graduate|new grad)\b"),
+    ("intern", r"\b(?:intern|internship)\b"),
+]
+YEARS_REQUIRED_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years?", re.IGNORECASE)
+
+COMPANY_SIGNAL_RE = re.compile(
+    r"\b(?:mission|we are|we're|our (?:team|customers|product|platform)|founded|series [a-e]|funded|"
+    r"backed by|customers|users|remote|hybrid|culture|values|growing|scale)\b",
+    re.IGNORECASE,
+)
+
+# Legal and HR boilerplate that says nothing about this particular company
+BOILERPLATE_RE = re.compile(
+    r"\b(?:equal opportunity|equal employment|affirmative action|accommodation|qualified applicants|"
+    r"without regard|veteran status|sexual orientation|e-verify|privacy notice)\b",
+    re.IGNORECASE,
+)
+
+MAX_RESPONSIBILITIES = 6
+MAX_COMPANY_SIGNALS = 3
+MAX_LINE_CHARS = 180
+
+
+def _jd_heading(line: str) -> Optional[str]:
+    stripped = line.strip().strip(":").strip()
+    if not stripped or len(stripped) > 45 or BULLET_RE.match(line):
+        return None
+    return _JD_HEADING_LOOKUP.get(re.sub(r"[^a-z'\s]", "", stripped.lower()).strip())
+
+
+def split_jd_sections(text: str) -> Dict[str, List[str]]:
+    """Non-empty JD lines grouped by section; lines before the first heading are "intro" """
+    sections: Dict[str, List[str]] = {"intro": []}
+    current = "intro"
+    for line in text.splitlines():
+        section = _jd_heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        elif line.strip():
+            sections.setdefault(current, []).append(line.strip())
+    return sections
+
+
+def _clean(line: str) -> str:
+    line = BULLET_RE.sub("", line).strip()
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def _sentences(lines: List[str]) -> List[str]:
+    return [s.strip() for line in lines for s in re.split(r"(?<=[.!?])\s+", line) if s.strip()]
+
+
+def detect_seniority(text: str, role: str = "") -> Dict[str, Any]:
+    """Level from the title (or the JD when the title says nothing) and the years asked for"""
+    level = None
+    for source in (role, text[:600]):
+        for name, pattern in SENIORITY_LEVELS:
+            if re.search(pattern, source or "", re.IGNORECASE):
+                level = name
+                break
+        if level:
+            break
+    years = [int(y) for y in YEARS_REQUIRED_RE.findall(text) if 0 < int(y) <= 20]
+    return {"level": level or "unspecified", "years_required": min(years) if years else None}
+
+
+def distill_job_description(text: str, company: str = "", role: str = "") -> Dict[str, Any]:
+    """Required skills, responsibilities, seniority and company signals from a job description"""
+    text = text or ""
+    sections = split_jd_sections(text)
+    required = extract_skills("\n".join(
+        line for name, lines in sections.items() if name != "nice_to_have" for line in lines
+    ))
+    nice_skills = [s for s in extract_skills("\n".join(sections.get("nice_to_have", []))) if s not in set(required)]
+
+    responsibilities = sections.get("responsibilities") or [
+        # No responsibilities heading - fall back to bullet lines that aren't requirements
+        line for line in sections.get("intro", []) if BULLET_RE.match(line)
+    ]
+
+    signal_lines = sections.get("intro", []) + sections.get("company", [])
+    company_lower = (company or "").lower()
+    signals = [
+        s for s in _sentences(signal_lines)
+        if not BOILERPLATE_RE.search(s)
+        and (COMPANY_SIGNAL_RE.search(s) or (company_lower and company_lower in s.lower()))
+    ]
+
+    return {
+        "required_skills": required,
+        "nice_to_have_skills": nice_skills,
+        "responsibilities": list(dict.fromkeys(map(_clean, responsibilities)))[:MAX_RESPONSIBILITIES],
+        "seniority": detect_seniority(text, role),
+        "company_signals": list(dict.fromkeys(map(_clean, signals)))[:MAX_COMPANY_SIGNALS],
+    }
+
+
+def resume_evidence(resume_text: str, skills: List[str], limit: int = 10) -> Dict[str, Any]:
+    """
+    The resume lines worth quoting for these skills: header (name/contact),
+    summary, then the experience/project lines ranked by skill matches and metrics.
+    """
+    sections = split_sections(resume_text or "")
+    wanted = set(skills)
+    # Unstructured resumes (no recognised headings) are searched line by line
+    searched = [n for n in ("experience", "projects", "awards") if n in sections] or ["header"]
+    scored = []
+    for name in searched:
+        for position, line in enumerate(sections[name].splitlines()):
+            line = line.strip()
+            if len(line) < 25:
+                continue
+            matched = [s for s in extract_skills(line) if s in wanted]
+            score = 2 * len(matched) + (1 if METRIC_RE.search(line) else 0)
+            if score:
+                scored.append((-score, name != "experience", position, _clean(line)))
+    scored.sort()
+
+    header = (sections.get("header") or "").splitlines()[:2]
+    matched_skills = [s for s in skills if s in set(extract_skills(resume_text or ""))]
+    return {
+        "header": [line.strip() for line in header if line.strip()],
+        "summary": _clean((sections.get("summary") or "").replace("\n", " ")) if sections.get("summary") else "",
+        "evidence": [line for *_, line in scored[:limit]],
+        "matching_skills": matched_skills,
+    }
+
+
+def format_job_context(company: str, role: str, distilled: Dict[str, Any], fallback_jd: str = "") -> str:
+    """Prompt text for the distilled JD - the same for every applicant to a posting"""
+    seniority = distilled["seniority"]
+    level = seniority["level"]
+    if seniority["years_required"]:
+        level += f", {seniority['years_required']}+ years"
+
+    lines = [
+        f"COMPANY: {company or 'Not specified'}",
+        f"TARGET ROLE: {role or 'AI/ML Position'} (seniority: {level})",
+        "",
+        "JOB DESCRIPTION (distilled):",
+        f"Required skills / keywords: {', '.join(distilled['required_skills']) or 'not listed'}",
+    ]
+    if distilled["nice_to_have_skills"]:
+        lines.append(f"Nice to have: {', '.join(distilled['nice_to_have_skills'])}")
+    if distilled["responsibilities"]:
+        lines += ["Responsibilities:"] + [f"- {r}" for r in distilled["responsibilities"]]
+    if distilled["company_signals"]:
+        lines += ["Company signals:"] + [f"- {s}" for s in distilled["company_signals"]]
+    if not distilled["required_skills"] and not distilled["responsibilities"] and fallback_jd:
+        # Nothing recognisable - send a short slice of the original instead
+        lines += ["Original excerpt:", fallback_jd[:1500]]
+    return "\n".join(lines)
+
+
+def format_candidate_context(evidence: Dict[str, Any], fallback_resume: str = "") -> str:
+    """Prompt text for the resume evidence"""
+    lines = ["CANDIDATE (resume evidence):"]
+    lines += evidence["header"]
+    if evidence["summary"]:
+        lines.append(f"Summary: {evidence['summary']}")
+    if evidence["matching_skills"]:
+        lines.append(f"Matching skills: {', '.join(evidence['matching_skills'])}")
+    lines += [f"- {line}" for line in evidence["evidence"]]
+    if not evidence["evidence"] and fallback_resume:
+        lines += ["Resume excerpt:", fallback_resume[:1500]]
+    return "\n".join(lines)
+
+
+def format_distilled_context(company: str, role: str, distilled: Dict[str, Any], evidence: Dict[str, Any],
+                             fallback_jd: str = "", fallback_resume: str = "") -> str:
+    """Prompt text for the distilled JD and resume evidence (short raw excerpts if nothing was found)"""
+    return (
+        format_job_context(company, role, distilled, fallback_jd)
+        + "\n\n"
+        + format_candidate_context(evidence, fallback_resume)
+    )
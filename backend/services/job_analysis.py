@@ -0,0 +1,133 @@
+"""
+Job analysis store - one job description analysis per posting, shared by applicants.
+
+/auto-apply/prepare-application receives the same job_id and description from
+many users, and every request used to re-analyze the posting while building
+its cover letter prompt. The analysis (required / nice-to-have skills,
+responsibilities, seniority, culture signals and the prompt text built from
+them) is now computed once per job_id and description hash and kept in the
+job_analyses collection:
+
+  - later applicants reuse the stored record instead of re-distilling the JD
+  - the job context is byte-identical for everyone applying to a posting, so
+    it is also a separate prompt cache block (see services/cover_letters.py)
+  - records expire after JOB_ANALYSIS_TTL_DAYS and are ignored when
+    JOB_ANALYSIS_VERSION changes
+"""
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from config import JOB_ANALYSIS_TTL_DAYS
+from database import db
+from services.jd_distiller import distill_job_description, format_job_context
+from services.skill_matcher import find_skills
+
+# Bump when distill_job_description or format_job_context change their output
+JOB_ANALYSIS_VERSION = 1
+MEMORY_MAX_ENTRIES = 500
+
+
+def job_description_hash(company: str, role: str, job_description: str) -> str:
+    """Whitespace-insensitive hash of everything the analysis depends on"""
+    text = "\n".join(re.sub(r"\s+", " ", part or "").strip() for part in (company, role, job_description))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def analyze_job(company: str, role: str, job_description: str) -> Dict[str, Any]:
+    """Distilled JD, the skills it mentions and the prompt text for it"""
+    job_description = job_description or ""
+    distilled = distill_job_description(job_description, company, role)
+    return {
+        "distilled": distilled,
+        "job_skills": sorted(find_skills(job_description)),
+        "job_context": format_job_context(company, role, distilled, fallback_jd=job_description),
+    }
+
+
+class JobAnalysisStore:
+    """collection=None keeps analyses in memory only"""
+
+    def __init__(self, collection: Any, ttl: timedelta):
+        self.collection = collection
+        self.ttl = ttl
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.computed = 0
+
+    def _remember(self, key: str, analysis: Dict[str, Any]) -> None:
+        self._memory.pop(key, None)
+        self._memory[key] = analysis
+        if len(self._memory) > MEMORY_MAX_ENTRIES:
+            self._memory.pop(next(iter(self._memory)))
+
+    async def get(self, job_id: str, company: str, role: str, job_description: str) -> Dict[str, Any]:
+        """The analysis for this posting - stored, or computed and stored now"""
+        jd_hash = job_description_hash(company, role, job_description)
+        key = f"{job_id}:{jd_hash}"
+        analysis = self._memory.get(key)
+        if analysis is not None:
+            self.hits += 1
+            return analysis
+
+        if self.collection is not None:
+            try:
+                entry = await self.collection.find_one(
+                    {"job_id": job_id, "jd_hash": jd_hash, "version": JOB_ANALYSIS_VERSION,
+                     "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                    {"_id": 0, "analysis": 1}
+                )
+            except PyMongoError as e:
+                logging.warning(f"Job analysis lookup failed: {e}")
+                entry = None
+            if entry:
+                self.hits += 1
+                self._remember(key, entry["analysis"])
+                return entry["analysis"]
+
+        analysis = analyze_job(company, role, job_description)
+        self.computed += 1
+        self._remember(key, analysis)
+        await self._store(job_id, jd_hash, analysis)
+        return analysis
+
+    async def _store(self, job_id: str, jd_hash: str, analysis: Dict[str, Any]) -> None:
+        if self.collection is None:
+            return
+        now = datetime.now(timezone.utc)
+        try:
+            # Concurrent first applicants compute the same record; whichever lands first wins
+            await self.collection.update_one(
+                {"job_id": job_id, "jd_hash": jd_hash, "$or": [
+                    {"expires_at": {"$lte": now}}, {"version": {"$ne": JOB_ANALYSIS_VERSION}}
+                ]},
+                {"$set": {
+                    "job_id": job_id,
+                    "jd_hash": jd_hash,
+                    "analysis": analysis,
+                    "version": JOB_ANALYSIS_VERSION,
+                    "created_at": now,
+                    "expires_at": now + self.ttl,
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+        except PyMongoError as e:
+            logging.warning(f"Job analysis update failed: {e}")
+
+    async def ensure_indexes(self) -> None:
+        if self.collection is None:
+            return
+        await self.collection.create_index([("job_id", 1), ("jd_hash", 1)], unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "computed": self.computed, "memory_entries": len(self._memory)}
+
+
+job_analyses = JobAnalysisStore(db.job_analyses, timedelta(days=JOB_ANALYSIS_TTL_DAYS))
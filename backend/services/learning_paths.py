@@ -0,0 +1,440 @@
+"""
+Learning path skeletons - precomputed, immutable, shared by every request.
+
+A verified learning path only depends on the role's curriculum and whether
+the budget is "free"; everything else (target role name, level, hours per
+week, current role) is per-request. /learning-path/generate used to walk the
+curriculum, look up every course and copy its fields into new dicts on each
+call. Now:
+
+  - every role path (plus the generic fallback) is built once per budget class
+    at import time and frozen (read-only mappings and tuples), so it can be
+    shared between requests without defensive copies
+  - render_learning_path overlays the per-request values: the overview and a
+    shallow copy of each week with its hours - the courses, projects and the
+    static sections are the shared frozen objects
+  - learning_paths documents store a template reference (skeleton id and
+    content version) plus those per-request overrides instead of a full
+    path_data copy, and are resolved through the skeletons on read
+    (LearningPathTemplates.resolve). Each skeleton version is also kept in
+    learning_path_templates, so paths keep their courses after the catalog
+    changes.
+  - with current skills, plan_weeks skips weeks whose skills the user already
+    has, halves the hours of mostly covered ones and moves weeks after the
+    weeks that teach their prerequisites (skill bitsets, services/
+    skill_bitsets.py). The plan is a list of skeleton indexes, stored with
+    the overrides.
+"""
+import hashlib
+import json
+import logging
+import math
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from pymongo.errors import PyMongoError
+
+from data.courses_database import ROLE_LEARNING_PATHS, get_course_by_id
+from database import db
+from services.skill_bitsets import popcount, prerequisites_mask, skills_mask
+
+# Generic path for unknown roles: (week, theme, course id, focus)
+FALLBACK_SEQUENCE = (
+    (1, "Python Foundations", "py-001", "Master Python basics"),
+    (2, "Math for ML", "math-002", "Linear algebra intuition"),
+    (3, "Statistics", "stats-001", "Statistical foundations"),
+    (4, "ML Quick Start", "ml-003", "Google ML Crash Course"),
+    (5, "ML Foundations", "ml-001", "Andrew Ng's ML course"),
+    (6, "Practical ML", "ml-002", "fast.ai approach"),
+    (7, "Deep Learning", "dl-001", "Neural networks"),
+    (8, "PyTorch", "dl-002", "PyTorch framework"),
+    (9, "AI Engineering", "ai-001", "Scrimba AI Engineer"),
+    (10, "LangChain", "ai-002", "Build with LangChain"),
+    (11, "MLOps", "mlops-002", "Made With ML"),
+    (12, "Interview Prep", "int-001", "Ace the interview"),
+)
+
+# Skeletons only differ between free and any other budget
+BUDGET_CLASSES = ("free", "any")
+
+STATIC_SECTIONS = {
+    "fast_track": {
+        "enabled": True,
+        "title": "⚡ Fast Track Your Learning",
+        "description": "Complete your journey 3x faster with interactive, hands-on courses",
+        "courses": [
+            {
+                "name": "The AI Engineer Path",
+                "platform": "Scrimba",
+                "url": "https://scrimba.com/the-ai-engineer-path-c02v?via=u436b310",
+                "description": "Complete AI curriculum - OpenAI, LangChain, RAG, Agents",
+                "duration": "40 hours",
+                "why": "Interactive coding. Build real AI apps while learning.",
+                "badge": "🔥 #1 AI Course"
+            },
+            {
+                "name": "Learn Python",
+                "platform": "Scrimba",
+                "url": "https://scrimba.com/learn-python-c03?via=u436b310",
+                "description": "Python from scratch with interactive exercises",
+                "duration": "15 hours",
+                "why": "Code in your browser. No setup needed.",
+                "badge": "🎯 Interactive"
+            }
+        ],
+        "benefits": [
+            "✅ Interactive coding in browser",
+            "✅ Build real projects",
+            "✅ AI-focused curriculum",
+            "✅ Up-to-date content (2024-2025)"
+        ]
+    },
+    "career_readiness_checklist": [
+        "✅ Complete all course projects",
+        "✅ Build 3-5 portfolio projects on GitHub",
+        "✅ Achieve top 20% in a Kaggle competition",
+        "✅ Update LinkedIn with new skills",
+        "✅ Practice 50+ interview questions",
+        "✅ Network with ML engineers on LinkedIn/Twitter"
+    ],
+    "recommended_tools": [
+        "VS Code with Python extensions",
+        "Jupyter Notebooks",
+        "Git & GitHub",
+        "Google Colab (free GPU)",
+        "Weights & Biases (experiment tracking)"
+    ],
+    "communities_to_join": [
+        {"name": "r/MachineLearning", "url": "https://reddit.com/r/MachineLearning"},
+        {"name": "MLOps Community", "url": "https://mlops.community/"},
+        {"name": "Hugging Face Discord", "url": "https://huggingface.co/join/discord"},
+        {"name": "fast.ai Forums", "url": "https://forums.fast.ai/"}
+    ],
+    "interview_prep": {
+        "technical": ["ML algorithms", "System design", "Coding challenges"],
+        "behavioral": ["STAR method", "Project walkthroughs"],
+        "resources": [
+            {"name": "Ace the Data Science Interview", "url": "https://www.acethedatascienceinterview.com/"},
+            {"name": "ML System Design Primer", "url": "https://github.com/chiphuyen/machine-learning-systems-design"}
+        ]
+    }
+}
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy: dicts become mappingproxies and lists tuples (both serialize as before)"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def budget_class(budget: str) -> str:
+    return "free" if budget == "free" else "any"
+
+
+def _role_weeks(role_path: Dict[str, Any], budget: str) -> list:
+    weeks = []
+    for week_data in role_path["weekly_curriculum"]:
+        week_num = week_data["week"]
+        theme = week_data["theme"]
+        week_courses = []
+        for course_id in week_data.get("courses", []):
+            course = get_course_by_id(course_id)
+            if course:
+                week_courses.append({
+                    "id": course.get("id"),
+                    "name": course["name"],
+                    "platform": course["platform"],
+                    "url": course["url"],
+                    "duration_hours": course.get("duration_hours", 5),
+                    "cost": course.get("cost", "Free"),
+                    "cost_type": course.get("cost_type", "free"),
+                    "badge": course.get("badge", ""),
+                    "rating": course.get("rating", 4.5),
+                    "instructor": course.get("instructor", ""),
+                    "description": course.get("description", ""),
+                    "skills_taught": course.get("skills_taught", []),
+                    "why_recommended": course.get("why_recommended", ""),
+                    # For free budget, paid courses are kept but marked optional
+                    "is_optional": budget == "free" and course.get("cost_type") == "paid"
+                })
+        weeks.append({
+            "week": week_num,
+            "theme": theme,
+            "focus": week_data["focus"],
+            "hours": None,  # per-request overlay
+            "courses": week_courses,
+            "project": {
+                "name": f"Week {week_num}: {theme} Project",
+                "description": f"Apply {theme.lower()} concepts in a hands-on project",
+                "skills_practiced": week_courses[0].get("skills_taught", ["Python"])[:3] if week_courses else ["Python"]
+            },
+            "milestone": week_data["focus"]
+        })
+    return weeks
+
+
+def _fallback_weeks(budget: str) -> list:
+    weeks = []
+    for week_num, theme, course_id, focus in FALLBACK_SEQUENCE:
+        course = get_course_by_id(course_id)
+        if not course or (budget == "free" and course.get("cost_type") not in ("free", "freemium")):
+            continue
+        weeks.append({
+            "week": week_num,
+            "theme": theme,
+            "focus": focus,
+            "hours": None,  # per-request overlay
+            "courses": [{
+                "id": course.get("id"),
+                "name": course["name"],
+                "platform": course["platform"],
+                "url": course["url"],
+                "duration_hours": course.get("duration_hours", 5),
+                "cost": course.get("cost", "Free"),
+                "cost_type": course.get("cost_type", "free"),
+                "badge": course.get("badge", ""),
+                "rating": course.get("rating", 4.5),
+                "description": course.get("description", ""),
+                "skills_taught": course.get("skills_taught", [])
+            }],
+            "project": {
+                "name": f"Week {week_num} Project",
+                "description": f"Apply {theme.lower()} concepts",
+                "skills_practiced": ["Python", "ML"]
+            },
+            "milestone": focus
+        })
+    return weeks
+
+
+def build_skeleton(role_path: Optional[Dict[str, Any]], budget: str) -> Tuple[Mapping[str, Any], ...]:
+    """Frozen weeks for a role path (None = generic fallback) and budget"""
+    if role_path and role_path.get("weekly_curriculum"):
+        return freeze(_role_weeks(role_path, budget))
+    return freeze(_fallback_weeks(budget))
+
+
+def precompute_skeletons() -> Dict[Tuple[Optional[str], str], Tuple[Mapping[str, Any], ...]]:
+    """Every (role id, budget class) skeleton; role id None is the fallback path"""
+    skeletons = {}
+    for budget in BUDGET_CLASSES:
+        skeletons[(None, budget)] = build_skeleton(None, budget)
+        for role_id, role_path in ROLE_LEARNING_PATHS.items():
+            skeletons[(role_id, budget)] = build_skeleton(role_path, budget)
+    return skeletons
+
+
+def thaw(value: Any) -> Any:
+    """Plain dicts and lists again, e.g. for storing a skeleton"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def skeleton_version(skeleton: Tuple[Mapping[str, Any], ...]) -> str:
+    """Content hash - changes whenever a course or week of the skeleton does"""
+    return hashlib.sha256(json.dumps(thaw(skeleton), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+SKELETONS = precompute_skeletons()
+SKELETON_VERSIONS = {key: skeleton_version(skeleton) for key, skeleton in SKELETONS.items()}
+FROZEN_STATIC_SECTIONS = freeze(STATIC_SECTIONS)
+
+# Template id of the generic path in place of a role id
+FALLBACK_TEMPLATE = "_fallback"
+
+
+def _skeleton_key(role_id: Optional[str], budget: str) -> Tuple[Optional[str], str]:
+    key = (role_id, budget_class(budget))
+    return key if key in SKELETONS else (None, key[1])
+
+
+def get_skeleton(role_id: Optional[str], budget: str) -> Tuple[Mapping[str, Any], ...]:
+    return SKELETONS[_skeleton_key(role_id, budget)]
+
+
+def template_ref(role_id: Optional[str], budget: str) -> Dict[str, str]:
+    """What a learning_paths document stores instead of path_data"""
+    key = _skeleton_key(role_id, budget)
+    return {"id": f"{key[0] or FALLBACK_TEMPLATE}:{key[1]}", "version": SKELETON_VERSIONS[key]}
+
+
+def week_mask(week: Mapping[str, Any]) -> int:
+    """Skills a week teaches: its theme and its courses' skills_taught"""
+    labels = [week["theme"]]
+    for course in week["courses"]:
+        labels.extend(course.get("skills_taught", ()))
+    return skills_mask(labels)
+
+
+def plan_weeks(skeleton: Tuple[Mapping[str, Any], ...], current_skills: List[str]) -> Optional[List[List[Any]]]:
+    """
+    [skeleton index, compressed] per week to keep, in the order to take them.
+    None when the skills change nothing (the skeleton as is).
+    """
+    known = skills_mask(current_skills or [])
+    if not known:
+        return None
+
+    masks = [week_mask(week) for week in skeleton]
+    # Ordering goes by what each week is about (its theme), not every skill its courses touch
+    focus = [skills_mask([week["theme"]]) for week in skeleton]
+    pending, compressed = [], set()
+    for index, mask in enumerate(masks):
+        covered = popcount(mask & known)
+        if mask and covered == popcount(mask):
+            continue
+        if mask and covered * 2 >= popcount(mask):
+            compressed.add(index)
+        pending.append(index)
+    if not pending:
+        # Nothing left to learn - keep the path as a refresher rather than an empty one
+        pending, compressed = list(range(len(skeleton))), set(range(len(skeleton)))
+
+    # Keep the curriculum's order, but move a week after the later weeks that are about a
+    # prerequisite of its theme the user doesn't have (unless those need it in turn)
+    needs = {index: prerequisites_mask(focus[index]) & ~focus[index] & ~known for index in pending}
+    order = pending
+    for _ in range(len(order)):
+        moved = False
+        for index in list(order):
+            position = order.index(index)
+            providers = [
+                j for j in order[position + 1:]
+                if focus[j] & needs[index] and not needs[j] & focus[index]
+            ]
+            if providers:
+                order.remove(index)
+                order.insert(order.index(providers[-1]) + 1, index)
+                moved = True
+        if not moved:
+            break
+
+    if order == list(range(len(skeleton))) and not compressed:
+        return None
+    return [[index, index in compressed] for index in order]
+
+
+def _planned_week(week: Mapping[str, Any], number: int, hours: int, compressed: bool) -> Dict[str, Any]:
+    planned = {**week, "week": number, "hours": hours}
+    if number != week["week"]:
+        project = week["project"]
+        planned["project"] = {**project, "name": project["name"].replace(f"Week {week['week']}", f"Week {number}", 1)}
+    if compressed:
+        planned["hours"] = max(1, math.ceil(hours / 2))
+        planned["compressed"] = True
+    return planned
+
+
+def render_learning_path(
+    skeleton: Tuple[Mapping[str, Any], ...],
+    target_role_name: str,
+    target_role_id: str,
+    experience_level: str,
+    hours_per_week: int,
+    budget: str,
+    current_role: str = None,
+    week_plan: Optional[List[List[Any]]] = None
+) -> Dict[str, Any]:
+    """Path data for one request: the skeleton with the overview, weekly hours and week plan laid over it"""
+    if week_plan is None:
+        weeks = [{**week, "hours": hours_per_week} for week in skeleton]
+    else:
+        weeks = [
+            _planned_week(skeleton[index], number, hours_per_week, compressed)
+            for number, (index, compressed) in enumerate(week_plan, start=1)
+        ]
+    overview = {
+        "target_role": target_role_name,
+        "target_role_id": target_role_id,
+        "duration_weeks": len(weeks),
+        "hours_per_week": hours_per_week,
+        "total_hours": sum(week["hours"] for week in weeks),
+        "experience_level": experience_level,
+        "current_role": current_role,
+        "budget_preference": budget,
+        "difficulty_progression": "Beginner → Intermediate → Advanced → Production"
+    }
+    if week_plan is not None:
+        kept = {index for index, _ in week_plan}
+        overview["skipped_weeks"] = [week["theme"] for i, week in enumerate(skeleton) if i not in kept]
+    return {
+        "path_overview": overview,
+        "weeks": weeks,
+        **FROZEN_STATIC_SECTIONS,
+    }
+
+
+class LearningPathTemplates:
+    """
+    Skeleton versions referenced by stored learning paths. Current versions are
+    the in-memory SKELETONS; older ones are read back from the collection once
+    and memoized. collection=None only knows the current versions.
+    """
+
+    def __init__(self, collection: Any):
+        self.collection = collection
+        self._current = {
+            (template_ref(*key)["id"], version): SKELETONS[key] for key, version in SKELETON_VERSIONS.items()
+        }
+        self._archived: Dict[Tuple[str, str], Tuple[Mapping[str, Any], ...]] = {}
+        self._stored: Set[Tuple[str, str]] = set()
+
+    async def ensure_stored(self, ref: Dict[str, str]) -> None:
+        """Keep a copy of a current skeleton version before documents reference it"""
+        key = (ref["id"], ref["version"])
+        if self.collection is None or key in self._stored:
+            return
+        await self.collection.update_one(
+            {"id": ref["id"], "version": ref["version"]},
+            {"$setOnInsert": {
+                "id": ref["id"],
+                "version": ref["version"],
+                "weeks": thaw(self._current[key]),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }},
+            upsert=True
+        )
+        self._stored.add(key)
+
+    async def skeleton(self, ref: Dict[str, str]) -> Tuple[Mapping[str, Any], ...]:
+        key = (ref["id"], ref["version"])
+        skeleton = self._current.get(key) or self._archived.get(key)
+        if skeleton is not None:
+            return skeleton
+        entry = None
+        if self.collection is not None:
+            try:
+                entry = await self.collection.find_one({"id": ref["id"], "version": ref["version"]}, {"_id": 0})
+            except PyMongoError as e:
+                logging.warning(f"Learning path template lookup failed: {e}")
+        if entry:
+            skeleton = self._archived[key] = freeze(entry["weeks"])
+            return skeleton
+        # Should not happen - every referenced version is stored first
+        logging.warning(f"Learning path template {key} not found, using the current version")
+        role_id, _, budget = ref["id"].rpartition(":")
+        return get_skeleton(None if role_id == FALLBACK_TEMPLATE else role_id, budget)
+
+    async def resolve(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """A learning_paths document with path_data, whichever way it was stored"""
+        if not doc.get("path_template"):
+            return doc
+        resolved = {k: v for k, v in doc.items() if k not in ("path_template", "path_overrides")}
+        skeleton = await self.skeleton(doc["path_template"])
+        resolved["path_data"] = render_learning_path(skeleton, **doc.get("path_overrides", {}))
+        return resolved
+
+    async def ensure_indexes(self) -> None:
+        if self.collection is None:
+            return
+        await self.collection.create_index([("id", 1), ("version", 1)], unique=True)
+
+
+learning_path_templates = LearningPathTemplates(db.learning_path_templates)
@@ -0,0 +1,140 @@
+"""
+Learning path progress - single-write, field-level progress updates.
+
+Progress clicks used to read the whole learning path (path_data included),
+change week_progress / course_progress in Python and $set the whole map back,
+so two quick clicks could overwrite each other. Each click is now one
+find_one_and_update with an update pipeline that:
+
+  - sets only week_progress.<week> or course_progress.<week>.<index>
+  - adjusts completed_weeks / completed_courses by the difference between
+    the new and the previous state of that entry
+  - computes overall_progress from the counters and total_weeks /
+    total_courses, which are stored when the path is created
+
+Paths created before the counters existed get them backfilled on their first
+update from the documents' own maps ($ifNull), still inside the same write.
+
+Clicks only match when the week and course_index exist in the path
+(week_progress_filter / course_progress_filter, against the counts stored with
+the path), so a made-up index can't push overall_progress past 100%.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Returned by the progress updates - never path_data
+WEEK_PROGRESS_PROJECTION = {"_id": 0, "week_progress": 1, "overall_progress": 1}
+COURSE_PROGRESS_PROJECTION = {"_id": 0, "course_progress": 1, "overall_progress": 1}
+
+
+def progress_counters(path_data: Dict[str, Any]) -> Dict[str, int]:
+    """Initial counters stored with a new learning path"""
+    weeks = path_data.get("weeks", [])
+    return {
+        "total_weeks": len(weeks),
+        "total_courses": sum(len(w.get("courses", [])) for w in weeks),
+        "week_courses": {str(w.get("week")): len(w.get("courses", [])) for w in weeks},
+        "completed_weeks": 0,
+        "completed_courses": 0,
+    }
+
+
+def _completed(entries: Any) -> Dict[str, Any]:
+    """Number of {"completed": true} values in a map"""
+    return {"$size": {"$filter": {
+        "input": {"$objectToArray": {"$ifNull": [entries, {}]}},
+        "cond": {"$eq": ["$$this.v.completed", True]},
+    }}}
+
+
+# Backfills for paths created before the counters were stored
+_LEGACY_TOTAL_WEEKS = {"$size": {"$ifNull": ["$path_data.weeks", []]}}
+_LEGACY_TOTAL_COURSES = {"$sum": {"$map": {
+    "input": {"$ifNull": ["$path_data.weeks", []]},
+    "in": {"$size": {"$ifNull": ["$$this.courses", []]}},
+}}}
+_LEGACY_COMPLETED_WEEKS = _completed("$week_progress")
+_LEGACY_COMPLETED_COURSES = {"$reduce": {
+    "input": {"$objectToArray": {"$ifNull": ["$course_progress", {}]}},
+    "initialValue": 0,
+    "in": {"$add": ["$$value", _completed("$$this.v")]},
+}}
+
+
+def _legacy_week_courses(week: int) -> Dict[str, Any]:
+    return {"$sum": {"$map": {
+        "input": {"$filter": {
+            "input": {"$ifNull": ["$path_data.weeks", []]},
+            "cond": {"$eq": ["$$this.week", week]},
+        }},
+        "in": {"$size": {"$ifNull": ["$$this.courses", []]}},
+    }}}
+
+
+def _percentage(completed: str, total: str) -> Dict[str, Any]:
+    return {"$cond": [
+        {"$gt": [total, 0]},
+        {"$toInt": {"$round": [{"$multiply": [{"$divide": [completed, total]}, 100]}, 0]}},
+        0,
+    ]}
+
+
+def _counter_delta(counter: str, backfill: Dict[str, Any], field: str, completed: bool) -> Dict[str, Any]:
+    """counter + (new state) - (previous state of field)"""
+    return {"$add": [
+        {"$ifNull": [f"${counter}", backfill]},
+        1 if completed else 0,
+        {"$cond": [{"$eq": [f"${field}.completed", True]}, -1, 0]},
+    ]}
+
+
+def _entry(completed: bool, notes: Optional[str], now: str) -> Dict[str, Any]:
+    # $literal - notes are user text and must never be read as field paths or operators
+    return {"$literal": {"completed": completed, "notes": notes, "updated_at": now}}
+
+
+def week_progress_update(week: int, completed: bool, notes: Optional[str]) -> List[Dict[str, Any]]:
+    """Update pipeline for one week's checkbox"""
+    now = datetime.now(timezone.utc).isoformat()
+    field = f"week_progress.{week}"
+    return [
+        {"$set": {
+            "completed_weeks": _counter_delta("completed_weeks", _LEGACY_COMPLETED_WEEKS, field, completed),
+            "total_weeks": {"$ifNull": ["$total_weeks", _LEGACY_TOTAL_WEEKS]},
+            field: _entry(completed, notes, now),
+            "updated_at": now,
+        }},
+        {"$set": {"overall_progress": _percentage("$completed_weeks", "$total_weeks")}},
+    ]
+
+
+def week_progress_filter(query: Dict[str, Any], week: int) -> Dict[str, Any]:
+    """query, matching only when the path has this week"""
+    return {**query, "$expr": {"$and": [
+        {"$gte": [week, 1]},
+        {"$gte": [{"$ifNull": ["$total_weeks", _LEGACY_TOTAL_WEEKS]}, week]},
+    ]}}
+
+
+def course_progress_filter(query: Dict[str, Any], week: int, course_index: int) -> Dict[str, Any]:
+    """query, matching only when the week has a course at course_index"""
+    return {**query, "$expr": {"$and": [
+        {"$gte": [course_index, 0]},
+        {"$gt": [{"$ifNull": [f"$week_courses.{week}", _legacy_week_courses(week)]}, course_index]},
+    ]}}
+
+
+def course_progress_update(week: int, course_index: int, completed: bool,
+                           notes: Optional[str]) -> List[Dict[str, Any]]:
+    """Update pipeline for one course's checkbox"""
+    now = datetime.now(timezone.utc).isoformat()
+    field = f"course_progress.{week}.{course_index}"
+    return [
+        {"$set": {
+            "completed_courses": _counter_delta("completed_courses", _LEGACY_COMPLETED_COURSES, field, completed),
+            "total_courses": {"$ifNull": ["$total_courses", _LEGACY_TOTAL_COURSES]},
+            field: _entry(completed, notes, now),
+            "updated_at": now,
+        }},
+        {"$set": {"overall_progress": _percentage("$completed_courses", "$total_courses")}},
+    ]
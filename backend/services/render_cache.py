@@ -0,0 +1,245 @@
+"""
+Rendered document cache.
+
+Documents are keyed by a hash of (kind, format, template version, render
+arguments), so the same CV in the same format renders once and every repeat
+download is served from memory - or answered with 304 Not Modified when the
+client already holds the ETag. Misses are rendered on the render pool, and
+concurrent requests for the same document share one render - a task of its
+own, so a client that disconnects doesn't fail the others waiting on it.
+
+When object storage is configured (services/storage.py) the rendered bytes are
+uploaded under the same hash and the response is a redirect to a signed URL.
+
+The memory tier is an LRU bounded by total bytes. An optional disk tier
+(RENDER_CACHE_DIR) survives restarts and is shared by workers on one host;
+request handlers use aget/aput, which do the disk I/O off the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse, Response
+
+from config import RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES, STORAGE_URL_EXPIRY_SECONDS
+from services.documents import MEDIA_TYPES, TEMPLATE_VERSION, document_response
+from services.render_pool import RenderTimeout, render_pool
+from services import storage as storage_module
+
+
+class RenderCache:
+    """Byte-bounded LRU of rendered documents with an optional disk tier"""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logging.warning(f"Render cache disk tier disabled: {e}")
+                self.disk_dir = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._get_memory(key)
+        return data if data is not None else self._load_disk(key)
+
+    def put(self, key: str, data: bytes) -> None:
+        self._put_memory(key, data)
+        self._write_disk(key, data)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """get() with the disk read on a thread"""
+        data = self._get_memory(key)
+        if data is not None:
+            return data
+        if self.disk_dir:
+            return await asyncio.to_thread(self._load_disk, key)
+        return self._load_disk(key)
+
+    async def aput(self, key: str, data: bytes) -> None:
+        """put() with the disk write on a thread"""
+        self._put_memory(key, data)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def _load_disk(self, key: str) -> Optional[bytes]:
+        data = self._read_disk(key)
+        if data is not None:
+            self.disk_hits += 1
+            self._put_memory(key, data)
+        else:
+            self.misses += 1
+        return data
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.bin"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        try:
+            return self._disk_path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Render cache disk write failed: {e}")
+
+
+render_cache = RenderCache(RENDER_CACHE_MAX_BYTES, RENDER_CACHE_DIR or None)
+
+
+def cache_key(kind: str, format: str, args: Sequence[Any]) -> str:
+    """Content hash identifying one rendered document"""
+    payload = json.dumps([kind, format, TEMPLATE_VERSION, list(args)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+# key -> in-progress render, so concurrent requests for one document render it once
+_inflight: Dict[str, "asyncio.Task[bytes]"] = {}
+
+
+async def _render_and_store(key: str, kind: str, format: str, args: Sequence[Any]) -> bytes:
+    try:
+        data = await render_pool.render(kind, format, args)
+        await render_cache.aput(key, data)
+        return data
+    finally:
+        _inflight.pop(key, None)
+
+
+def _retrieve_exception(task: "asyncio.Task[bytes]") -> None:
+    # Every requester may be gone - don't log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+async def render_cached(kind: str, format: str, *args: Any) -> bytes:
+    """Render a document through the cache, on the render pool"""
+    key = cache_key(kind, format, args)
+    data = await render_cache.aget(key)
+    if data is not None:
+        return data
+
+    task = _inflight.get(key)
+    if task is None:
+        # Not tied to this request - it finishes even if this client disconnects
+        task = _inflight[key] = asyncio.create_task(_render_and_store(key, kind, format, args))
+        task.add_done_callback(_retrieve_exception)
+    return await asyncio.shield(task)
+
+
+async def cached_document_response(
+    kind: str,
+    format: str,
+    args: Sequence[Any],
+    filename: str,
+    if_none_match: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Download response for a rendered document with a strong ETag.
+    Clients that send a matching If-None-Match get 304 without any rendering.
+    With object storage configured the response redirects to a signed URL.
+    """
+    key = cache_key(kind, format, args)
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    storage = storage_module.storage
+    if storage is not None:
+        object_key = f"documents/{key[:2]}/{key}.{format}"
+        try:
+            if not await asyncio.to_thread(storage.has, object_key):
+                data = await _render_or_503(kind, format, args)
+                await asyncio.to_thread(storage.store, object_key, data, MEDIA_TYPES[format])
+            url = storage.presigned_url(object_key, filename, STORAGE_URL_EXPIRY_SECONDS)
+            # 303 so POST downloads are followed with a GET, as signed URLs require
+            return RedirectResponse(
+                url, status_code=303,
+                headers={"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+            )
+        except storage_module.StorageError as e:
+            # Storage outage - the download still works, served by this worker
+            logging.error(f"Document storage failed, serving inline: {e}")
+
+    data = await _render_or_503(kind, format, args)
+    return document_response(data, filename, headers=headers, etag=etag)
+
+
+async def _render_or_503(kind: str, format: str, args: Sequence[Any]) -> bytes:
+    try:
+        return await render_cached(kind, format, *args)
+    except (RenderTimeout, BrokenProcessPool):
+        raise HTTPException(status_code=503, detail="Document rendering is busy, please try again")
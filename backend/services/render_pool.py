@@ -0,0 +1,145 @@
+"""
+Render pool - runs reportlab/python-docx rendering off the event loop.
+
+Documents are rendered in a process pool whose workers import reportlab,
+python-docx and the renderers once at start-up, so a request never pays for
+those imports. A semaphore bounds how many renders are queued or running,
+and every render has a timeout, so one huge learning path can't stall other
+downloads or the API itself.
+
+A slot is held until the job in the pool has really ended, not just until
+the caller stops waiting. On a timeout the process pool's workers are killed
+and a fresh pool is started, so a stuck render can't keep a worker busy.
+Renders that were running fine in the killed pool fail with BrokenProcessPool
+and are retried once on the new pool, within their own deadline.
+Thread workers can't be killed; their slot is freed when the render returns.
+
+RENDER_WORKERS=0 (or a host that can't fork, e.g. serverless) falls back to
+a thread pool with the same concurrency limits.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional, Sequence
+
+from config import RENDER_MAX_CONCURRENCY, RENDER_TIMEOUT_SECONDS, RENDER_WORKERS
+
+
+class RenderTimeout(Exception):
+    """A render did not finish (or start) within RENDER_TIMEOUT_SECONDS"""
+
+
+def _warm_worker() -> None:
+    """Process initializer - pay the import, stylesheet and font loading cost once per worker"""
+    import reportlab.platypus  # noqa: F401
+    import docx  # noqa: F401
+    from services import documents  # noqa: F401 - compiles every template
+    from services.fonts import font_registry
+    font_registry.register_all()
+
+
+def _render(kind: str, format: str, args: Sequence[Any]) -> bytes:
+    """Runs inside a worker - args are (blocks, template)"""
+    from services.documents import render_blocks
+    return render_blocks(kind, format, *args)
+
+
+class RenderPool:
+    def __init__(self, workers: int, max_concurrency: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.rendered = 0
+        self.timeouts = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+                except (OSError, NotImplementedError) as e:
+                    logging.warning(f"Process render pool unavailable, using threads: {e}")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(self.workers, 2), thread_name_prefix="render"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def render(self, kind: str, format: str, args: Sequence[Any]) -> bytes:
+        """Render one document in the pool, waiting at most `timeout` for queue + render"""
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        try:
+            return await self._render_once(kind, format, args, deadline)
+        except BrokenProcessPool:
+            # Our pool was recycled for another job's timeout, or our worker crashed - one more try
+            logging.warning(f"Retrying {kind} {format} render on a fresh pool")
+            return await self._render_once(kind, format, args, deadline)
+
+    async def _render_once(self, kind: str, format: str, args: Sequence[Any], deadline: float) -> bytes:
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RenderTimeout(f"Rendering {kind} {format} did not start within {self.timeout}s")
+
+        executor = self._get_executor()
+        try:
+            future = loop.run_in_executor(executor, _render, kind, format, list(args))
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda done: self._job_done(semaphore, done))
+
+        try:
+            # shield - giving up on the result must not look like the job has ended
+            data = await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._recycle(executor)
+            raise RenderTimeout(f"Rendering {kind} {format} took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault) - start a fresh pool for the next render
+            logging.error("Render worker crashed, restarting pool")
+            self._recycle(executor)
+            raise
+        self.rendered += 1
+        return data
+
+    @staticmethod
+    def _job_done(semaphore: asyncio.Semaphore, future: "asyncio.Future") -> None:
+        semaphore.release()
+        if not future.cancelled():
+            future.exception()  # retrieved - nobody may be awaiting a timed-out job
+
+    def _recycle(self, executor: Executor) -> None:
+        """Stop a process pool with a stuck or dead worker; the next render starts a fresh one"""
+        if not isinstance(executor, ProcessPoolExecutor) or self._executor is not executor:
+            return  # already replaced
+        self._executor = None
+        # No public API for this - terminating the workers fails their jobs, which frees their slots
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logging.warning("Render pool recycled after a stuck or crashed worker")
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool(RENDER_WORKERS, RENDER_MAX_CONCURRENCY, RENDER_TIMEOUT_SECONDS)
@@ -0,0 +1,374 @@
+"""
+Structured resume parser - sections, roles, dates and total experience.
+
+Runs entirely locally. The output feeds /resume/parse auto-fill and gives the
+analysis and CV prompts a compact summary instead of raw resume text.
+"""
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.skill_matcher import extract_skills
+
+# Section heading spellings -> canonical section name
+SECTION_HEADINGS = {
+    "summary": [
+        "summary", "professional summary", "career summary", "executive summary",
+        "profile", "professional profile", "objective", "career objective", "about", "about me",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "relevant experience",
+        "professional background",
+    ],
+    "education": ["education", "academic background", "education and training", "academics"],
+    "skills": [
+        "skills", "technical skills", "core skills", "key skills", "core competencies",
+        "competencies", "technologies", "tech stack", "tools", "skills and tools",
+        "skills & tools", "technical proficiencies",
+    ],
+    "certifications": [
+        "certifications", "certification", "certificates", "licenses and certifications",
+        "licenses & certifications", "courses", "training",
+    ],
+    "projects": ["projects", "personal projects", "key projects", "selected projects", "side projects"],
+    "awards": ["awards", "honors", "achievements", "awards and honors"],
+    "publications": ["publications", "papers"],
+}
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_MONTH_NAME = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+_DATE = rf"(?:{_MONTH_NAME}\s*,?\s*\d{{4}}|\d{{1,2}}\s*/\s*\d{{4}}|\d{{4}})"
+_PRESENT = r"(?:present|current|now|today|ongoing)"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|{_PRESENT})",
+    re.IGNORECASE,
+)
+
+BULLET_RE = re.compile(r"^\s*(?:[•\-\*▪●◦‣–]|\d+[.)])\s+")
+
+TITLE_KEYWORDS = [
+    "engineer", "developer", "manager", "scientist", "analyst", "lead", "director",
+    "intern", "consultant", "designer", "architect", "specialist", "head", "officer",
+    "researcher", "associate", "administrator", "coordinator", "founder", "programmer",
+    "president", "vp", "principal", "technician", "writer", "strategist", "owner",
+]
+
+DEGREE_PATTERNS = [
+    ("PHD", r"\bph\.?\s?d\b|\bdoctorate\b|\bdoctor of\b"),
+    ("MBA", r"\bmba\b"),
+    ("MASTER", r"\bmaster'?s?\b|\bm\.?s\.?c?\b(?!\s*(?:office|excel|word))|\bm\.tech\b|\bm\.?eng\b|\bm\.a\.\b"),
+    ("BACHELOR", r"\bbachelor'?s?\b|\bb\.?s\.?c?\b|\bb\.tech\b|\bb\.?e\.?\b|\bb\.a\.\b|\bbeng\b"),
+    ("ASSOCIATE", r"\bassociate'?s? degree\b"),
+]
+
+INSTITUTION_RE = re.compile(r"university|college|institute|school|academy|iit\b|mit\b", re.IGNORECASE)
+
+YEARS_STATED_PATTERNS = [
+    r"(\d+)\+?\s*years?\s*(?:of\s*)?experience",
+    r"experience[:\s]*(\d+)\+?\s*years?",
+]
+
+
+def _clean_heading(line: str) -> str:
+    return re.sub(r"[^a-z&\s]", "", line.lower()).strip()
+
+
+def detect_section(line: str) -> Optional[str]:
+    """Return the canonical section name if the line is a section heading"""
+    stripped = line.strip().strip(":").strip()
+    if not stripped or len(stripped) > 40 or BULLET_RE.match(line):
+        return None
+    return _HEADING_LOOKUP.get(_clean_heading(stripped))
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split resume text into named sections; text before the first heading is the header"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        section = detect_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line.rstrip())
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def _parse_date(value: str, today: date, is_end: bool) -> Optional[Tuple[int, int]]:
+    value = value.strip().lower().rstrip(".")
+    if re.fullmatch(_PRESENT, value):
+        return today.year, today.month
+    match = re.match(r"(\d{1,2})\s*/\s*(\d{4})", value)
+    if match:
+        return int(match.group(2)), max(1, min(12, int(match.group(1))))
+    match = re.match(r"([a-z]+)\.?\s*,?\s*(\d{4})", value)
+    if match:
+        month = MONTHS.get(match.group(1)[:4], MONTHS.get(match.group(1)[:3], 1))
+        return int(match.group(2)), month
+    match = re.match(r"(\d{4})", value)
+    if match:
+        # A bare year covers the whole year: Jan for starts, Dec for ends
+        return int(match.group(1)), 12 if is_end else 1
+    return None
+
+
+def parse_date_range(text: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """Find the first date range in text and return its bounds and length"""
+    today = today or date.today()
+    match = DATE_RANGE_RE.search(text)
+    if not match:
+        return None
+    start = _parse_date(match.group("start"), today, is_end=False)
+    end = _parse_date(match.group("end"), today, is_end=True)
+    if not start or not end or end < start:
+        return None
+    months = (end[0] - start[0]) * 12 + (end[1] - start[1]) + 1
+    return {
+        "duration": match.group(0).strip(),
+        "start": f"{start[0]:04d}-{start[1]:02d}",
+        "end": f"{end[0]:04d}-{end[1]:02d}",
+        "is_current": bool(re.fullmatch(_PRESENT, match.group("end").strip().lower())),
+        "months": months,
+        "span": match.span(),
+    }
+
+
+def _split_header(header: str) -> Dict[str, str]:
+    """Split 'Title | Company | Location' style headers into fields"""
+    parts = [p.strip() for p in re.split(r"\s+\|\s+|\s+[-–—]\s+|\s+at\s+|\s*,\s+|\t+", header) if p.strip()]
+    if not parts:
+        return {"title": "", "company": "", "location": ""}
+
+    title_idx = next(
+        (i for i, p in enumerate(parts) if any(re.search(rf"\b{k}\b", p.lower()) for k in TITLE_KEYWORDS)),
+        0,
+    )
+    title = parts[title_idx]
+    rest = parts[:title_idx] + parts[title_idx + 1:]
+    company = rest[0] if rest else ""
+    location = ", ".join(rest[1:]) if len(rest) > 1 else ""
+    return {"title": title, "company": company, "location": location}
+
+
+def parse_experience(section_text: str, today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Group an experience section into entries with title, company, dates and bullets"""
+    today = today or date.today()
+    entries: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+
+    def start_entry(header: str) -> Dict[str, Any]:
+        entry = {"header_lines": [header] if header else [], "bullets": [], "dates": None}
+        entries.append(entry)
+        return entry
+
+    for raw in section_text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if BULLET_RE.match(line):
+            if current is None:
+                current = start_entry("")
+            current["bullets"].append(BULLET_RE.sub("", line).strip())
+            continue
+
+        dates = parse_date_range(line, today)
+        remainder = line
+        if dates:
+            start, end = dates["span"]
+            remainder = (line[:start] + line[end:]).strip(" |,-–—()")
+
+        if current is not None and not current["bullets"] and (dates is None or current["dates"] is None):
+            # Still inside an entry header block (e.g. title line, then company line, then dates)
+            if remainder:
+                current["header_lines"].append(remainder)
+            if dates:
+                current["dates"] = dates
+        elif current is not None and current["bullets"] and not dates and len(line) > 80:
+            # Wrapped bullet text without a bullet marker
+            current["bullets"][-1] = f"{current['bullets'][-1]} {line}"
+        else:
+            current = start_entry(remainder)
+            current["dates"] = dates
+
+    results = []
+    for entry in entries:
+        header = " | ".join(entry["header_lines"])
+        fields = _split_header(entry["header_lines"][0]) if entry["header_lines"] else {"title": "", "company": "", "location": ""}
+        if len(entry["header_lines"]) > 1 and not fields["company"]:
+            fields["company"] = entry["header_lines"][1]
+        if not header and not entry["dates"]:
+            continue
+        dates = entry["dates"] or {}
+        results.append({
+            "title": fields["title"],
+            "company": fields["company"],
+            "location": fields["location"],
+            "duration": dates.get("duration", ""),
+            "start": dates.get("start"),
+            "end": dates.get("end"),
+            "is_current": dates.get("is_current", False),
+            "years": round(dates["months"] / 12, 1) if dates else None,
+            "bullets": entry["bullets"],
+        })
+    return results
+
+
+def total_experience_years(experience: List[Dict[str, Any]]) -> float:
+    """Total years across entries, counting overlapping roles only once"""
+    intervals = []
+    for entry in experience:
+        if entry.get("start") and entry.get("end"):
+            sy, sm = map(int, entry["start"].split("-"))
+            ey, em = map(int, entry["end"].split("-"))
+            intervals.append((sy * 12 + sm - 1, ey * 12 + em))
+    months = 0
+    last_end = None
+    for start, end in sorted(intervals):
+        if last_end is not None and start < last_end:
+            if end > last_end:
+                months += end - last_end
+                last_end = end
+            continue
+        months += end - start
+        last_end = end
+    return round(months / 12, 1)
+
+
+def parse_education(section_text: str) -> List[Dict[str, Any]]:
+    """Extract degree, institution and year from an education section"""
+    entries: List[Dict[str, Any]] = []
+    for raw in section_text.splitlines():
+        line = BULLET_RE.sub("", raw).strip()
+        if not line:
+            continue
+        degree = next((label for label, pattern in DEGREE_PATTERNS if re.search(pattern, line, re.IGNORECASE)), None)
+        year_match = re.findall(r"\b(19\d{2}|20\d{2})\b", line)
+        institution = None
+        if INSTITUTION_RE.search(line):
+            institution = next((p.strip() for p in re.split(r"\s+\|\s+|,\s+|\s+[-–—]\s+", line) if INSTITUTION_RE.search(p)), None)
+
+        if degree or not entries:
+            entries.append({"degree": line if degree else "", "level": degree, "institution": institution, "year": None})
+        elif institution and not entries[-1]["institution"]:
+            entries[-1]["institution"] = institution
+        if year_match:
+            entries[-1]["year"] = int(year_match[-1])
+        if institution and not entries[-1]["institution"]:
+            entries[-1]["institution"] = institution
+    return [e for e in entries if e["degree"] or e["institution"]]
+
+
+def parse_list_section(section_text: str) -> List[str]:
+    """Split a skills/certifications style section into individual items"""
+    items = []
+    for raw in section_text.splitlines():
+        line = BULLET_RE.sub("", raw).strip()
+        if not line:
+            continue
+        # Drop "Languages:" style category labels
+        line = re.sub(r"^[A-Za-z/&\s]{2,30}:\s*", "", line)
+        items.extend(p.strip() for p in re.split(r"[,;|•]", line) if p.strip())
+    return list(dict.fromkeys(items))
+
+
+def parse_resume_structured(text: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """Parse resume text into sections, experience entries, education and skills"""
+    today = today or date.today()
+    sections = split_sections(text or "")
+    text_lower = (text or "").lower()
+
+    experience = parse_experience(sections.get("experience", ""), today)
+    education_entries = parse_education(sections.get("education", ""))
+    certifications = parse_list_section(sections.get("certifications", ""))
+
+    # Skills: taxonomy matches across the whole resume plus items listed under a skills heading
+    skills = extract_skills(text or "")
+    listed_skills = parse_list_section(sections.get("skills", ""))
+
+    total_years = total_experience_years(experience)
+    stated_years = None
+    for pattern in YEARS_STATED_PATTERNS:
+        match = re.search(pattern, text_lower)
+        if match:
+            stated_years = int(match.group(1))
+            break
+
+    education_level = next((e["level"] for e in education_entries if e.get("level")), None)
+    if not education_level:
+        education_level = next(
+            (label for label, pattern in DEGREE_PATTERNS if re.search(pattern, text_lower)), None
+        )
+
+    current = next((e for e in experience if e.get("is_current")), experience[0] if experience else None)
+
+    return {
+        "raw_text": text,
+        "current_role": current["title"] if current and current["title"] else None,
+        "years_experience": round(total_years) if total_years else stated_years,
+        "total_years_experience": total_years,
+        "education": education_level,
+        "education_entries": education_entries,
+        "skills": skills,
+        "listed_skills": listed_skills,
+        "certifications": certifications,
+        "companies": list(dict.fromkeys(e["company"] for e in experience if e.get("company"))),
+        "experience": experience,
+        "summary": sections.get("summary", ""),
+        "other_sections": {
+            name: sections[name] for name in ("projects", "awards", "publications") if name in sections
+        },
+        "contact": " | ".join(l.strip() for l in sections.get("header", "").splitlines()[:4] if l.strip())[:300],
+        "sections_found": [name for name in sections if name != "header"],
+    }
+
+
+def format_resume_summary(parsed: Dict[str, Any], max_bullets: int = 4, max_chars: int = 2500) -> str:
+    """
+    Compact, prompt-ready summary of a parsed resume.
+    Falls back to truncated raw text when no structure was detected.
+    """
+    experience = parsed.get("experience") or []
+    if not experience:
+        return (parsed.get("raw_text") or "")[:max_chars]
+
+    lines = []
+    if parsed.get("contact"):
+        lines.append(f"Candidate: {parsed['contact']}")
+    if parsed.get("current_role"):
+        lines.append(f"Current role: {parsed['current_role']}")
+    if parsed.get("total_years_experience") or parsed.get("years_experience"):
+        lines.append(f"Total experience: {parsed.get('total_years_experience') or parsed.get('years_experience')} years")
+    if parsed.get("summary"):
+        lines.append(f"Summary: {' '.join(parsed['summary'].split())[:400]}")
+
+    lines.append("Experience:")
+    for entry in experience:
+        header = " | ".join(p for p in [entry.get("title"), entry.get("company"), entry.get("duration")] if p)
+        lines.append(f"- {header}")
+        for bullet in entry.get("bullets", [])[:max_bullets]:
+            lines.append(f"  • {bullet}")
+
+    education = parsed.get("education_entries") or []
+    if education:
+        lines.append("Education:")
+        for entry in education:
+            lines.append("- " + " | ".join(str(p) for p in [entry.get("degree"), entry.get("institution"), entry.get("year")] if p))
+    if parsed.get("skills"):
+        lines.append(f"Skills: {', '.join(parsed['skills'])}")
+    if parsed.get("certifications"):
+        lines.append(f"Certifications: {', '.join(parsed['certifications'][:8])}")
+    for name, body in (parsed.get("other_sections") or {}).items():
+        lines.append(f"{name.title()}: {' '.join(body.split())[:400]}")
+
+    return "\n".join(lines)[:max_chars]
@@ -0,0 +1,92 @@
+"""
+Role matcher - scores one resume against every AI role at once.
+
+At import the role top_skills are compiled into two 0/1 matrices:
+  label_terms  (labels x terms)  - a skill label is met by any of its terms
+  role_labels  (roles x labels)  - each role's labels, weighted 1/len(top_skills)
+A resume's term vector then gives every role's keyword fit with two matrix
+products, so ranking all roles costs about the same as scanning one.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from data.roles import AI_ROLES
+from services.ats_scorer import combine_partials, score_sections
+from services.resume_parser import split_sections
+from services.skill_matcher import label_to_skills
+
+
+def _build_matrices():
+    labels = list(dict.fromkeys(label for role in AI_ROLES for label in role.get("top_skills", [])))
+    terms = list(dict.fromkeys(term for label in labels for term in label_to_skills(label)))
+    label_index = {label: i for i, label in enumerate(labels)}
+    term_index = {term: i for i, term in enumerate(terms)}
+
+    label_terms = np.zeros((len(labels), len(terms)), dtype=np.float32)
+    for label, i in label_index.items():
+        for term in label_to_skills(label):
+            label_terms[i, term_index[term]] = 1.0
+
+    role_labels = np.zeros((len(AI_ROLES), len(labels)), dtype=np.float32)
+    for r, role in enumerate(AI_ROLES):
+        skills = role.get("top_skills", [])
+        for label in skills:
+            role_labels[r, label_index[label]] = 1.0 / len(skills)
+    return label_index, term_index, label_terms, role_labels
+
+
+LABEL_INDEX, TERM_INDEX, LABEL_TERMS, ROLE_LABELS = _build_matrices()
+
+
+def term_vector(terms) -> np.ndarray:
+    """0/1 vector over the matrix terms for the skills found in a resume"""
+    vector = np.zeros(len(TERM_INDEX), dtype=np.float32)
+    for term in terms:
+        i = TERM_INDEX.get(term)
+        if i is not None:
+            vector[i] = 1.0
+    return vector
+
+
+def rank_roles(resume_text: str, partials: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Rank all roles for a resume by keyword fit.
+    ATS scores per role reuse the role-independent structure/formatting scores,
+    so they match what /resume/scan reports for that role.
+    """
+    if partials is None:
+        partials = score_sections(split_sections(resume_text))
+    terms = set()
+    for partial in partials.values():
+        terms.update(partial["terms"])
+
+    label_hits = (LABEL_TERMS @ term_vector(terms)) > 0
+    fits = ROLE_LABELS @ label_hits.astype(np.float32)
+    keyword_percent = np.rint(fits * 100).astype(int)
+
+    order = np.argsort(-fits, kind="stable")
+    best = combine_partials(partials, AI_ROLES[order[0]])
+    breakdown = best["score_breakdown"]
+    ats_scores = np.rint(0.5 * keyword_percent + 0.25 * breakdown["structure"] + 0.25 * breakdown["formatting"]).astype(int)
+
+    ranked: List[Dict[str, Any]] = []
+    for r in order:
+        role = AI_ROLES[r]
+        skills = role.get("top_skills", [])
+        ranked.append({
+            "role_id": role["id"],
+            "role_name": role["name"],
+            "keyword_match_percent": int(keyword_percent[r]),
+            "ats_score": int(ats_scores[r]),
+            "keywords_found": [s for s in skills if label_hits[LABEL_INDEX[s]]],
+            "keywords_missing": [s for s in skills if not label_hits[LABEL_INDEX[s]]],
+        })
+
+    return {
+        "roles": ranked,
+        "best_role": ranked[0],
+        "human_appeal_score": best["human_appeal_score"],
+        "formatting_issues": best["formatting_issues"],
+        "score_breakdown": {k: v for k, v in breakdown.items() if k != "keywords"},
+    }
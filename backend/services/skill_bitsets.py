@@ -0,0 +1,60 @@
+"""
+Skill bitsets - skills as integer bit masks over the shared skill taxonomy.
+
+Every canonical skill in data/skills.py gets one bit, so a set of skills (what
+a course teaches, what a user knows) is a single int and coverage checks are
+bit operations:
+
+  - skills_mask resolves labels ("PyTorch/TensorFlow", "Python basics")
+    through skill_matcher.label_to_skills; labels outside the taxonomy have
+    no bit and are ignored
+  - prerequisites_mask is the union of the direct prerequisites of a mask's
+    skills (data/skills.py SKILL_PREREQUISITES)
+"""
+from functools import lru_cache
+from typing import Iterable, List
+
+from data.skills import SKILL_PREREQUISITES, SKILL_TAXONOMY
+from services.skill_matcher import label_to_skills
+
+SKILL_BITS = {skill: 1 << i for i, skill in enumerate(SKILL_TAXONOMY)}
+
+# Bit -> direct prerequisites of that skill, as a mask
+_PREREQUISITE_MASKS = {
+    SKILL_BITS[skill]: sum(SKILL_BITS[p] for p in set(prerequisites))
+    for skill, prerequisites in SKILL_PREREQUISITES.items()
+}
+
+
+@lru_cache(maxsize=2048)
+def label_mask(label: str) -> int:
+    """Mask of the taxonomy skills a single label resolves to"""
+    mask = 0
+    for skill in label_to_skills(label):
+        mask |= SKILL_BITS.get(skill, 0)
+    return mask
+
+
+def skills_mask(labels: Iterable[str]) -> int:
+    mask = 0
+    for label in labels:
+        if label and label.strip():
+            mask |= label_mask(label)
+    return mask
+
+
+def mask_skills(mask: int) -> List[str]:
+    """Canonical skills in a mask, in taxonomy order"""
+    return [skill for skill, bit in SKILL_BITS.items() if mask & bit]
+
+
+def prerequisites_mask(mask: int) -> int:
+    result = 0
+    for bit, prerequisites in _PREREQUISITE_MASKS.items():
+        if mask & bit:
+            result |= prerequisites
+    return result
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
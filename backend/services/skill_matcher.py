@@ -0,0 +1,95 @@
+"""
+Skill matcher - finds taxonomy skills in free text.
+
+All aliases are compiled into a single regex at import time, so matching a
+resume or job description is one scan regardless of taxonomy size.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+from data.skills import SKILL_TAXONOMY
+
+# Characters that may be part of a skill token ("c++", "c#", "node.js", "ci/cd")
+TOKEN_CHARS = r"a-z0-9+#"
+
+
+def _build_alias_map() -> Dict[str, str]:
+    alias_map = {}
+    for canonical, aliases in SKILL_TAXONOMY.items():
+        for alias in [canonical.lower(), *aliases]:
+            alias_map.setdefault(alias.lower(), canonical)
+    return alias_map
+
+
+ALIAS_TO_SKILL = _build_alias_map()
+
+# Longest aliases first so "machine learning engineer" style phrases win over "ml"
+_SKILL_PATTERN = re.compile(
+    rf"(?<![{TOKEN_CHARS}])("
+    + "|".join(re.escape(alias) for alias in sorted(ALIAS_TO_SKILL, key=len, reverse=True))
+    + rf")(?![{TOKEN_CHARS}])"
+)
+
+
+def extract_skills(text: str) -> List[str]:
+    """Return canonical skills mentioned in text, in order of first appearance"""
+    if not text:
+        return []
+    seen = {}
+    for match in _SKILL_PATTERN.finditer(text.lower()):
+        seen.setdefault(ALIAS_TO_SKILL[match.group(1)], None)
+    return list(seen)
+
+
+def find_skills(text: str) -> Set[str]:
+    """Return the set of canonical skills mentioned in text"""
+    return set(extract_skills(text))
+
+
+def canonical_skill(term: str) -> str:
+    """Map a single term to its canonical skill name (or return it unchanged)"""
+    return ALIAS_TO_SKILL.get(term.strip().lower(), term.strip())
+
+
+@lru_cache(maxsize=1024)
+def label_to_skills(label: str) -> tuple:
+    """
+    Resolve a role/course skill label to canonical skills.
+
+    Labels such as "PyTorch/TensorFlow" or "LLM APIs (OpenAI, Anthropic)" are
+    satisfied by any of their parts. Labels outside the taxonomy
+    ("Creativity") are kept as literal terms.
+    """
+    key = label.strip().lower()
+    if key in ALIAS_TO_SKILL:
+        return (ALIAS_TO_SKILL[key],)
+
+    found = extract_skills(key)
+    if found:
+        return tuple(found)
+
+    parts = [p.strip() for p in re.split(r"[/(),]", key) if p.strip()]
+    return tuple(dict.fromkeys(canonical_skill(p) for p in parts)) or (label.strip(),)
+
+
+def label_matches(label: str, skills: Set[str], text_lower: str = "") -> bool:
+    """True if a resume with the given canonical skills (and text) covers the label"""
+    for term in label_to_skills(label):
+        if term in skills:
+            return True
+        if term not in SKILL_TAXONOMY and text_lower and re.search(
+            rf"(?<![{TOKEN_CHARS}]){re.escape(term.lower())}(?![{TOKEN_CHARS}])", text_lower
+        ):
+            return True
+    return False
+
+
+def split_labels(labels: Iterable[str], text: str) -> tuple:
+    """Split skill labels into (found, missing) for the given text"""
+    text_lower = (text or "").lower()
+    skills = find_skills(text_lower)
+    found, missing = [], []
+    for label in labels:
+        (found if label_matches(label, skills, text_lower) else missing).append(label)
+    return found, missing
@@ -0,0 +1,222 @@
+"""
+Object storage for rendered documents.
+
+With a storage backend configured, a rendered document is uploaded once under
+its content hash and download endpoints answer with a redirect to a short-lived
+signed URL, so the bytes are served by the storage service instead of the
+uvicorn workers and every node sees the same objects.
+
+Backends (STORAGE_BACKEND):
+  ""     - disabled, documents are returned inline as before
+  local  - files under STORAGE_LOCAL_DIR, served by /api/files with HMAC-signed
+           URLs (single node, or nodes sharing a volume)
+  s3     - any S3-compatible service (AWS, MinIO, R2) via boto3 presigned URLs
+"""
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from config import (
+    S3_ACCESS_KEY_ID, S3_BUCKET, S3_ENDPOINT_URL, S3_PUBLIC_ENDPOINT_URL, S3_REGION, S3_SECRET_ACCESS_KEY,
+    STORAGE_BACKEND, STORAGE_LOCAL_DIR, STORAGE_SIGNING_SECRET,
+)
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import BotoCoreError, ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+# Keys known to exist, so repeat downloads skip the existence check
+KNOWN_KEYS_LIMIT = 10000
+
+
+class StorageError(Exception):
+    """The storage backend could not store or find an object"""
+
+
+class StorageBackend:
+    name = ""
+
+    def __init__(self):
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._known_lock = threading.Lock()
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, filename: str, expires_in: int) -> str:
+        raise NotImplementedError
+
+    def has(self, key: str) -> bool:
+        """exists() with a per-process memo of keys already seen"""
+        with self._known_lock:
+            if key in self._known:
+                return True
+        if not self.exists(key):
+            return False
+        self._remember(key)
+        return True
+
+    def store(self, key: str, data: bytes, content_type: str) -> None:
+        self.put(key, data, content_type)
+        self._remember(key)
+
+    def _remember(self, key: str) -> None:
+        with self._known_lock:
+            self._known[key] = None
+            if len(self._known) > KNOWN_KEYS_LIMIT:
+                self._known.popitem(last=False)
+
+
+class LocalStorage(StorageBackend):
+    """Filesystem backend; URLs point at /api/files and are signed with HMAC-SHA256"""
+    name = "local"
+
+    def __init__(self, root: str, secret: str, url_prefix: str = "/api/files"):
+        super().__init__()
+        self.root = Path(root)
+        self.secret = secret.encode("utf-8")
+        self.url_prefix = url_prefix
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self.path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            raise StorageError(f"Could not write {key}: {e}")
+
+    def signature(self, key: str, filename: str, expires: int) -> str:
+        message = f"{key}\n{filename}\n{expires}".encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def verify(self, key: str, filename: str, expires: int, signature: str) -> bool:
+        """Signature matches and the URL has not expired"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.signature(key, filename, expires), signature)
+
+    def presigned_url(self, key: str, filename: str, expires_in: int) -> str:
+        expires = int(time.time()) + expires_in
+        query = urlencode({"filename": filename, "expires": expires,
+                           "signature": self.signature(key, filename, expires)})
+        return f"{self.url_prefix}/{quote(key)}?{query}"
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible backend - AWS S3, or MinIO/R2 via S3_ENDPOINT_URL"""
+    name = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: str = "", region: str = "us-east-1",
+                 access_key_id: str = "", secret_access_key: str = "", public_endpoint_url: str = ""):
+        super().__init__()
+        self.bucket = bucket
+
+        def client(endpoint: str):
+            return boto3.client(
+                "s3",
+                endpoint_url=endpoint or None,
+                region_name=region,
+                aws_access_key_id=access_key_id or None,
+                aws_secret_access_key=secret_access_key or None,
+                # Path-style addressing works with MinIO and other self-hosted services
+                config=BotoConfig(signature_version="s3v4",
+                                  s3={"addressing_style": "path" if endpoint else "auto"}),
+            )
+
+        self.client = client(endpoint_url)
+        # The host is part of the signature, so URLs for browsers are signed against the public endpoint
+        self.signing_client = client(public_endpoint_url) if public_endpoint_url else self.client
+        self._bucket_ready = False
+
+    def _ensure_bucket(self) -> None:
+        if self._bucket_ready:
+            return
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+        except ClientError:
+            # Local MinIO stand-ins start empty
+            self.client.create_bucket(Bucket=self.bucket)
+        self._bucket_ready = True
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise StorageError(f"Could not check {key}: {e}")
+        except BotoCoreError as e:
+            raise StorageError(f"Could not check {key}: {e}")
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        try:
+            self._ensure_bucket()
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(f"Could not upload {key}: {e}")
+
+    def presigned_url(self, key: str, filename: str, expires_in: int) -> str:
+        return self.signing_client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentDisposition": f"attachment; filename={filename}",
+            },
+            ExpiresIn=expires_in,
+        )
+
+
+def create_storage() -> Optional[StorageBackend]:
+    """Backend selected by STORAGE_BACKEND, or None to serve documents inline"""
+    if STORAGE_BACKEND == "local":
+        if not STORAGE_SIGNING_SECRET:
+            logging.warning("STORAGE_SIGNING_SECRET not set. Local storage disabled, serving documents inline.")
+            return None
+        try:
+            return LocalStorage(STORAGE_LOCAL_DIR, STORAGE_SIGNING_SECRET)
+        except OSError as e:
+            logging.warning(f"Local storage unavailable, serving documents inline: {e}")
+            return None
+    if STORAGE_BACKEND == "s3":
+        if not BOTO3_AVAILABLE:
+            logging.warning("boto3 not installed. S3 storage disabled, serving documents inline.")
+            return None
+        if not S3_BUCKET:
+            logging.warning("S3_BUCKET not set. S3 storage disabled, serving documents inline.")
+            return None
+        return S3Storage(S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY,
+                         S3_PUBLIC_ENDPOINT_URL)
+    if STORAGE_BACKEND:
+        logging.warning(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}', serving documents inline")
+    return None
+
+
+storage = create_storage()
@@ -87,6 +87,13 @@ const GenerationStatus = ({ stage, progress }) => {
   );
 };
 
+// Shaped like an axios error, so handleGenerate reports it the same way
+const requestError = (status, data) => {
+  const error = new Error(`Request failed with status ${status}`);
+  error.response = { status, data };
+  return error;
+};
+
 // Cover Letter Version Card
 const VersionCard = ({ version, index, coverLetterId, onCopy }) => {
   const [expanded, setExpanded] = useState(index === 0);
@@ -191,7 +198,7 @@ const VersionCard = ({ version, index, coverLetterId, onCopy }) => {
                   size="sm"
                   variant="outline"
                   onClick={() => handleDownload("pdf")}
-                  disabled={downloading}
+                  disabled={downloading || !coverLetterId}
                   data-testid={`download-pdf-${index}`}
                 >
                   <Download className="w-4 h-4 mr-1" /> PDF
@@ -200,7 +207,7 @@ const VersionCard = ({ version, index, coverLetterId, onCopy }) => {
                   size="sm"
                   variant="outline"
                   onClick={() => handleDownload("docx")}
-                  disabled={downloading}
+                  disabled={downloading || !coverLetterId}
                   data-testid={`download-docx-${index}`}
                 >
                   <Download className="w-4 h-4 mr-1" /> DOCX
@@ -305,31 +312,72 @@ export default function CoverLetterPage() {
       });
     }, 500);
 
+    // Each variation is shown as soon as it is written; downloads unlock once all are saved
+    const versions = [];
+    const showVersions = () => {
+      clearInterval(progressInterval);
+      setResult({ versions: versions.filter(Boolean) });
+      setLoading(false);
+    };
+
     try {
-      const response = await api.post(
-        `/cover-letter/generate`,
-        {
+      const token = localStorage.getItem("token");
+      const response = await fetch(`${api.defaults.baseURL}/cover-letter/generate-stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
+        body: JSON.stringify({
           resume_text: resumeText,
           job_description: jobDescription,
           company_name: companyName,
           target_role: targetRole,
           tone: selectedTone
+        })
+      });
+
+      if (!response.ok) {
+        if (response.status === 401) {
+          localStorage.removeItem("token");
+          window.location.href = "/login";
         }
-      );
+        throw requestError(response.status, await response.json().catch(() => ({})));
+      }
 
-      clearInterval(progressInterval);
-      setGenerationProgress(100);
-      setGenerationStage(5);
-
-      setTimeout(() => {
-        setResult(response.data);
-        setLoading(false);
-        fetchHistory();
-        toast.success("Cover letters generated successfully!");
-      }, 500);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let finished = false;
+      while (!finished) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffer.split("\n");
+        buffer = done ? "" : lines.pop();
+
+        for (const line of lines.filter(l => l.trim())) {
+          const event = JSON.parse(line);
+          if (event.type === "variant") {
+            versions[event.index] = event.version;
+            showVersions();
+          } else if (event.type === "complete") {
+            clearInterval(progressInterval);
+            setResult(event);
+            setLoading(false);
+            fetchHistory();
+            toast.success("Cover letters generated successfully!");
+          } else if (event.type === "error") {
+            throw requestError(500, { detail: event.detail });
+          }
+        }
+        finished = done;
+      }
     } catch (error) {
       clearInterval(progressInterval);
       setLoading(false);
+      if (versions.some(Boolean)) {
+        showVersions();
+      }
 
       if (error.response?.status === 403) {
         toast.error("Monthly limit reached. Upgrade to Pro for unlimited cover letters.");
@@ -138,6 +138,15 @@ export default function ResumeScannerPage() {
       });
       fetchHistory();
       toast.success("Resume scan complete!");
+
+      // Scores are local and instant - the written feedback follows
+      if (response.data.narrative_source !== "ai") {
+        api.post(`/resume/scan/${response.data.scan_id}/narrative`, { resume_text: resumeText })
+          .then(({ data }) => setScanResult(current =>
+            current?.scan_id === response.data.scan_id ? { ...current, ...data } : current
+          ))
+          .catch(() => {});
+      }
     } catch (error) {
       const detail = error.response?.data?.detail;
       let errorMessage = "Failed to scan resume";
@@ -0,0 +1,126 @@
+"""
+Test the local ATS scorer - deterministic scores, keyword coverage and feedback
+Runs locally against backend/services, no server required
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from data.roles import AI_ROLES  # noqa: E402
+from services.ats_scorer import score_resume, score_sections, combine_partials  # noqa: E402
+from services.resume_parser import split_sections  # noqa: E402
+from tests.test_resume_parser import SAMPLE_RESUME  # noqa: E402
+
+PROMPT_ENGINEER = next(r for r in AI_ROLES if r["id"] == "prompt_engineer")
+AI_PM = next(r for r in AI_ROLES if r["id"] == "ai_product_manager")
+
+
+class TestScores:
+    def test_deterministic(self):
+        assert score_resume(SAMPLE_RESUME, PROMPT_ENGINEER) == score_resume(SAMPLE_RESUME, PROMPT_ENGINEER)
+
+    def test_keyword_coverage(self):
+        result = score_resume(SAMPLE_RESUME, PROMPT_ENGINEER)
+        assert "RAG" in result["keywords_found"]
+        assert result["keywords_missing"] == ["Creativity"]
+        assert result["keyword_match_percent"] == 80
+        assert 0 <= result["ats_score"] <= 100
+
+    def test_role_fit_changes_ats_score(self):
+        assert score_resume(SAMPLE_RESUME, PROMPT_ENGINEER)["ats_score"] > score_resume(SAMPLE_RESUME, AI_PM)["ats_score"]
+
+    def test_combining_partials_matches_full_scan(self):
+        partials = score_sections(split_sections(SAMPLE_RESUME))
+        assert combine_partials(partials, AI_PM) == score_resume(SAMPLE_RESUME, AI_PM)
+
+
+class TestFeedback:
+    def test_weak_bullets_lower_human_appeal(self):
+        weak = SAMPLE_RESUME.replace("- Built automated", "- Responsible for an automated").replace(
+            "- Reduced API latency by 40%", "- Worked on API latency"
+        )
+        assert score_resume(weak, PROMPT_ENGINEER)["human_appeal_score"] < score_resume(SAMPLE_RESUME, PROMPT_ENGINEER)["human_appeal_score"]
+
+    def test_formatting_issues(self):
+        result = score_resume("Jane Doe\n★ Python ★ SQL ★\nEXPERIENCE\nAnalyst at Acme", PROMPT_ENGINEER)
+        issues = " ".join(result["formatting_issues"])
+        assert "education" in issues
+        assert "Contact details" in issues
+        assert result["score_breakdown"]["formatting"] < 100
+
+
+class TestRankRoles:
+    def test_ranks_every_role(self):
+        from services.role_matcher import rank_roles
+        result = rank_roles(SAMPLE_RESUME)
+        assert len(result["roles"]) == len(AI_ROLES)
+        fits = [r["keyword_match_percent"] for r in result["roles"]]
+        assert fits == sorted(fits, reverse=True)
+        assert result["best_role"]["role_id"] in {"prompt_engineer", "generative_ai_developer"}
+
+    def test_matches_single_role_scan(self):
+        from services.role_matcher import rank_roles
+        ranked = {r["role_id"]: r for r in rank_roles(SAMPLE_RESUME)["roles"]}
+        for role in AI_ROLES:
+            single = score_resume(SAMPLE_RESUME, role)
+            assert ranked[role["id"]]["ats_score"] == single["ats_score"]
+            assert ranked[role["id"]]["keywords_found"] == single["keywords_found"]
+
+
+class TestIncrementalRescan:
+    def test_only_edited_sections_are_rescored(self):
+        from services.ats_scorer import SCORER_VERSION, score_sections_incremental
+        state, changed = score_sections_incremental(split_sections(SAMPLE_RESUME))
+        assert set(changed) == set(state)
+
+        edited = SAMPLE_RESUME.replace("Reduced API latency by 40%", "Reduced API latency by 60%")
+        new_state, changed = score_sections_incremental(split_sections(edited), state, SCORER_VERSION)
+        assert changed == ["experience"]
+        assert new_state["skills"] is state["skills"]
+
+    def test_scorer_version_change_rescores_everything(self):
+        from services.ats_scorer import SCORER_VERSION, score_sections_incremental
+        state, _ = score_sections_incremental(split_sections(SAMPLE_RESUME))
+        _, changed = score_sections_incremental(split_sections(SAMPLE_RESUME), state, SCORER_VERSION - 1)
+        assert set(changed) == set(state)
+
+    def test_unchanged_rescan_reuses_feedback(self):
+        import asyncio
+        import os
+        os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+        from routes.resume import analyze_resume_for_role
+
+        first = asyncio.run(analyze_resume_for_role(SAMPLE_RESUME, "prompt_engineer", narrative=False))
+        previous = {**first, "narrative_source": "ai", "strengths": ["Great RAG work"]}
+        rescan = asyncio.run(analyze_resume_for_role(SAMPLE_RESUME, "prompt_engineer", previous_scan=previous))
+        assert rescan["changed_sections"] == []
+        assert rescan["strengths"] == ["Great RAG work"]
+        assert rescan["ats_score"] == first["ats_score"]
+
+    def test_narrative_is_opt_in_and_async(self, monkeypatch):
+        import asyncio
+        import os
+        from types import SimpleNamespace
+        os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+        from routes import resume
+
+        calls = []
+
+        class FakeAsyncAnthropic:
+            def __init__(self, api_key):
+                self.messages = self
+
+            async def create(self, **kwargs):
+                calls.append(kwargs)
+                return SimpleNamespace(content=[SimpleNamespace(text='{"strengths": ["Clear RAG impact"]}')])
+
+        monkeypatch.setattr(resume, "ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setattr(resume.anthropic, "AsyncAnthropic", FakeAsyncAnthropic)
+
+        local = asyncio.run(resume.analyze_resume_for_role(SAMPLE_RESUME, "prompt_engineer"))
+        assert local["narrative_source"] == "local" and calls == []
+
+        full = asyncio.run(resume.analyze_resume_for_role(SAMPLE_RESUME, "prompt_engineer", narrative=True))
+        assert full["narrative_source"] == "ai" and full["strengths"] == ["Clear RAG impact"]
+        assert full["ats_score"] == local["ats_score"] and len(calls) == 1
@@ -0,0 +1,109 @@
+"""
+Test the course store and the indexed course catalog behind /courses
+Runs locally, no server or database required
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from data.course_store import LISTING, VERIFIED, course_store  # noqa: E402
+from data.courses import COURSE_DATABASE  # noqa: E402
+from data.courses_database import ALL_COURSES, get_course_by_id  # noqa: E402
+from services.course_catalog import CourseCatalog, InvalidCursor  # noqa: E402
+
+
+def scan(role_id=None, difficulty=None, platform=None, free_only=False):
+    """The linear scan /courses used to do, for comparison"""
+    courses = []
+    for course_id, course in COURSE_DATABASE.items():
+        if role_id and role_id not in course.get("for_roles", []) and "all" not in course.get("for_roles", []):
+            continue
+        if difficulty and not course.get("difficulty", "").lower().startswith(difficulty.lower()):
+            continue
+        if platform and course.get("platform", "").lower() != platform.lower():
+            continue
+        if free_only and course.get("cost", "").lower() != "free":
+            continue
+        courses.append({"course_id": course_id, **course})
+    courses.sort(key=lambda x: (
+        0 if x.get("recommended") else 1,
+        0 if x.get("cost", "").lower() == "free" else 1,
+        -x.get("rating", 0)
+    ))
+    return courses
+
+
+@pytest.fixture
+def catalog():
+    return CourseCatalog(course_store.records(LISTING))
+
+
+class TestCourseStore:
+    def test_both_sources_share_one_store_with_integer_ids(self):
+        records = course_store.all
+        assert len(records) == len(COURSE_DATABASE) + len(ALL_COURSES)
+        assert [r.id for r in records] == list(range(len(records)))
+        assert {r.source for r in records} == {LISTING, VERIFIED}
+
+    def test_views_keep_each_source_shape(self):
+        listing = COURSE_DATABASE["python_everybody"]
+        assert listing["for_roles"] == ["all"] and "course_id" not in listing and "id" not in listing
+        verified = get_course_by_id("py-001")
+        assert verified["id"] == "py-001" and isinstance(verified["skills_taught"], list)
+        assert "for_roles" not in verified and "students" not in get_course_by_id("py-002")
+
+    def test_records_are_compact_and_read_only(self):
+        record = course_store.get(VERIFIED, "py-001")
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.name = "changed"
+        get_course_by_id("py-001")["skills_taught"].append("mutated")
+        assert "mutated" not in get_course_by_id("py-001")["skills_taught"]
+
+    def test_repeated_strings_are_interned(self):
+        platforms = [r.platform for r in course_store.all if r.platform == "Coursera"]
+        assert len(platforms) > 1 and all(p is platforms[0] for p in platforms)
+
+
+class TestCourseCatalog:
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"role_id": "ai_engineer"},
+        {"role_id": "not_a_role"},
+        {"difficulty": "inter", "free_only": True},
+        {"role_id": "mlops_engineer", "platform": "SCRIMBA"},
+        {"platform": "Coursera", "difficulty": "Beginner"},
+        {"difficulty": "expert"},
+    ])
+    def test_indexed_queries_match_a_linear_scan(self, catalog, filters):
+        data = json.loads(catalog.response(**filters))
+        expected = scan(**filters)
+        assert data["courses"] == expected
+        assert data["total"] == len(expected)
+        assert data["free_count"] == sum(c["cost"].lower() == "free" for c in expected)
+
+    def test_cursor_pages_cover_every_course_once(self, catalog):
+        seen, cursor = [], None
+        while True:
+            data = json.loads(catalog.response(role_id="ai_engineer", cursor=cursor, limit=4))
+            assert len(data["courses"]) <= 4
+            seen += [c["course_id"] for c in data["courses"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [c["course_id"] for c in scan(role_id="ai_engineer")]
+
+    def test_responses_are_cached_as_bytes(self, catalog):
+        first = catalog.response(platform="scrimba")
+        assert catalog.response(platform="Scrimba") is first
+
+    def test_unknown_cursor_is_rejected(self, catalog):
+        with pytest.raises(InvalidCursor):
+            catalog.response(cursor="no_such_course", limit=5)
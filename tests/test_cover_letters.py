@@ -0,0 +1,332 @@
+"""
+Test concurrent per-variant cover letter generation with a fake Anthropic client
+Runs locally, no API key, server or database required
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import cover_letters  # noqa: E402
+from services import company_cache as company_cache_module  # noqa: E402
+from services.company_cache import CompanyResearchCache, normalize_company_name  # noqa: E402
+
+LETTER = " ".join(["word"] * 120)
+RESUME = "Python developer with PyTorch, Docker and SQL experience building ML pipelines."
+JOB = "We need a machine learning engineer with Python, PyTorch, Kubernetes and SQL."
+
+
+class FakeStream:
+    def __init__(self, text, delay, first_event_delay=0):
+        self.text, self.delay, self.first_event_delay = text, delay, first_event_delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.first_event_delay)
+        return "message_start"
+
+    async def get_final_message(self):
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=self.text)])
+
+
+class FakeClient:
+    """Variant i replies after delays[i]; the first `bad[i]` replies for it are malformed"""
+
+    def __init__(self, delays, bad=None, research=None, first_event_delay=0, shared_research=None):
+        self.delays, self.bad, self.research = delays, dict(bad or {}), research
+        self.first_event_delay = first_event_delay
+        self.shared_research = shared_research or {"company_name": "Acme", "why_compelling": "Search"}
+        self.calls = []
+        self.prompts = []
+        self.research_prompts = []
+        self.started = {}
+        self.messages = self
+
+    def stream(self, system, messages, **kwargs):
+        index = next(i for i, v in enumerate(cover_letters.VARIANTS) if v["version_name"] in messages[0]["content"])
+        self.calls.append((index, system))
+        self.started.setdefault(index, asyncio.get_running_loop().time())
+        self.prompts.append(messages[0]["content"])
+        if self.bad.get(index):
+            self.bad[index] -= 1
+            return FakeStream("not json", 0)
+        research = self.research or {"company_name": f"Acme {index}"}
+        body = {"cover_letter": f"{index} {LETTER}", "company_research": research}
+        return FakeStream(json.dumps(body), self.delays[index], self.first_event_delay)
+
+    async def create(self, messages, **kwargs):
+        self.research_prompts.append(messages[0]["content"])
+        text = json.dumps(self.shared_research)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+@pytest.fixture(autouse=True)
+def memory_company_cache(monkeypatch):
+    cache = CompanyResearchCache(None, timedelta(days=1))
+    monkeypatch.setattr(cover_letters, "company_cache", cache)
+    return cache
+
+
+def run_variants(client, monkeypatch):
+    monkeypatch.setattr(cover_letters, "async_claude_client", client)
+
+    async def collect():
+        return [item async for item in cover_letters.generate_variants("Acme", "ML Engineer", JOB, RESUME)]
+
+    return asyncio.run(collect())
+
+
+class TestCoverLetterVariants:
+    def test_variants_stream_in_completion_order_with_a_shared_cached_prefix(self, monkeypatch):
+        client = FakeClient(delays=[0.2, 0.0, 0.1])
+        results = run_variants(client, monkeypatch)
+
+        assert [index for index, *_ in results] == [1, 2, 0]
+        assert all(error is None for *_, error in results)
+        systems = [system for _, system in client.calls]
+        assert systems[0] == systems[1] == systems[2]
+
+    def test_short_prefixes_are_not_cached_or_waited_for(self, monkeypatch):
+        client = FakeClient(delays=[0, 0, 0], first_event_delay=0.3)
+        run_variants(client, monkeypatch)
+
+        system = client.calls[0][1]
+        assert sum(len(block["text"]) for block in system) // cover_letters.CHARS_PER_TOKEN < cover_letters.CACHE_MIN_TOKENS
+        assert not any("cache_control" in block for block in system)
+        # All three start together instead of waiting for the first to write a cache
+        assert max(client.started.values()) - min(client.started.values()) < 0.2
+
+    def test_long_prefixes_are_cached_and_later_variants_wait(self, monkeypatch):
+        # The test prompts are short - lower the threshold rather than padding them
+        monkeypatch.setattr(cover_letters, "CACHE_MIN_TOKENS", 200)
+        client = FakeClient(delays=[0, 0, 0], first_event_delay=0.3)
+        run_variants(client, monkeypatch)
+
+        system = client.calls[0][1]
+        assert system[-1]["cache_control"] == {"type": "ephemeral"}
+        assert sum(len(block["text"]) for block in system) // cover_letters.CHARS_PER_TOKEN >= cover_letters.CACHE_MIN_TOKENS
+        assert client.started[1] - client.started[0] >= 0.25 and client.started[2] - client.started[0] >= 0.25
+
+    def test_only_the_failed_variant_is_retried(self, monkeypatch):
+        client = FakeClient(delays=[0, 0, 0], bad={2: 1})
+        results = run_variants(client, monkeypatch)
+
+        assert sorted(index for index, *_ in results) == [0, 1, 2]
+        assert [index for index, _ in client.calls].count(2) == 2
+        assert len(client.calls) == 4
+
+    def test_partial_failure_keeps_the_good_letters(self, monkeypatch):
+        client = FakeClient(delays=[0, 0, 0], bad={1: cover_letters.VARIANT_ATTEMPTS})
+        monkeypatch.setattr(cover_letters, "async_claude_client", client)
+        data = asyncio.run(cover_letters.generate_cover_letters("Acme", "ML Engineer", JOB, RESUME))
+
+        assert [v["version_name"] for v in data["versions"]] == ["Technical Depth", "Authentic Connection"]
+        assert data["company_research"] == {"company_name": "Acme 0"}
+        assert len(data["failed_variants"]) == 1
+        analysis = data["job_match_analysis"]
+        assert "Python" in analysis["matching_skills"] and "Kubernetes" in analysis["potential_gaps"]
+
+    def test_unexpected_errors_keep_the_finished_letters(self, monkeypatch, memory_company_cache):
+        client = FakeClient(delays=[0, 0, 0])
+        original = client.stream
+
+        def stream(system, messages, **kwargs):
+            if cover_letters.VARIANTS[2]["version_name"] in messages[0]["content"]:
+                raise RuntimeError("connection reset")
+            return original(system, messages, **kwargs)
+
+        async def broken_put(company, research):
+            raise RuntimeError("cache is down")
+
+        client.stream = stream
+        monkeypatch.setattr(memory_company_cache, "put", broken_put)
+        monkeypatch.setattr(cover_letters, "async_claude_client", client)
+        data = asyncio.run(cover_letters.generate_cover_letters("Acme", "ML Engineer", JOB, RESUME))
+
+        assert [v["version_name"] for v in data["versions"]] == ["Technical Depth", "Impact & Results"]
+        assert "connection reset" in data["failed_variants"][0]
+
+    def test_stream_route_saves_the_same_data_as_generate(self, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from auth import get_current_user
+        from routes import cover_letter
+
+        class Collection:
+            def __init__(self):
+                self.inserted = []
+
+            async def find_one(self, *args, **kwargs):
+                return None
+
+            async def update_one(self, *args, **kwargs):
+                pass
+
+            async def insert_one(self, doc):
+                self.inserted.append(doc)
+
+        db = SimpleNamespace(usage=Collection(), cover_letters=Collection())
+        monkeypatch.setattr(cover_letter, "db", db)
+        monkeypatch.setattr(cover_letters, "async_claude_client",
+                            FakeClient(delays=[0, 0, 0], bad={1: cover_letters.VARIANT_ATTEMPTS}))
+        app = FastAPI()
+        app.include_router(cover_letter.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+
+        response = TestClient(app).post("/api/cover-letter/generate-stream", json={
+            "resume_text": RESUME, "job_description": JOB, "company_name": "Acme", "target_role": "ML Engineer",
+        })
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert [line["type"] for line in lines].count("variant") == 2
+        complete = lines[-1]
+        assert complete["type"] == "complete" and len(complete["failed_variants"]) == 1
+        saved = db.cover_letters.inserted[0]
+        assert saved["versions"] == complete["versions"]
+        assert [v["version_name"] for v in saved["versions"]] == ["Technical Depth", "Authentic Connection"]
+        assert saved["job_match_analysis"] == cover_letters.job_match_analysis(RESUME, JOB)
+
+    def test_company_research_is_cached_for_later_generations(self, monkeypatch, memory_company_cache):
+        research = {"company_name": "Acme", "products_mentioned": ["Acme Search"], "why_compelling": "Useful search"}
+        # The letter's own research was written with this user's resume in view - it must not be shared
+        letter_research = {"company_name": "Acme", "why_compelling": "Fits your 5 years at Initech"}
+        first = FakeClient(delays=[0, 0, 0], research=letter_research, shared_research=research)
+        run_variants(first, monkeypatch)
+        assert all('"company_research"' in prompt for prompt in first.prompts)
+        assert len(first.research_prompts) == 1
+        assert "Acme" in first.research_prompts[0]
+        assert RESUME not in first.research_prompts[0]
+
+        second = FakeClient(delays=[0, 0, 0], research={"company_name": "Regenerated"})
+        monkeypatch.setattr(cover_letters, "async_claude_client", second)
+        data = asyncio.run(cover_letters.generate_cover_letters("ACME, Inc.", "ML Engineer", JOB, RESUME))
+
+        assert data["company_research"] == research
+        assert "Acme Search" in second.calls[0][1][1]["text"]
+        assert not any('"company_research"' in prompt for prompt in second.prompts)
+        assert memory_company_cache.stats()["hits"] == 1
+
+    def test_only_public_research_fields_are_cached(self, memory_company_cache):
+        asyncio.run(memory_company_cache.put("Acme", {
+            "company_name": "Acme",
+            "products_mentioned": ["Acme Search"] * 20,
+            "why_compelling": "x" * 1000,
+            "candidate_fit": "Jane's PyTorch work",
+        }))
+        stored = asyncio.run(memory_company_cache.get("acme"))
+        assert set(stored) == {"company_name", "products_mentioned", "why_compelling"}
+        assert len(stored["products_mentioned"]) == company_cache_module.MAX_PRODUCTS
+        assert len(stored["why_compelling"]) == company_cache_module.MAX_FIELD_CHARS
+
+    def test_company_names_are_normalized(self):
+        assert normalize_company_name("OpenAI, Inc.") == "openai"
+        assert normalize_company_name("Zürich Labs GmbH") == "zurich labs"
+        assert normalize_company_name("Co") == "co"
+
+    def test_bad_json_is_rejected(self):
+        with pytest.raises(cover_letters.VariantError):
+            cover_letters.parse_variant("[1, 2]", cover_letters.VARIANTS[0])
+
+
+JOB_POSTING = """Acme AI is a Series B startup on a mission to make search useful.
+
+Senior Machine Learning Engineer
+
+What you'll do:
+- Build and deploy retrieval models with PyTorch
+- Own ML pipelines end to end on Kubernetes
+
+Requirements:
+- 5+ years of Python experience
+- Experience with PyTorch, SQL and AWS
+
+Nice to have:
+- Experience with LangChain
+"""
+
+# Boilerplate most postings carry - none of it belongs in the prompt
+BOILERPLATE = """
+Benefits:
+- Competitive salary and equity, private health, dental and vision insurance for you and your dependents
+- Flexible working hours, 30 days of paid holiday plus public holidays, and a generous learning budget
+- Monthly wellness stipend, home office setup allowance, and regular team offsites
+
+Acme AI is an equal opportunity employer. We celebrate diversity and are committed to creating an inclusive
+environment for all employees. All qualified applicants will receive consideration for employment without
+regard to race, colour, religion, gender, gender identity or expression, sexual orientation, national origin,
+genetics, disability, age, or veteran status. If you need an accommodation during the interview process,
+please let our recruiting team know and we will be happy to help.
+"""
+
+
+class TestJobDescriptionDistiller:
+    def test_distills_skills_responsibilities_and_signals(self):
+        from services.jd_distiller import distill_job_description
+        distilled = distill_job_description(JOB_POSTING, "Acme AI", "Senior ML Engineer")
+
+        assert {"PyTorch", "Kubernetes", "Python", "SQL", "AWS"} <= set(distilled["required_skills"])
+        assert distilled["nice_to_have_skills"] == ["LangChain"]
+        assert distilled["responsibilities"][0] == "Build and deploy retrieval models with PyTorch"
+        assert distilled["seniority"] == {"level": "senior", "years_required": 5}
+        assert "Series B" in distilled["company_signals"][0]
+
+    def test_prompt_carries_evidence_instead_of_raw_text(self):
+        from tests.test_resume_parser import SAMPLE_RESUME
+        job = JOB_POSTING + BOILERPLATE
+        system = cover_letters.build_system_prompt("Acme AI", "ML Engineer", job, SAMPLE_RESUME)
+        context = "\n\n".join(block["text"] for block in system[1:])
+
+        assert "Required skills / keywords:" in context
+        assert "- Developed RESTful APIs using Python and FastAPI" in context
+        assert "equal opportunity" not in context
+        assert len(context) < (len(job) + len(SAMPLE_RESUME)) / 2
+
+
+class TestJobAnalysisReuse:
+    def test_applicants_to_a_posting_share_one_analysis(self, monkeypatch):
+        from services.job_analysis import JobAnalysisStore
+        store = JobAnalysisStore(None, timedelta(days=1))
+        job = JOB_POSTING + BOILERPLATE
+
+        async def prompts():
+            first = await store.get("job-1", "Acme AI", "ML Engineer", job)
+            # Same posting with different whitespace is the same analysis
+            second = await store.get("job-1", "Acme AI", "ML Engineer", job.replace("\n", "\n\n"))
+            assert second is first
+            return [
+                cover_letters.build_system_prompt("Acme AI", "ML Engineer", job, resume, job_analysis=first)
+                for resume in (RESUME, "Data engineer with Spark and AWS experience building pipelines.")
+            ]
+
+        monkeypatch.setattr(cover_letters, "analyze_job", lambda *args: pytest.fail("JD analyzed again"))
+        monkeypatch.setattr(cover_letters, "CACHE_MIN_TOKENS", 1)
+        a, b = asyncio.run(prompts())
+
+        assert store.stats() == {"hits": 1, "computed": 1, "memory_entries": 1}
+        # Guidelines and job context are byte-identical across applicants; only the candidate block differs
+        assert a[:2] == b[:2] and a[2] != b[2]
+        assert a[1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_precomputed_job_skills_feed_the_match_analysis(self):
+        from services.job_analysis import analyze_job
+        analysis = analyze_job("Acme", "ML Engineer", JOB)
+        assert cover_letters.job_match_analysis(RESUME, "", analysis["job_skills"]) == \
+            cover_letters.job_match_analysis(RESUME, JOB)
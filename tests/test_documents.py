@@ -0,0 +1,465 @@
+"""
+Test in-memory document rendering for CV, cover letter and learning path exports
+Runs locally with FastAPI's TestClient, no server or database required
+"""
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from docx import Document  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from auth import get_current_user  # noqa: E402
+from config import DOWNLOADS_DIR  # noqa: E402
+from services import documents  # noqa: E402
+
+CV_TEXT = """JANE DOE
+jane@example.com | London
+
+PROFESSIONAL SUMMARY
+ML engineer with 5 years of experience.
+
+EXPERIENCE
+- Built a recommendation model serving 2M users
+- Cut inference latency by 35%
+"""
+
+PATH_DATA = {
+    "path_overview": {"duration_weeks": 2, "hours_per_week": 8},
+    "weeks": [
+        {"week": 1, "focus": "Python", "phase": "Foundations", "courses": [{"name": "Python 101", "platform": "Coursera"}]},
+        {"week": 2, "focus": "ML", "phase": "Core", "courses": [{"name": "ML Basics", "platform": "fast.ai"}]},
+    ],
+}
+
+
+class TestRenderers:
+    def test_pdfs(self):
+        for pdf in (
+            documents.render_cv_pdf(CV_TEXT),
+            documents.render_cover_letter_pdf("Dear team,\n\nI am applying."),
+            documents.render_learning_path_pdf(PATH_DATA, "ML Engineer"),
+        ):
+            assert pdf.startswith(b"%PDF")
+
+    def test_non_latin_text_embeds_a_font_subset(self):
+        from services.fonts import font_registry
+        if font_registry.resolve("Helvetica") == "Helvetica":
+            pytest.skip("No Unicode TrueType font installed")
+        latin = documents.render_cv_pdf(CV_TEXT)
+        unicode_cv = documents.render_cv_pdf(CV_TEXT.replace("JANE DOE", "Nguyễn Łukasz Дмитрий"))
+        # Only documents that need it embed a TrueType font, and only a subset of its glyphs
+        assert b"FontFile2" not in latin
+        assert b"FontFile2" in unicode_cv
+        assert len(unicode_cv) < len(latin) + 60_000
+
+    def test_docx(self):
+        doc = Document(io.BytesIO(documents.render_cv_docx(CV_TEXT)))
+        assert doc.paragraphs[0].text == "JANE DOE"
+        doc = Document(io.BytesIO(documents.render_learning_path_docx(PATH_DATA, "ML Engineer")))
+        assert "Week 2: ML" in [p.text for p in doc.paragraphs]
+
+
+def hang(kind, format, args):
+    """A render that never finishes - module level so process workers can unpickle it"""
+    import time
+    time.sleep(600)
+
+
+def hang_first_time(kind, format, args):
+    """Hangs unless the marker file args[0] exists, which the first call creates"""
+    import time
+    marker = Path(args[0])
+    if not marker.exists():
+        marker.touch()
+        time.sleep(600)
+    return b"%PDF-" + kind.encode()
+
+
+def make_cv_client():
+    from routes import cv
+
+    app = FastAPI()
+    app.include_router(cv.router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1", "name": "Jane"}
+    return TestClient(app)
+
+
+class TestDownloadResponse:
+    def test_direct_cv_download_is_streamed_from_memory(self):
+        before = set(DOWNLOADS_DIR.iterdir()) if DOWNLOADS_DIR.exists() else set()
+
+        response = make_cv_client().post(
+            "/api/cv/download-direct?format=docx", json={"cv_content": CV_TEXT}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(response.content))
+        assert response.headers["content-type"] == documents.MEDIA_TYPES["docx"]
+        assert "attachment; filename=cv_hybrid_" in response.headers["content-disposition"]
+        after = set(DOWNLOADS_DIR.iterdir()) if DOWNLOADS_DIR.exists() else set()
+        assert after == before
+
+
+class TestRenderCache:
+    def test_lru_is_bounded_by_bytes(self):
+        from services.render_cache import RenderCache
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        assert cache.get("a") == b"12345"  # a is now most recent
+        cache.put("c", b"123")
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c")
+        assert cache.stats()["bytes"] == 8
+
+    def test_disk_tier_survives_memory_eviction(self, tmp_path):
+        from services.render_cache import RenderCache
+        cache = RenderCache(max_bytes=1024, disk_dir=str(tmp_path))
+        cache.put("ab" * 32, b"pdf-bytes")
+        cache.clear()
+        assert cache.get("ab" * 32) == b"pdf-bytes"
+        assert cache.disk_hits == 1
+
+    def test_repeat_download_uses_etag(self):
+        from services.render_cache import render_cache
+        client = make_cv_client()
+        first = client.post("/api/cv/download-direct", json={"cv_content": CV_TEXT})
+        etag = first.headers["etag"]
+        hits = render_cache.hits
+
+        second = client.post("/api/cv/download-direct", json={"cv_content": CV_TEXT})
+        assert second.headers["etag"] == etag
+        assert second.content == first.content
+        assert render_cache.hits == hits + 1
+
+        not_modified = client.post(
+            "/api/cv/download-direct", json={"cv_content": CV_TEXT}, headers={"If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+
+        changed = client.post("/api/cv/download-direct", json={"cv_content": CV_TEXT + "Extra"})
+        assert changed.headers["etag"] != etag
+
+
+class TestRenderPool:
+    def test_renders_in_worker_process(self):
+        import asyncio
+        from services.render_pool import RenderPool
+        pool = RenderPool(workers=1, max_concurrency=2, timeout=30)
+        try:
+            from services.document_ast import build_ast
+            pdf = asyncio.run(pool.render("cv", "pdf", [build_ast("cv", CV_TEXT)["blocks"], "classic"]))
+        finally:
+            pool.shutdown()
+        assert pdf.startswith(b"%PDF")
+
+    def test_timeout(self):
+        import asyncio
+        from services.render_pool import RenderPool, RenderTimeout
+        from services.document_ast import build_ast
+        big_path = {"weeks": [{"week": i, "focus": "x", "courses": [{"name": "c", "platform": "p"}] * 20} for i in range(300)]}
+        blocks = build_ast("learning_path", big_path, "ML")["blocks"]
+        pool = RenderPool(workers=0, max_concurrency=1, timeout=0.001)
+        try:
+            with pytest.raises(RenderTimeout):
+                asyncio.run(pool.render("learning_path", "pdf", [blocks, "classic"]))
+        finally:
+            pool.shutdown()
+
+    def test_hung_thread_render_keeps_its_slot_until_it_returns(self, monkeypatch):
+        import asyncio
+        import threading
+        from services import render_pool as rp
+        release = threading.Event()
+        monkeypatch.setattr(rp, "_render", lambda kind, format, args: release.wait(10) and b"%PDF-late")
+        pool = rp.RenderPool(workers=0, max_concurrency=1, timeout=0.05)
+
+        async def scenario():
+            with pytest.raises(rp.RenderTimeout):
+                await pool.render("cv", "pdf", [])
+            # The hung render still occupies the only slot
+            with pytest.raises(rp.RenderTimeout, match="did not start"):
+                await pool.render("cv", "pdf", [])
+            release.set()
+            await asyncio.sleep(0.1)
+            pool.timeout = 5
+            return await pool.render("cv", "pdf", [])
+
+        try:
+            assert asyncio.run(scenario()) == b"%PDF-late"
+        finally:
+            release.set()
+            pool.shutdown()
+
+    def test_hung_process_render_is_killed(self, monkeypatch):
+        import asyncio
+        from services import render_pool as rp
+        from services.document_ast import build_ast
+        original = rp._render
+        monkeypatch.setattr(rp, "_render", hang)
+        pool = rp.RenderPool(workers=1, max_concurrency=1, timeout=1)
+
+        async def scenario():
+            with pytest.raises(rp.RenderTimeout):
+                await pool.render("cv", "pdf", [])
+            monkeypatch.setattr(rp, "_render", original)
+            pool.timeout = 30
+            return await pool.render("cv", "pdf", [build_ast("cv", CV_TEXT)["blocks"], "classic"])
+
+        try:
+            assert asyncio.run(scenario()).startswith(b"%PDF")
+        finally:
+            pool.shutdown()
+
+    def test_renders_in_a_recycled_pool_are_retried(self, monkeypatch, caplog, tmp_path):
+        import asyncio
+        from services import render_pool as rp
+        monkeypatch.setattr(rp, "_render", hang_first_time)
+        pool = rp.RenderPool(workers=2, max_concurrency=2, timeout=2)
+
+        async def scenario():
+            hung = asyncio.create_task(pool.render("hang", "pdf", [str(tmp_path / "hang")]))
+            await asyncio.sleep(0.5)
+            # Hangs on its first try too, so it is still running when the other render's pool is killed
+            healthy = asyncio.create_task(pool.render("cv", "pdf", [str(tmp_path / "cv")]))
+            with pytest.raises(rp.RenderTimeout):
+                await hung
+            return await healthy
+
+        try:
+            assert asyncio.run(scenario()) == b"%PDF-cv"
+        finally:
+            pool.shutdown(wait=False)
+        assert "Retrying cv pdf render" in caplog.text
+
+    def test_concurrent_requests_share_one_render(self, monkeypatch):
+        import asyncio
+        from services import render_cache as rc
+
+        calls = []
+
+        async def fake_render(kind, format, args):
+            calls.append(kind)
+            await asyncio.sleep(0.01)
+            return b"%PDF-shared"
+
+        monkeypatch.setattr(rc.render_pool, "render", fake_render)
+        rc.render_cache.clear()
+
+        async def download_many():
+            return await asyncio.gather(*[rc.render_cached("cover_letter", "pdf", "Dear team, unique") for _ in range(5)])
+
+        assert asyncio.run(download_many()) == [b"%PDF-shared"] * 5
+        assert calls == ["cover_letter"]
+
+    def test_first_requester_disconnecting_does_not_fail_the_others(self, monkeypatch):
+        import asyncio
+        from services import render_cache as rc
+
+        async def fake_render(kind, format, args):
+            await asyncio.sleep(0.05)
+            return b"%PDF-shared"
+
+        monkeypatch.setattr(rc.render_pool, "render", fake_render)
+        rc.render_cache.clear()
+
+        async def scenario():
+            first = asyncio.create_task(rc.render_cached("cover_letter", "pdf", "Dear team, disconnect"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(rc.render_cached("cover_letter", "pdf", "Dear team, disconnect"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second, first.cancelled()
+
+        assert asyncio.run(scenario()) == (b"%PDF-shared", True)
+
+
+class TestTemplates:
+    def test_parse_cv_blocks(self):
+        from services.document_templates import parse_cv
+        kinds = [b.kind for b in parse_cv(CV_TEXT)]
+        assert kinds[0] == "title"
+        assert kinds.count("heading") == 2
+        assert kinds.count("bullet") == 2
+
+    def test_every_template_renders(self):
+        from services.document_templates import TEMPLATES
+        for name in TEMPLATES:
+            assert documents.render_cv_pdf(CV_TEXT, name).startswith(b"%PDF")
+            assert documents.render_learning_path_docx(PATH_DATA, "ML Engineer", name)
+
+    def test_markup_characters_are_escaped(self):
+        pdf = documents.render_cv_pdf("JANE DOE\n- Led R&D on <5ms inference for <b> tags")
+        assert pdf.startswith(b"%PDF")
+
+    def test_templates_endpoint_and_validation(self):
+        client = make_cv_client()
+        listing = client.get("/api/cv/templates").json()
+        assert {"id": "classic", "label": "Classic"} in listing["templates"]
+        response = client.post("/api/cv/download-direct?template=nope", json={"cv_content": CV_TEXT})
+        assert response.status_code == 400
+
+
+class TestDocumentAst:
+    def test_ast_is_versioned_and_tied_to_source(self):
+        from services.document_ast import AST_VERSION, ast_is_current, build_ast
+        ast = build_ast("cv", CV_TEXT)
+        assert ast["version"] == AST_VERSION
+        assert ast["blocks"][0] == ["title", "JANE DOE"]
+        assert ast_is_current(ast, "cv", CV_TEXT)
+        assert not ast_is_current(ast, "cv", CV_TEXT + "more")
+        assert not ast_is_current({**ast, "version": AST_VERSION - 1}, "cv", CV_TEXT)
+
+    def test_all_formats_from_one_ast(self):
+        from services.document_ast import build_ast
+        blocks = build_ast("cv", CV_TEXT)["blocks"]
+        outputs = {fmt: documents.render_blocks("cv", fmt, blocks) for fmt in documents.EXPORT_FORMATS}
+        assert outputs["pdf"].startswith(b"%PDF")
+        assert outputs["docx"].startswith(b"PK")
+        text = outputs["txt"].decode()
+        assert text.startswith("JANE DOE\n") and "• Cut inference latency by 35%" in text
+        markdown = outputs["md"].decode()
+        assert markdown.startswith("# JANE DOE") and "## EXPERIENCE" in markdown
+
+    def test_markdown_escapes_special_characters(self):
+        md = documents.render_document("cv", "md", "JANE DOE\n- Built *fast* C# <services>").decode()
+        assert r"- Built \*fast\* C\# \<services\>" in md
+
+    def test_direct_markdown_download(self):
+        response = make_cv_client().post("/api/cv/download-direct?format=md", json={"cv_content": CV_TEXT})
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert "attachment; filename=cv_hybrid_" in response.headers["content-disposition"]
+        assert response.headers["content-disposition"].endswith(".md")
+
+
+class _Cursor:
+    def __init__(self, records):
+        self.records = records
+
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.records)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self, records):
+        self.records = records
+
+    def find(self, query, projection=None):
+        return _Cursor([r for r in self.records if r["user_id"] == query["user_id"]])
+
+
+class TestUserExport:
+    def collect(self, db, **kwargs):
+        import asyncio
+        import zipfile
+        from services import document_export
+        from services.render_pool import RenderPool
+
+        async def run():
+            return [chunk async for chunk in document_export.export_archive(db, "user-1", **kwargs)]
+
+        # Threads instead of processes so the test doesn't pay for worker start-up
+        pool = RenderPool(workers=0, max_concurrency=2, timeout=30)
+        original, document_export.render_pool = document_export.render_pool, pool
+        try:
+            chunks = asyncio.run(run())
+        finally:
+            document_export.render_pool = original
+            pool.shutdown()
+        return chunks, zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def test_streams_every_document(self):
+        db = {
+            "cv_generations": _Collection([{
+                "id": "cv-1", "user_id": "user-1", "target_role": "ML Engineer", "created_at": "2024-05-01T10:00:00",
+                "versions": [{"type": "hybrid", "content": CV_TEXT}, {"type": "ats", "content": CV_TEXT}],
+            }, {"id": "cv-2", "user_id": "someone-else", "versions": [{"type": "ats", "content": CV_TEXT}]}]),
+            "cover_letters": _Collection([{
+                "id": "cl-1", "user_id": "user-1", "company_name": "Acme", "target_role": "ML Engineer",
+                "versions": [{"cover_letter": "Dear team,\n\nHello."}],
+            }]),
+            "learning_paths": _Collection([{
+                "id": "lp-1", "user_id": "user-1", "target_role": "ML Engineer", "path_data": PATH_DATA,
+            }]),
+        }
+        chunks, archive = self.collect(db, format="md")
+        names = archive.namelist()
+        assert len(names) == 4
+        assert "cvs/2024-05-01_ml_engineer_hybrid_cv-1.md" in names
+        assert any(n.startswith("cover_letters/undated_acme_ml_engineer_v1") for n in names)
+        assert archive.read("learning_paths/undated_ml_engineer_lp-1.md").startswith(b"# Learning Path")
+        # One chunk per document plus the central directory - nothing is buffered until the end
+        assert len(chunks) == 5
+
+    def test_empty_account(self):
+        db = {name: _Collection([]) for name in ("cv_generations", "cover_letters", "learning_paths")}
+        _, archive = self.collect(db)
+        assert archive.namelist() == ["README.txt"]
+
+
+class TestObjectStorage:
+    def test_downloads_redirect_to_signed_local_urls(self, tmp_path, monkeypatch):
+        from routes import cv, files
+        from services import storage as storage_module
+        from services.storage import LocalStorage
+
+        backend = LocalStorage(str(tmp_path), "secret")
+        monkeypatch.setattr(storage_module, "storage", backend)
+        app = FastAPI()
+        app.include_router(cv.router, prefix="/api")
+        app.include_router(files.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: {"id": "user-1", "name": "Jane"}
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/cv/download-direct?format=md", json={"cv_content": CV_TEXT}, follow_redirects=False
+        )
+        assert response.status_code == 303
+        location = response.headers["location"]
+        assert location.startswith("/api/files/documents/") and "signature=" in location
+        assert len(list(tmp_path.rglob("*.md"))) == 1
+
+        download = client.get(location)
+        assert download.status_code == 200
+        assert download.content.startswith(b"# JANE DOE")
+        assert "filename=" in download.headers["content-disposition"]
+
+        assert client.get(location.replace("signature=", "signature=0")).status_code == 403
+
+    def test_expired_signature_is_rejected(self, tmp_path):
+        from services.storage import LocalStorage, StorageError
+        backend = LocalStorage(str(tmp_path), "secret")
+        signature = backend.signature("documents/a.pdf", "cv.pdf", 1)
+        assert not backend.verify("documents/a.pdf", "cv.pdf", 1, signature)
+        with pytest.raises(StorageError):
+            backend.path("../outside.pdf")
+
+    def test_local_storage_needs_its_own_signing_secret(self, tmp_path, monkeypatch):
+        from services import storage as storage_module
+        monkeypatch.setattr(storage_module, "STORAGE_BACKEND", "local")
+        monkeypatch.setattr(storage_module, "STORAGE_LOCAL_DIR", str(tmp_path))
+        monkeypatch.setattr(storage_module, "STORAGE_SIGNING_SECRET", "")
+        assert storage_module.create_storage() is None
+        monkeypatch.setattr(storage_module, "STORAGE_SIGNING_SECRET", "storage-secret")
+        assert isinstance(storage_module.create_storage(), storage_module.LocalStorage)
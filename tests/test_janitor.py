@@ -0,0 +1,51 @@
+"""
+Test DOWNLOADS_DIR retention - age and size eviction and the startup orphan sweep
+Runs locally on a temporary directory, no server or database required
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.janitor import DownloadsJanitor  # noqa: E402
+
+NOW = time.time()
+
+
+def make_file(directory: Path, name: str, size: int, age_seconds: float) -> Path:
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age_seconds, NOW - age_seconds))
+    return path
+
+
+class TestDownloadsJanitor:
+    def test_evicts_expired_then_oldest_over_quota(self, tmp_path):
+        expired = make_file(tmp_path, "cv_ats_1.pdf", 100, age_seconds=7200)
+        oldest = make_file(tmp_path, "cover_letter_2.docx", 100, age_seconds=1800)
+        newer = make_file(tmp_path, "learning_path_3.pdf", 100, age_seconds=60)
+        unrelated = make_file(tmp_path, "keep.txt", 500, age_seconds=7200)
+
+        janitor = DownloadsJanitor(tmp_path, max_age_seconds=3600, max_bytes=150, interval_seconds=60)
+        assert janitor.sweep(now=NOW) == {"files_removed": 2, "bytes_removed": 200}
+
+        assert not expired.exists() and not oldest.exists()
+        assert newer.exists() and unrelated.exists()
+        stats = janitor.stats()
+        assert (stats["files"], stats["bytes"], stats["runs"]) == (1, 100, 1)
+
+    def test_startup_sweep_spares_files_in_grace_period(self, tmp_path):
+        orphan = make_file(tmp_path, "cv_hybrid_1.docx", 10, age_seconds=3600)
+        fresh = make_file(tmp_path, "cv_hybrid_2.docx", 10, age_seconds=5)
+
+        janitor = DownloadsJanitor(tmp_path, max_age_seconds=86400, max_bytes=10 ** 9, interval_seconds=60)
+        assert janitor.sweep_orphans(now=NOW)["files_removed"] == 1
+        assert not orphan.exists() and fresh.exists()
+
+    def test_missing_directory_is_a_no_op(self, tmp_path):
+        janitor = DownloadsJanitor(tmp_path / "missing", max_age_seconds=1, max_bytes=1, interval_seconds=60)
+        assert janitor.sweep() == {"files_removed": 0, "bytes_removed": 0}
@@ -0,0 +1,414 @@
+"""
+Test precomputed learning path skeletons, the per-request overlay and progress updates
+Runs locally, no server or database required
+"""
+import asyncio
+import copy
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from data.courses_database import ROLE_LEARNING_PATHS  # noqa: E402
+from services import learning_paths  # noqa: E402
+
+
+def render(role_id, budget="free", hours=10):
+    skeleton = learning_paths.get_skeleton(role_id, budget)
+    return learning_paths.render_learning_path(skeleton, "ML Engineer", role_id, "beginner", hours, budget)
+
+
+class TestLearningPathSkeletons:
+    def test_every_role_and_budget_class_is_precomputed(self):
+        assert len(learning_paths.SKELETONS) == 2 * (len(ROLE_LEARNING_PATHS) + 1)
+
+    def test_skeletons_are_frozen_and_shared(self):
+        skeleton = learning_paths.get_skeleton("ml_engineer", "free")
+        with pytest.raises(TypeError):
+            skeleton[0]["theme"] = "changed"
+        a, b = render("ml_engineer", hours=5), render("ml_engineer", hours=20)
+        assert a["weeks"][0]["courses"] is b["weeks"][0]["courses"]
+        assert a["weeks"][0]["hours"] == 5 and b["weeks"][0]["hours"] == 20
+        assert b["path_overview"]["total_hours"] == 20 * len(skeleton)
+
+    def test_budget_only_changes_optional_paid_courses(self):
+        free = [c for w in render("ml_engineer", "free")["weeks"] for c in w["courses"]]
+        paid = [c for w in render("ml_engineer", "premium")["weeks"] for c in w["courses"]]
+        assert [c["id"] for c in free] == [c["id"] for c in paid]
+        assert all(c["is_optional"] == (c["cost_type"] == "paid") for c in free)
+        assert not any(c["is_optional"] for c in paid)
+
+    def test_unknown_roles_use_the_fallback_filtered_by_budget(self):
+        path = render("not_a_role", "free")
+        assert path["weeks"][0]["theme"] == "Python Foundations"
+        assert all(w["courses"][0]["cost_type"] in ("free", "freemium") for w in path["weeks"])
+        assert len(render("not_a_role", "premium")["weeks"]) >= len(path["weeks"])
+
+    def test_rendered_path_serializes_to_plain_json(self):
+        data = jsonable_encoder(render("ml_engineer"))
+        assert isinstance(data["weeks"][0]["courses"], list)
+        assert isinstance(data["fast_track"]["courses"][0], dict)
+
+
+class TestSkillPlanning:
+    def plan(self, skills, role_id="ml_engineer"):
+        skeleton = learning_paths.get_skeleton(role_id, "free")
+        week_plan = learning_paths.plan_weeks(skeleton, skills)
+        return learning_paths.render_learning_path(skeleton, "ML Engineer", role_id, "beginner", 10, "free",
+                                                   week_plan=week_plan)
+
+    def test_skill_masks_use_the_taxonomy(self):
+        from services.skill_bitsets import mask_skills, prerequisites_mask, skills_mask
+        mask = skills_mask(["pytorch", "Python basics", "Creativity"])
+        assert mask_skills(mask) == ["Python", "PyTorch"]
+        assert mask_skills(prerequisites_mask(skills_mask(["PyTorch"]))) == ["Python", "Deep Learning"]
+
+    def test_no_known_skills_leaves_the_path_unchanged(self):
+        skeleton = learning_paths.get_skeleton("ml_engineer", "free")
+        assert learning_paths.plan_weeks(skeleton, []) is None
+        assert learning_paths.plan_weeks(skeleton, ["Creativity"]) is None
+        assert jsonable_encoder(self.plan([])) == jsonable_encoder(render("ml_engineer"))
+
+    def test_covered_weeks_are_skipped_and_the_rest_renumbered(self):
+        path = self.plan(["Python"])
+        themes = [w["theme"] for w in path["weeks"]]
+        assert "Python Foundations" not in themes
+        assert path["path_overview"]["skipped_weeks"] == ["Python Foundations"]
+        assert [w["week"] for w in path["weeks"]] == list(range(1, len(themes) + 1))
+        assert path["weeks"][0]["project"]["name"] == f"Week 1: {themes[0]} Project"
+        assert path["path_overview"]["duration_weeks"] == len(themes)
+
+    def test_weeks_follow_the_weeks_teaching_their_prerequisites(self):
+        themes = [w["theme"] for w in self.plan(["Python"])["weeks"]]
+        # Math for ML builds on statistics, which the curriculum only covers the week after
+        assert themes.index("Statistics") < themes.index("Math for ML")
+        assert themes.index("ML Fundamentals") < themes.index("PyTorch")
+
+    def test_mostly_covered_weeks_are_compressed(self):
+        path = self.plan(["Python", "Machine Learning"])
+        week = next(w for w in path["weeks"] if w["theme"] == "Math for ML")
+        assert week["compressed"] and week["hours"] == 5
+        assert path["path_overview"]["total_hours"] == sum(w["hours"] for w in path["weeks"])
+
+    def test_stored_plans_resolve_to_the_same_path(self):
+        skeleton = learning_paths.get_skeleton("ml_engineer", "free")
+        overrides = {"target_role_name": "ML Engineer", "target_role_id": "ml_engineer",
+                     "experience_level": "beginner", "hours_per_week": 10, "budget": "free",
+                     "week_plan": learning_paths.plan_weeks(skeleton, ["Python", "SQL"])}
+        doc = {"path_template": learning_paths.template_ref("ml_engineer", "free"), "path_overrides": overrides}
+        resolved = asyncio.run(learning_paths.LearningPathTemplates(None).resolve(doc))
+        assert jsonable_encoder(resolved["path_data"]) == jsonable_encoder(self.plan(["Python", "SQL"]))
+
+
+def evaluate(expr, doc, variables):
+    """Just enough of MongoDB's aggregation expressions to run the progress pipelines"""
+    def lookup(value, path):
+        for part in filter(None, path.split(".")):
+            if not isinstance(value, dict) or part not in value:
+                return None
+            value = value[part]
+        return value
+
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, _, path = expr[2:].partition(".")
+        return lookup(variables[name], path)
+    if isinstance(expr, str) and expr.startswith("$"):
+        return lookup(doc, expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc, variables) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) != 1 or not next(iter(expr)).startswith("$"):
+        return {k: evaluate(v, doc, variables) for k, v in expr.items()}
+
+    (op, arg), = expr.items()
+
+    def ev(e, **extra):
+        return evaluate(e, doc, {**variables, **extra})
+
+    if op == "$literal":
+        return arg
+    if op == "$ifNull":
+        value = ev(arg[0])
+        return ev(arg[1]) if value is None else value
+    if op == "$cond":
+        return ev(arg[1]) if ev(arg[0]) else ev(arg[2])
+    if op == "$eq":
+        a, b = ev(arg[0]), ev(arg[1])
+        return type(a) is type(b) and a == b
+    if op == "$filter":
+        return [x for x in ev(arg["input"]) if ev(arg["cond"], this=x)]
+    if op == "$map":
+        return [ev(arg["in"], this=x) for x in ev(arg["input"])]
+    if op == "$reduce":
+        value = ev(arg["initialValue"])
+        for x in ev(arg["input"]):
+            value = ev(arg["in"], this=x, value=value)
+        return value
+    operators = {
+        "$add": lambda a: sum(a), "$sum": sum, "$gt": lambda a: a[0] > a[1], "$gte": lambda a: a[0] >= a[1],
+        "$and": all, "$size": len,
+        "$multiply": lambda a: a[0] * a[1], "$divide": lambda a: a[0] / a[1],
+        "$round": lambda a: round(a[0], a[1]), "$toInt": int,
+        "$objectToArray": lambda d: [{"k": k, "v": v} for k, v in d.items()],
+    }
+    return operators[op](ev(arg))
+
+
+class _ProgressCollection:
+    """learning_paths stand-in that applies update pipelines like MongoDB does"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = []
+
+    async def find_one(self, query, projection=None):
+        return self._matches(query) and {"_id": 1}
+
+    def _matches(self, query):
+        query = dict(query)
+        expr = query.pop("$expr", True)
+        return query == {"id": self.doc["id"], "user_id": self.doc["user_id"]} and evaluate(expr, self.doc, {})
+
+    async def find_one_and_update(self, query, pipeline, projection=None, return_document=None):
+        self.calls.append((query, projection))
+        if not self._matches(query):
+            return None
+        for stage in pipeline:
+            (name, fields), = stage.items()
+            assert name == "$set"
+            updated = copy.deepcopy(self.doc)
+            for field, expr in fields.items():
+                *parents, last = field.split(".")
+                target = updated
+                for part in parents:
+                    target = target.setdefault(part, {})
+                target[last] = evaluate(expr, self.doc, {})
+            self.doc = updated
+        return {k: copy.deepcopy(v) for k, v in self.doc.items() if projection.get(k)}
+
+
+def learning_path(**fields):
+    path_data = jsonable_encoder(render("ml_engineer"))  # as stored in MongoDB
+    return {"id": "lp-1", "user_id": "user-1", "path_data": path_data, "overall_progress": 0,
+            "week_progress": {}, "course_progress": {}, **fields}
+
+
+class TestProgressUpdates:
+    def click(self, monkeypatch, collection, week, index, completed, notes=None):
+        from routes import learning
+        monkeypatch.setattr(learning, "db", SimpleNamespace(learning_paths=collection))
+        update = learning.CourseProgressUpdate(week=week, course_index=index, completed=completed, notes=notes)
+        return asyncio.run(learning.update_course_progress("lp-1", update, user={"id": "user-1"}))
+
+    def test_each_click_is_one_targeted_write(self, monkeypatch):
+        from services.learning_progress import progress_counters
+        doc = learning_path()
+        doc.update(progress_counters(doc["path_data"]))
+        collection = _ProgressCollection(doc)
+        total = doc["total_courses"]
+
+        self.click(monkeypatch, collection, 1, 0, True)
+        self.click(monkeypatch, collection, 2, 0, True)
+        self.click(monkeypatch, collection, 2, 0, True)  # a repeated click isn't counted twice
+        result = self.click(monkeypatch, collection, 1, 0, False)
+
+        assert set(result["course_progress"]) == {"1", "2"}
+        assert collection.doc["completed_courses"] == 1
+        assert result["overall_progress"] == round(100 / total)
+        assert all("path_data" not in projection for _, projection in collection.calls)
+
+    def test_legacy_paths_get_counters_backfilled(self, monkeypatch):
+        doc = learning_path(course_progress={"1": {"0": {"completed": True}, "1": {"completed": False}}})
+        collection = _ProgressCollection(doc)
+
+        result = self.click(monkeypatch, collection, 3, 0, True)
+
+        total = sum(len(w["courses"]) for w in doc["path_data"]["weeks"])
+        assert collection.doc["total_courses"] == total
+        assert collection.doc["completed_courses"] == 2
+        assert result["overall_progress"] == round(200 / total)
+
+    def test_courses_and_weeks_outside_the_path_are_rejected(self, monkeypatch):
+        from fastapi import HTTPException
+        from routes import learning
+        from services.learning_progress import progress_counters
+        doc = learning_path()
+        doc.update(progress_counters(doc["path_data"]))
+        for stored in (doc, learning_path()):  # stored counts, and legacy paths without them
+            collection = _ProgressCollection(copy.deepcopy(stored))
+            courses = len(stored["path_data"]["weeks"][0]["courses"])
+            self.click(monkeypatch, collection, 1, courses - 1, True)
+            for week, index in ((1, courses), (99, 0)):
+                with pytest.raises(HTTPException) as error:
+                    self.click(monkeypatch, collection, week, index, True)
+                assert error.value.status_code == 400
+            with pytest.raises(HTTPException) as error:
+                update = learning.WeekProgressUpdate(week=len(stored["path_data"]["weeks"]) + 1, completed=True)
+                asyncio.run(learning.update_week_progress("lp-1", update, user={"id": "user-1"}))
+            assert error.value.status_code == 400
+            assert list(collection.doc["course_progress"]) == ["1"]
+            assert collection.doc["overall_progress"] <= 100
+
+    def test_notes_are_stored_literally_and_other_users_get_404(self, monkeypatch):
+        from fastapi import HTTPException
+        collection = _ProgressCollection(learning_path())
+        result = self.click(monkeypatch, collection, 1, 0, True, notes="$path_data")
+        assert result["course_progress"]["1"]["0"]["notes"] == "$path_data"
+
+        collection.doc["user_id"] = "someone-else"
+        with pytest.raises(HTTPException) as error:
+            self.click(monkeypatch, collection, 1, 0, True)
+        assert error.value.status_code == 404
+
+
+# The evaluator above is only as right as our reading of MongoDB - this runs the same pipelines on a real server
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="set MONGO_TEST_URL to run the progress pipelines on MongoDB")
+class TestProgressPipelinesOnMongoDB:
+    @pytest.fixture
+    def collection(self):
+        from pymongo import MongoClient
+        client = MongoClient(MONGO_TEST_URL, serverSelectionTimeoutMS=2000)
+        collection = client.get_database("test_learning_progress").learning_paths
+        collection.drop()
+        yield collection
+        collection.drop()
+        client.close()
+
+    @pytest.mark.parametrize("counters", [True, False], ids=["stored", "legacy"])
+    def test_pipelines_match_the_evaluator(self, collection, counters):
+        from pymongo import ReturnDocument
+        from services.learning_progress import (
+            COURSE_PROGRESS_PROJECTION, course_progress_filter, course_progress_update, progress_counters,
+        )
+        doc = learning_path(course_progress={"1": {"1": {"completed": True}}})
+        if counters:
+            doc.update(progress_counters(doc["path_data"]), completed_courses=1)
+        collection.insert_one(copy.deepcopy(doc))
+        expected = _ProgressCollection(doc)
+
+        courses = len(doc["path_data"]["weeks"][0]["courses"])
+        clicks = [(1, 0, True, "$path_data"), (2, 0, True, None), (2, 0, True, None), (1, 1, False, None),
+                  (1, courses, True, None), (99, 0, True, None)]
+        for week, index, completed, notes in clicks:
+            query = course_progress_filter({"id": "lp-1", "user_id": "user-1"}, week, index)
+            pipeline = course_progress_update(week, index, completed, notes)
+            result = collection.find_one_and_update(query, pipeline, projection=COURSE_PROGRESS_PROJECTION,
+                                                    return_document=ReturnDocument.AFTER)
+            assert result == asyncio.run(expected.find_one_and_update(query, pipeline, COURSE_PROGRESS_PROJECTION))
+
+        stored = collection.find_one({"id": "lp-1"}, {"_id": 0})
+        for field in ("total_courses", "completed_courses", "overall_progress"):
+            assert stored[field] == expected.doc[field]
+        assert stored["course_progress"]["1"]["0"]["notes"] == "$path_data"
+        assert set(stored["course_progress"]) == {"1", "2"}
+
+
+class _TemplateCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault((query["id"], query["version"]), update["$setOnInsert"])
+
+    async def find_one(self, query, projection=None):
+        return copy.deepcopy(self.docs.get((query["id"], query["version"])))
+
+
+class TestTemplateStorage:
+    OVERRIDES = {"target_role_name": "ML Engineer", "target_role_id": "ml_engineer", "experience_level": "beginner",
+                 "hours_per_week": 8, "budget": "free", "current_role": "Analyst"}
+
+    def test_documents_store_a_reference_that_resolves_to_the_full_path(self):
+        import bson
+        templates = learning_paths.LearningPathTemplates(None)
+        ref = learning_paths.template_ref("ml_engineer", "free")
+        doc = {"id": "lp-1", "path_template": ref, "path_overrides": self.OVERRIDES}
+
+        resolved = asyncio.run(templates.resolve(doc))
+
+        expected = learning_paths.render_learning_path(learning_paths.get_skeleton("ml_engineer", "free"),
+                                                       **self.OVERRIDES)
+        assert jsonable_encoder(resolved["path_data"]) == jsonable_encoder(expected)
+        assert "path_template" not in resolved
+        full = bson.encode({"path_data": jsonable_encoder(expected)})
+        assert len(bson.encode(doc)) * 20 < len(full)
+
+    def test_unknown_roles_reference_the_fallback_template(self):
+        assert learning_paths.template_ref("not_a_role", "premium")["id"] == "_fallback:any"
+
+    def test_older_versions_are_read_back_after_the_catalog_changes(self):
+        collection = _TemplateCollection()
+        ref = learning_paths.template_ref("ml_engineer", "free")
+        asyncio.run(learning_paths.LearningPathTemplates(collection).ensure_stored(ref))
+        # Simulate a catalog edit: the stored version is no longer the current skeleton
+        stored = collection.docs.pop((ref["id"], ref["version"]))
+        stored["weeks"][0]["theme"] = "Old theme"
+        collection.docs[(ref["id"], "old")] = stored
+
+        templates = learning_paths.LearningPathTemplates(collection)
+        doc = {"path_template": {"id": ref["id"], "version": "old"}, "path_overrides": self.OVERRIDES}
+        resolved = asyncio.run(templates.resolve(doc))
+
+        assert resolved["path_data"]["weeks"][0]["theme"] == "Old theme"
+        assert resolved["path_data"]["weeks"][0]["hours"] == 8
+
+    def generate(self, monkeypatch, role_path=None):
+        from data import courses_database
+        from routes import learning
+
+        class Collection:
+            def __init__(self):
+                self.inserted = []
+
+            async def find_one(self, query, projection=None):
+                return {"learning_paths_used": 0}
+
+            async def update_one(self, query, update, upsert=False):
+                pass
+
+            async def insert_one(self, doc):
+                self.inserted.append(doc)
+
+        db = SimpleNamespace(usage=Collection(), learning_paths=Collection())
+        templates = learning_paths.LearningPathTemplates(_TemplateCollection())
+        monkeypatch.setattr(learning, "db", db)
+        monkeypatch.setattr(learning, "learning_path_templates", templates)
+        if role_path is not None:
+            monkeypatch.setattr(courses_database, "get_role_path", lambda role_id: role_path)
+        request = learning.LearningPathRequest(target_role_id="ml_engineer", current_skills=["Python", "SQL"])
+        response = asyncio.run(learning.generate_learning_path_standalone(request, user={"id": "user-1"}))
+        return response, db.learning_paths.inserted[0], templates
+
+    def test_generated_paths_store_the_skeleton_they_were_built_from(self, monkeypatch):
+        response, doc, templates = self.generate(monkeypatch)
+
+        assert doc["path_template"] == learning_paths.template_ref("ml_engineer", "free")
+        assert doc["path_template"]["id"] in {key[0] for key in templates.collection.docs}
+        resolved = asyncio.run(templates.resolve(doc))
+        assert jsonable_encoder(resolved["path_data"]) == jsonable_encoder(response["path_data"])
+
+    def test_curricula_without_a_template_store_the_whole_path(self, monkeypatch):
+        custom = copy.deepcopy(ROLE_LEARNING_PATHS["ml_engineer"])
+        response, doc, templates = self.generate(monkeypatch, role_path=custom)
+
+        import bson
+        assert "path_template" not in doc and not templates.collection.docs
+        bson.encode(doc)  # stored as plain dicts and lists
+        assert doc["path_data"] == jsonable_encoder(response["path_data"])
+        assert asyncio.run(templates.resolve(doc)) is doc
+
+    def test_legacy_documents_with_path_data_are_unchanged(self):
+        doc = {"id": "lp-1", "path_data": {"weeks": []}}
+        assert asyncio.run(learning_paths.LearningPathTemplates(None).resolve(doc)) is doc
@@ -0,0 +1,33 @@
+"""
+Smoke test for the rendering benchmark suite (backend/benchmarks/rendering.py)
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from benchmarks import rendering  # noqa: E402
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(n) for n in range(1, 101)]
+    assert rendering.percentile(samples, 50) == 50
+    assert rendering.percentile(samples, 99) == 99
+    assert rendering.percentile([7.0], 99) == 7
+
+
+def test_writes_comparable_json(tmp_path):
+    output = tmp_path / "bench.json"
+    args = ["--kinds", "cv", "--formats", "pdf", "md", "--sizes", "small", "--iterations", "2", "--output", str(output)]
+    assert rendering.main(args) == 0
+
+    report = json.loads(output.read_text())
+    assert [(r["kind"], r["format"], r["size"]) for r in report["results"]] == [("cv", "pdf", "small"), ("cv", "md", "small")]
+    result = report["results"][0]
+    assert result["output_bytes"] > 0 and result["peak_alloc_bytes"] > 0
+    assert result["latency_ms"]["p50"] <= result["latency_ms"]["max"]
+    assert len(rendering.compare(report, report)) == 2
@@ -0,0 +1,132 @@
+"""
+Test bulk resume ingestion - zip expansion and the NDJSON batch endpoint
+Runs locally with FastAPI's TestClient, no server or database required
+"""
+import io
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from auth import get_current_user  # noqa: E402
+from routes import resume  # noqa: E402
+
+RESUME_TEXT = b"""Jane Doe
+EXPERIENCE
+Data Scientist | Acme | Jan 2020 - Dec 2022
+- Built churn models in Python and PyTorch
+SKILLS
+Python, SQL, PyTorch
+"""
+
+
+def make_zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(resume.router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: {"id": "coach-1"}
+    return TestClient(app)
+
+
+class TestExpandUploads:
+    def test_zip_entries_are_flattened(self):
+        archive = make_zip({
+            "cohort/a.txt": RESUME_TEXT,
+            "cohort/photo.png": b"\x89PNG",
+            "__MACOSX/cohort/._a.txt": b"junk",
+        })
+        items = resume.expand_batch_uploads([("cohort.zip", archive), ("b.txt", RESUME_TEXT)])
+        names = [(name, error) for name, _, error in items]
+        assert names == [
+            ("cohort/a.txt", None),
+            ("cohort/photo.png", "Unsupported file type"),
+            ("b.txt", None),
+        ]
+
+    def test_bad_zip_is_reported(self):
+        items = resume.expand_batch_uploads([("broken.zip", b"not a zip")])
+        assert items == [("broken.zip", None, "Invalid zip archive")]
+
+    def test_entry_count_is_checked_before_reading(self, monkeypatch):
+        monkeypatch.setattr(resume, "RESUME_BATCH_MAX_FILES", 3)
+        archive = make_zip({f"cohort/{i}.txt": RESUME_TEXT for i in range(4)})
+        monkeypatch.setattr(zipfile.ZipFile, "open", lambda *args: pytest.fail("entry was read"))
+        with pytest.raises(resume.BatchTooLarge):
+            resume.expand_batch_uploads([("cohort.zip", archive)])
+
+    def test_uncompressed_size_is_capped(self, monkeypatch):
+        monkeypatch.setattr(resume, "RESUME_BATCH_MAX_FILE_BYTES", 1024 * 1024)
+        monkeypatch.setattr(resume, "RESUME_BATCH_MAX_TOTAL_BYTES", 2 * 1024 * 1024)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("huge.txt", b"\0" * (5 * 1024 * 1024))
+            for i in range(3):
+                archive.writestr(f"{i}.txt", b"\0" * (900 * 1024))
+        assert len(buffer.getvalue()) < 64 * 1024
+
+        reads = []
+        original = zipfile.ZipFile.open
+        monkeypatch.setattr(zipfile.ZipFile, "open", lambda self, info: reads.append(info.filename) or original(self, info))
+        with pytest.raises(resume.BatchTooLarge):
+            resume.expand_batch_uploads([("bomb.zip", buffer.getvalue())])
+        # The oversized entry is never decompressed and reading stops at the cap
+        assert reads == ["0.txt", "1.txt", "2.txt"]
+
+    def test_entry_reads_stop_at_the_limit_not_the_header(self):
+        archive = make_zip({"big.txt": b"\0" * (300 * 1024)})
+        with zipfile.ZipFile(io.BytesIO(archive)) as opened:
+            assert resume.read_zip_entry(opened, opened.infolist()[0], 100 * 1024) is None
+            assert len(resume.read_zip_entry(opened, opened.infolist()[0], 300 * 1024)) == 300 * 1024
+
+        # A header that understates the size is reported, not trusted
+        understated = archive.replace((300 * 1024).to_bytes(4, "little"), (1024).to_bytes(4, "little"))
+        assert understated != archive
+        items = resume.expand_batch_uploads([("lying.zip", understated)])
+        assert [(name, data) for name, data, _ in items] == [("big.txt", None)]
+
+
+class TestBatchEndpoint:
+    def test_streams_one_line_per_file_then_summary(self):
+        client = make_client()
+        response = client.post("/api/resume/parse-batch", files=[
+            ("files", ("one.txt", RESUME_TEXT, "text/plain")),
+            ("files", ("two.txt", RESUME_TEXT, "text/plain")),
+            ("files", ("empty.txt", b"   ", "text/plain")),
+        ])
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        results, summary = lines[:-1], lines[-1]
+        assert sorted(r["index"] for r in results) == [0, 1, 2]
+        ok = [r for r in results if r["status"] == "ok"]
+        assert len(ok) == 2
+        assert ok[0]["current_role"] == "Data Scientist"
+        assert "PyTorch" in ok[0]["extracted_skills"]
+        assert summary == {"done": True, "total": 3, "succeeded": 2, "failed": 1}
+
+    def test_rejects_oversized_batch(self, monkeypatch):
+        monkeypatch.setattr(resume, "RESUME_BATCH_MAX_FILES", 1)
+        client = make_client()
+        response = client.post("/api/resume/parse-batch", files=[
+            ("files", ("one.txt", RESUME_TEXT, "text/plain")),
+            ("files", ("two.txt", RESUME_TEXT, "text/plain")),
+        ])
+        assert response.status_code == 400
@@ -0,0 +1,195 @@
+"""
+Test structured resume parsing - sections, experience entries and total years
+Runs locally against backend/services and server.py with a fake client, no server required
+"""
+import asyncio
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.resume_parser import (  # noqa: E402
+    parse_resume_structured,
+    parse_date_range,
+    split_sections,
+    total_experience_years,
+    format_resume_summary,
+)
+from services.skill_matcher import extract_skills, label_to_skills, split_labels  # noqa: E402
+
+TODAY = date(2025, 1, 15)
+
+SAMPLE_RESUME = """
+John Smith
+john.smith@email.com | (415) 555-1234 | San Francisco, CA
+
+PROFESSIONAL SUMMARY
+Senior Software Engineer with 6 years of experience building scalable backend systems.
+
+EXPERIENCE
+
+Senior Software Engineer | TechCorp Inc | San Francisco, CA
+January 2021 - Present
+- Built automated documentation system using OpenAI GPT API
+- Led backend architecture for platform serving 200K+ users
+
+Software Engineer | StartupXYZ | San Jose, CA
+June 2018 - December 2020
+- Developed RESTful APIs using Python and FastAPI
+- Reduced API latency by 40%
+
+EDUCATION
+Bachelor of Science in Computer Science
+Stanford University | Graduated 2018
+
+SKILLS
+Python, JavaScript, SQL, AWS, Docker, Kubernetes, FastAPI
+Machine Learning, TensorFlow, PyTorch, LLM, Prompt Engineering, RAG
+
+CERTIFICATIONS
+AWS Certified Machine Learning - Specialty
+"""
+
+
+class TestSections:
+    def test_split_sections(self):
+        """Headings split the resume into canonical sections"""
+        sections = split_sections(SAMPLE_RESUME)
+        for name in ["header", "summary", "experience", "education", "skills", "certifications"]:
+            assert name in sections, f"missing section {name}"
+        assert "John Smith" in sections["header"]
+
+    def test_heading_variants(self):
+        """Common heading spellings map to the same section"""
+        text = "Work History:\nEngineer | Acme | 2019 - 2020\nTechnical Skills\nPython"
+        sections = split_sections(text)
+        assert "experience" in sections
+        assert "skills" in sections
+
+
+class TestDates:
+    def test_month_year_range(self):
+        result = parse_date_range("June 2018 - December 2020", TODAY)
+        assert result["start"] == "2018-06"
+        assert result["end"] == "2020-12"
+        assert result["months"] == 31
+
+    def test_present(self):
+        result = parse_date_range("Jan 2024 – Present", TODAY)
+        assert result["is_current"]
+        assert result["end"] == "2025-01"
+
+    def test_numeric_and_bare_years(self):
+        assert parse_date_range("03/2019 to 05/2020", TODAY)["months"] == 15
+        assert parse_date_range("2016 - 2017", TODAY)["months"] == 24
+
+    def test_no_range(self):
+        assert parse_date_range("Graduated 2018", TODAY) is None
+
+
+class TestExperience:
+    def test_entries(self):
+        """Experience section produces title/company/duration/bullets entries"""
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        experience = parsed["experience"]
+        assert len(experience) == 2
+        assert experience[0]["title"] == "Senior Software Engineer"
+        assert experience[0]["company"] == "TechCorp Inc"
+        assert experience[0]["is_current"]
+        assert len(experience[0]["bullets"]) == 2
+        assert experience[1]["duration"] == "June 2018 - December 2020"
+
+    def test_current_role_and_years(self):
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        assert parsed["current_role"] == "Senior Software Engineer"
+        # Jun 2018 - Dec 2020 (31 months) + Jan 2021 - Jan 2025 (49 months)
+        assert parsed["total_years_experience"] == pytest.approx(6.7, abs=0.1)
+        assert parsed["years_experience"] == 7
+
+    def test_overlapping_roles_counted_once(self):
+        entries = [
+            {"start": "2020-01", "end": "2021-12"},
+            {"start": "2021-01", "end": "2022-12"},
+        ]
+        assert total_experience_years(entries) == 3.0
+
+    def test_stated_years_fallback(self):
+        """Without dated entries the stated years of experience are used"""
+        parsed = parse_resume_structured("Data analyst with 4 years of experience in SQL.", today=TODAY)
+        assert parsed["experience"] == []
+        assert parsed["years_experience"] == 4
+
+
+class TestEducationAndSkills:
+    def test_education(self):
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        assert parsed["education"] == "BACHELOR"
+        entry = parsed["education_entries"][0]
+        assert entry["institution"] == "Stanford University"
+        assert entry["year"] == 2018
+
+    def test_certifications(self):
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        assert parsed["certifications"] == ["AWS Certified Machine Learning - Specialty"]
+
+    def test_skills_use_word_boundaries(self):
+        """Short skills like Go and R are not matched inside other words"""
+        skills = extract_skills("Good communicator. Ran growth experiments. Golang and PyTorch.")
+        assert "Go" in skills
+        assert "PyTorch" in skills
+        assert "R" not in skills
+
+    def test_role_labels(self):
+        """Compound role labels resolve to any of their parts"""
+        assert set(label_to_skills("PyTorch/TensorFlow")) == {"PyTorch", "TensorFlow"}
+        found, missing = split_labels(["PyTorch/TensorFlow", "Creativity", "Kubernetes"], "Built models in TensorFlow")
+        assert found == ["PyTorch/TensorFlow"]
+        assert missing == ["Creativity", "Kubernetes"]
+
+
+class TestSummary:
+    def test_summary_is_compact(self):
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        summary = format_resume_summary(parsed)
+        assert "Senior Software Engineer | TechCorp Inc" in summary
+        assert "Reduced API latency by 40%" in summary
+        assert len(summary) < len(SAMPLE_RESUME) * 1.5
+
+    def test_summary_falls_back_to_raw_text(self):
+        parsed = parse_resume_structured("Just a paragraph about me.", today=TODAY)
+        assert format_resume_summary(parsed) == "Just a paragraph about me."
+
+
+class TestAnalysisPrompt:
+    ROLE = {"name": "ML Engineer"}
+
+    def test_mock_analysis_without_years_experience(self, monkeypatch):
+        import server
+        monkeypatch.setattr(server, "claude_client", None)
+        result = asyncio.run(server.analyze_with_claude({"years_experience": None}, self.ROLE, {}))
+        assert result["years_gap"] == 3
+
+    def test_structured_summary_is_not_repeated(self, monkeypatch):
+        import server
+        prompts = []
+
+        def create(messages, **kwargs):
+            prompts.append(messages[0]["content"])
+            return SimpleNamespace(content=[SimpleNamespace(text="{}")])
+
+        monkeypatch.setattr(server, "claude_client", SimpleNamespace(messages=SimpleNamespace(create=create)))
+        parsed = parse_resume_structured(SAMPLE_RESUME, today=TODAY)
+        asyncio.run(server.analyze_with_claude(parsed, self.ROLE, {}))
+        resume_part = prompts[0].split("BACKGROUND CONTEXT:")[0]
+        assert "Senior Software Engineer | TechCorp Inc" in resume_part
+        assert "- Years Experience" not in resume_part and "- Current Role" not in resume_part
+
+        asyncio.run(server.analyze_with_claude({"raw_text": "Paragraph", "years_experience": None}, self.ROLE, {}))
+        assert "- Years Experience: Not specified" in prompts[1].split("BACKGROUND CONTEXT:")[0]